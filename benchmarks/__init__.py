@@ -0,0 +1,3 @@
+'''
+Benchmarks for walkabout, see python -m benchmarks --help
+'''
@@ -0,0 +1,78 @@
+'''
+Command line for the benchmark suite, run from the repository root:
+
+    python -m benchmarks run --sizes small --output base.json
+    python -m benchmarks run --sizes medium --filter 'report\\.' -o new.json
+    python -m benchmarks run --rows 100000 --columns 50 --null-rate .2
+    python -m benchmarks compare base.json new.json
+
+compare exits with status 1 when anything regressed, or failed in new.json.
+'''
+import argparse
+import json
+import sys
+from . import suite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    bench = commands.add_parser('run', help='time every public function')
+    bench.add_argument('--sizes', nargs='+', choices=list(suite.SIZES),
+                       default=['small'], help='preset frame sizes')
+    bench.add_argument('--rows', type=int, nargs='+',
+                       help='frame rows, instead of the presets')
+    bench.add_argument('--columns', type=int, nargs='+', default=[10],
+                       help='frame features, paired with every --rows')
+    bench.add_argument('--filter', help='regular expression on the names')
+    bench.add_argument('--repeat', type=int, default=3)
+    bench.add_argument('--no-memory', action='store_true',
+                       help='skip the tracemalloc run')
+    bench.add_argument('--mix', type=json.loads,
+                       help='dtype mix as JSON, like \'{"float": 1}\'')
+    bench.add_argument('--null-rate', type=float)
+    bench.add_argument('--cardinality', type=int)
+    bench.add_argument('--placeholder-rate', type=float)
+    bench.add_argument('--seed', type=int)
+    bench.add_argument('-o', '--output', help='JSON file for the results')
+
+    diff = commands.add_parser('compare', help='compare two result files')
+    diff.add_argument('base')
+    diff.add_argument('new')
+    diff.add_argument('--threshold', type=float, default=1.2,
+                      help='slowdown or memory growth ratio that fails')
+    diff.add_argument('--min-seconds', type=float, default=.01,
+                      help='ignore time ratios of faster runs')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        merged = suite.compare(suite.load(args.base), suite.load(args.new),
+                               args.threshold, args.min_seconds)
+        print(suite.format_comparison(merged))
+        regressed = (merged['Change'] == 'regression').sum()
+        print(f'\n{regressed} regression(s) of {len(merged)} benchmarks')
+        return 1 if regressed else 0
+
+    missing = suite.uncovered()
+    if missing:
+        print('No benchmark case for: ' + ', '.join(missing), file=sys.stderr)
+    if args.rows:
+        sizes = [(rows, columns) for rows in args.rows
+                 for columns in args.columns]
+    else:
+        sizes = [size for name in args.sizes for size in suite.SIZES[name]]
+    options = {'mix': args.mix, 'null_rate': args.null_rate,
+               'cardinality': args.cardinality,
+               'placeholder_rate': args.placeholder_rate, 'seed': args.seed}
+    options = {key: value for key, value in options.items()
+               if value is not None}
+    result = suite.run(sizes, args.filter, args.repeat, not args.no_memory,
+                       options)
+    if args.output:
+        suite.save(result, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
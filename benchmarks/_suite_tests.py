@@ -0,0 +1,56 @@
+import unittest
+from benchmarks import suite
+
+
+def entry(function, wall=None, peak=None, error=None):
+    result = {'function': function, 'rows': 100, 'columns': 10}
+    if error is None:
+        result.update({'wall': [wall], 'cpu': [wall], 'peak_bytes': peak})
+    else:
+        result['error'] = error
+    return result
+
+
+class RunTests(unittest.TestCase):
+    '''
+    Test that every benchmark case runs in benchmarks/suite.py
+    '''
+    def test_every_case_runs(self):
+        result = suite.run(suite.SIZES['small'], repeat=1, memory=False,
+                           log=None)
+        failed = {item['function']: item['error']
+                  for item in result['results'] if item.get('error')}
+        self.assertEqual(failed, {})
+        self.assertEqual(len(result['results']),
+                         len(suite.CASES) * len(suite.SIZES['small']))
+
+
+class CompareTests(unittest.TestCase):
+    '''
+    Test compare in benchmarks/suite.py
+    '''
+    def setUp(self):
+        self.base = {'results': [entry('a', 1.0, 2 ** 20),
+                                 entry('b', 1.0, 2 ** 20),
+                                 entry('c', 1.0, 2 ** 20),
+                                 entry('d', 1.0, 2 ** 20)]}
+        self.new = {'results': [entry('a', 1.0, 2 ** 20),
+                                entry('b', 2.0, 2 ** 20),
+                                entry('c', error='ValueError: bad input')]}
+
+    def test_changes(self):
+        merged = suite.compare(self.base, self.new).set_index('Function')
+        self.assertEqual(list(merged['Change']),
+                         ['', 'regression', 'regression', 'regression'])
+        self.assertEqual(list(merged['Error']),
+                         ['', '', 'ValueError: bad input',
+                          'missing from new run'])
+
+    def test_improvement(self):
+        merged = suite.compare(self.new, self.base).set_index('Function')
+        self.assertEqual(merged.loc['b', 'Change'], 'improvement')
+        self.assertEqual(merged.loc['c', 'Change'], '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,292 @@
+'''
+Time and memory-profile every public function of walkabout.report,
+walkabout.plot and walkabout.support on synthetic frames
+'''
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+import numpy as np
+from tabulate import tabulate
+import walkabout
+from walkabout import report, plot, support
+from .synthetic import make_frame
+
+
+MODULES = {'report': report, 'plot': plot, 'support': support}
+
+# rows x columns of the frames each function is timed on
+SIZES = {
+    'small': [(10_000, 10)],
+    'medium': [(100_000, 100), (1_000_000, 10), (10_000, 1_000)],
+    'large': [(10_000_000, 10), (1_000_000, 100), (10_000, 10_000)]}
+
+# plots draw one panel per feature, so they are timed on the first features
+PLOT_COLUMNS = 20
+# interaction scores grow with the square of the features, and the MCAR
+# test with the number of missingness patterns, which grows exponentially.
+# The feature importances reject missing values, so their nulls are zeroed.
+MCAR_COLUMNS = 20
+INTERACTION_COLUMNS = 200
+
+
+def _numeric(df, limit=None):
+    return df.select_dtypes(include='number').drop(columns='target') \
+        .iloc[:, :limit]
+
+
+def _first(df, kind):
+    return df[[name for name in df.columns if name.startswith(kind)][0]]
+
+
+def _plot_frame(df):
+    return df.iloc[:, :PLOT_COLUMNS].assign(target=df['target'])
+
+
+def _render(df):
+    directory = tempfile.mkdtemp()
+    specs = ['missingness_map', 'univariate_distribution',
+             {'plot': 'boxplot', 'target': 'target'}]
+    return (_plot_frame(df), specs, directory), {}, directory
+
+
+# function name -> builder(df) returning (args, kwargs), and optionally a
+# directory to remove after timing
+CASES = {
+    'report.nulls': lambda df: ((df,), {}),
+    'report.type_and_unique': lambda df: ((df,), {}),
+    'report.rundown': lambda df: ((df,), {}),
+    'report.assess_categoricals': lambda df: ((df,), {}),
+    'report.numeric_distribution': lambda df: ((df,), {}),
+    'report.high_correlations': lambda df: ((df,), {}),
+    'report.mcar_test': lambda df: ((_numeric(df, MCAR_COLUMNS),), {}),
+    'report.simple_feature_importance':
+        lambda df: ((_numeric(df).fillna(0), df['target']), {}),
+    'report.interaction_feature_importance':
+        lambda df: ((_numeric(df, INTERACTION_COLUMNS).fillna(0),
+                     df['target']), {'k': 20}),
+    'plot.univariate_distribution': lambda df: ((_plot_frame(df),), {}),
+    'plot.bivariate_categorical_distribution':
+        lambda df: ((_plot_frame(df), _first(df, 'object').name), {}),
+    'plot.residuals': lambda df: ((_plot_frame(df), 'target'), {}),
+    'plot.boxplot': lambda df: ((_plot_frame(df),), {'target': 'target'}),
+    'plot.correlation_heatmap': lambda df: ((_plot_frame(df),), {}),
+    'plot.null_correlation_heatmap': lambda df: ((_plot_frame(df),), {}),
+    'plot.missingness_map': lambda df: ((_plot_frame(df),), {}),
+    'plot.render': _render,
+    'support.list_to_string': lambda df: ((list(df.columns),), {}),
+    'support.strip_columns':
+        lambda df: ((df.select_dtypes(include='object'),), {}),
+    'support.outlier_mask': lambda df: ((_first(df, 'float'),), {}),
+    'support.trimean': lambda df: ((_first(df, 'float'),), {}),
+    'support.variance_coefficient': lambda df: ((_first(df, 'float'),), {}),
+    'support.placehold_to_nan': lambda df: ((df,), {}),
+    'support.placeholder_mask': lambda df: ((_first(df, 'object'),), {}),
+    'support.placeholder_counts': lambda df: ((df,), {}),
+    'support.outlier_fences': lambda df: ((_first(df, 'float'),), {})}
+
+
+def uncovered():
+    '''
+    Output:
+    Return the public functions of the benchmarked modules without a case
+    '''
+    return [f'{prefix}.{name}' for prefix, module in MODULES.items()
+            for name in module.__all__ if f'{prefix}.{name}' not in CASES]
+
+
+def measure(func, args, kwargs, repeat=3, memory=True):
+    '''
+    Time func(*args, **kwargs) repeat times, then run it once more under
+    tracemalloc for its peak allocation. Printed output is discarded and
+    figures are closed after every call.
+
+    Output:
+    Return a dict of the wall and CPU seconds of every run and the peak
+    traced bytes, or None if memory is False
+    '''
+    def call():
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(*args, **kwargs)
+        plt.close('all')
+
+    wall, cpu = [], []
+    for _ in range(repeat):
+        gc.collect()
+        start, start_cpu = time.perf_counter(), time.process_time()
+        call()
+        wall.append(time.perf_counter() - start)
+        cpu.append(time.process_time() - start_cpu)
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            call()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'wall': wall, 'cpu': cpu, 'peak_bytes': peak}
+
+
+def run(sizes, pattern=None, repeat=3, memory=True, frame_options=None,
+        log=print):
+    '''
+    Benchmark every case whose name matches pattern on a frame of each size
+
+    Input:
+    sizes: list of (rows, columns) tuples
+    pattern: string or None, regular expression selecting function names
+    repeat: int, timed runs per function and size
+    memory: bool, also record peak allocation
+    frame_options: dict or None, keyword arguments of make_frame
+    log: function called with a line of progress, or None
+
+    Output:
+    Return a dict with 'meta' and 'results', ready to dump as JSON
+    '''
+    frame_options = frame_options or {}
+    names = [name for name in CASES
+             if pattern is None or re.search(pattern, name)]
+    results = []
+    for rows, columns in sizes:
+        df = make_frame(rows, columns, **frame_options)
+        for name in names:
+            prefix, attr = name.split('.')
+            entry = {'function': name, 'rows': rows, 'columns': columns}
+            case = ()
+            try:
+                case = CASES[name](df)
+                entry.update(measure(getattr(MODULES[prefix], attr),
+                                     *case[:2], repeat, memory))
+            except Exception as error:
+                entry['error'] = f'{type(error).__name__}: {error}'
+            finally:
+                if len(case) > 2:
+                    shutil.rmtree(case[2], ignore_errors=True)
+            results.append(entry)
+            if log is not None:
+                log(_progress(entry))
+        del df
+    return {'meta': _meta(repeat, frame_options), 'results': results}
+
+
+def compare(base, new, threshold=1.2, min_seconds=.01):
+    '''
+    Compare two benchmark results on the functions and sizes of base
+
+    Runs are compared on their fastest wall time, which is the least noisy,
+    and on peak allocation. A benchmark that failed in new, or is missing
+    from it, counts as a regression.
+
+    Input:
+    base, new: dicts returned by run
+    threshold: float, ratio of new to base above which a change counts as
+               a regression, and below whose inverse it is an improvement
+    min_seconds: float, time ratios only count when either time is at
+                 least this long, since shorter runs are mostly noise
+
+    Output:
+    Return a Pandas DataFrame with a row per function and size of base, and
+    columns for base and new best time and peak, their ratios, a Change
+    of 'regression', 'improvement' or '', and the Error of new, if any
+    '''
+    def table(result):
+        rows = []
+        for entry in result['results']:
+            error = entry.get('error')
+            peak = entry.get('peak_bytes')
+            rows.append({'Function': entry['function'],
+                         'Rows': entry['rows'],
+                         'Columns': entry['columns'],
+                         'Time': np.nan if error else min(entry['wall']),
+                         'Peak MB': np.nan if error or peak is None
+                         else peak / 2 ** 20,
+                         'Error': error})
+        return pd.DataFrame(rows, columns=['Function', 'Rows', 'Columns',
+                                           'Time', 'Peak MB', 'Error'])
+
+    merged = table(base).merge(table(new), how='left', indicator=True,
+                               on=['Function', 'Rows', 'Columns'],
+                               suffixes=(' Base', ' New'))
+    merged['Time Ratio'] = merged['Time New'] / merged['Time Base']
+    merged['Peak Ratio'] = merged['Peak MB New'] / merged['Peak MB Base']
+    timed = merged[['Time Base', 'Time New']].max(axis=1) >= min_seconds
+    ratios = merged[['Time Ratio', 'Peak Ratio']].copy()
+    ratios.loc[~timed, 'Time Ratio'] = np.nan
+    worst, best = ratios.max(axis=1), ratios.min(axis=1)
+    error = merged['Error New'].where(merged['_merge'] == 'both',
+                                      'missing from new run')
+    failed = error.notna()
+    merged['Change'] = np.where(failed | (worst > threshold), 'regression',
+                                np.where(best < 1 / threshold,
+                                         'improvement', ''))
+    merged['Error'] = error.fillna('')
+    return merged.drop(columns=['Error Base', 'Error New', '_merge'])
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(result, path):
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=1)
+
+
+def format_comparison(merged):
+    '''
+    Output:
+    Return the comparison as a printable table
+    '''
+    return tabulate(merged, headers='keys', tablefmt='simple',
+                    showindex=False, floatfmt='.3f')
+
+
+def _progress(entry):
+    size = f"{entry['rows']:>10,} x {entry['columns']:<6,}"
+    if entry.get('error'):
+        return f"{entry['function']:<42} {size} failed: {entry['error']}"
+    peak = entry['peak_bytes']
+    peak = '' if peak is None else f'{peak / 2 ** 20:10.1f} MB'
+    return f"{entry['function']:<42} {size} {min(entry['wall']):9.3f} s{peak}"
+
+
+def _meta(repeat, frame_options):
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'versions': {'pandas': pd.__version__, 'numpy': np.__version__,
+                     'matplotlib': matplotlib.__version__},
+        'revision': _revision(),
+        'repeat': repeat,
+        'frame': frame_options}
+
+
+def _revision():
+    '''
+    Git commit of the walkabout being benchmarked, or None outside a checkout
+    '''
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True,
+            cwd=os.path.dirname(walkabout.__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
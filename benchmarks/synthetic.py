@@ -0,0 +1,94 @@
+'''
+Synthetic DataFrames for benchmarking, with a configurable shape, dtype mix,
+null rate, cardinality and placeholder density
+'''
+import pandas as pd
+import numpy as np
+
+
+MIX = {'float': .5, 'int': .2, 'object': .2, 'datetime': .1}
+
+
+def make_frame(rows=10000, columns=10, mix=MIX, null_rate=.05,
+               cardinality=20, placeholder_rate=.01, factors=4, seed=0):
+    '''
+    Build a DataFrame of random features
+
+    Float features are noisy copies of a few shared factors, so some pairs
+    correlate. Int features hold labels 0 to cardinality - 1, object
+    features hold cardinality string labels, and datetime features hold
+    days over ten years. A numeric 'target' column depends on the first
+    float features.
+
+    Input:
+    rows: int, number of rows
+    columns: int, number of features, not counting target
+    mix: dict of dtype ('float', 'int', 'object' or 'datetime') to the
+         fraction of features of that dtype
+    null_rate: float, fraction of nulls in every float, object and datetime
+               feature. Int features have no nulls so they stay ints.
+    cardinality: int, number of distinct labels in int and object features
+    placeholder_rate: float, fraction of values replaced by a placeholder,
+                      -999 in numeric features and '?' in object features
+    factors: int, number of shared factors behind the float features
+    seed: int, random seed
+
+    Output:
+    Return a Pandas DataFrame object
+    '''
+    rng = np.random.default_rng(seed)
+    kinds = _kinds(columns, mix)
+    latent = rng.standard_normal((rows, max(factors, 1)))
+    labels = np.array([f'label_{i}' for i in range(cardinality)],
+                      dtype=object)
+    start = np.datetime64('2015-01-01')
+
+    data = {}
+    for i, kind in enumerate(kinds):
+        if kind == 'float':
+            values = latent[:, i % latent.shape[1]] * rng.uniform(.5, 2) + \
+                rng.standard_normal(rows)
+        elif kind == 'int':
+            values = rng.integers(0, cardinality, rows)
+        elif kind == 'object':
+            values = labels[rng.integers(0, cardinality, rows)]
+        else:
+            values = start + rng.integers(0, 3650, rows).astype(
+                'timedelta64[D]')
+        if kind != 'datetime' and placeholder_rate:
+            spots = rng.random(rows) < placeholder_rate
+            values[spots] = '?' if kind == 'object' else -999
+        if kind != 'int' and null_rate:
+            nulls = rng.random(rows) < null_rate
+            if kind == 'float':
+                values[nulls] = np.nan
+            elif kind == 'object':
+                values[nulls] = None
+            else:
+                values[nulls] = np.datetime64('NaT')
+        data[f'{kind}_{i}'] = values
+
+    floats = [name for name, kind in zip(data, kinds) if kind == 'float']
+    target = rng.standard_normal(rows)
+    for weight, name in zip((3, -2, 1), floats):
+        target += weight * np.nan_to_num(data[name])
+    data['target'] = target
+    return pd.DataFrame(data)
+
+
+def _kinds(columns, mix):
+    '''
+    Split columns between the dtypes in mix, interleaved so every prefix of
+    the frame has roughly the same mix
+    '''
+    total = sum(mix.values())
+    counts = {kind: share / total * columns for kind, share in mix.items()}
+    kinds = []
+    placed = dict.fromkeys(mix, 0)
+    for i in range(columns):
+        # the dtype furthest behind its share goes next
+        kind = max(mix, key=lambda k: counts[k] * (i + 1) / columns -
+                   placed[k])
+        placed[kind] += 1
+        kinds.append(kind)
+    return kinds
@@ -15,7 +15,7 @@ setuptools.setup(
     long_description = LONG_DESCRIPTION,
     long_description_content_type = 'text/markdown',
     url = 'https://github.com/bundickm/walkabout',
-    packages = setuptools.find_packages(),
+    packages = setuptools.find_packages(exclude=['benchmarks']),
     python_requires = '>= 3.5',
     classifier = [
         'Programming Language :: Python :: 3',
@@ -1,6 +1,25 @@
 '''
 walkabout - a package for quick exploratory analysis on all features in a dataframe
+
+Submodules are imported on first access, so import walkabout is instant and
+matplotlib and seaborn are only loaded by walkabout.plot.
 '''
+import importlib
+
+
+__all__ = ['report', 'plot', 'support', 'profile', 'stream', 'stats',
+           'sampling', 'missing', 'cache', 'instrument', 'sketch',
+           'profiling']
+
+
+def __getattr__(name):
+    if name == 'profiling':
+        return importlib.import_module('.instrument', __name__).profiling
+    if name in __all__:
+        # import_module also sets the submodule as an attribute of the package
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
-from . import report, plot, support
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,142 @@
+import tempfile
+import unittest
+import pandas as pd
+import numpy as np
+from walkabout import cache, profile, stats, missing
+
+
+class CacheTests(unittest.TestCase):
+    '''
+    Test the Cache class and fingerprint in cache.py
+    '''
+    def test_fingerprint(self):
+        a = pd.Series([1.0, 2.0, np.nan], name='a')
+        self.assertEqual(cache.fingerprint(a), cache.fingerprint(a.copy()))
+        self.assertNotEqual(cache.fingerprint(a),
+                            cache.fingerprint(a.rename('b')))
+        self.assertNotEqual(cache.fingerprint(a),
+                            cache.fingerprint(a.astype(np.float32)))
+        self.assertNotEqual(cache.fingerprint(a),
+                            cache.fingerprint(a.fillna(0)))
+        # the index is not part of the column
+        self.assertEqual(cache.fingerprint(a),
+                         cache.fingerprint(a.set_axis([5, 6, 7])))
+        labels = pd.Series(['x', None, 'y'], name='a')
+        self.assertNotEqual(cache.fingerprint(labels),
+                            cache.fingerprint(labels.replace('y', 'z')))
+        self.assertNotEqual(cache.fingerprint(labels),
+                            cache.fingerprint(labels.astype('category')))
+
+    def test_categorical_fingerprint(self):
+        labels = pd.Series(['x', 'y', 'x'], name='a', dtype='category')
+        self.assertEqual(cache.fingerprint(labels),
+                         cache.fingerprint(labels.copy()))
+        for changed in [labels.cat.add_categories('z'),
+                        labels.cat.reorder_categories(['y', 'x']),
+                        labels.cat.as_ordered()]:
+            self.assertNotEqual(cache.fingerprint(labels),
+                                cache.fingerprint(changed))
+
+    def test_lru_eviction(self):
+        store = cache.Cache(max_bytes=3000)
+        for key in 'abc':
+            store.put(key, np.zeros(100))
+        self.assertEqual(len(store), 3)
+        store.get('a')
+        store.put('d', np.zeros(100))
+        # b was used least recently
+        self.assertEqual(list(store.entries), ['c', 'a', 'd'])
+        self.assertLessEqual(store.size, 3000)
+        self.assertIsNone(store.get('b'))
+        store.put('e', np.zeros(1000))
+        self.assertNotIn('e', store)
+
+    def test_copies(self):
+        store = cache.Cache()
+        store.put('a', [1, 2])
+        store.get('a').append(3)
+        self.assertEqual(store.get('a'), [1, 2])
+        self.assertEqual((store.hits, store.misses), (2, 0))
+
+    def test_disk(self):
+        directory = tempfile.mkdtemp()
+        cache.Cache(directory=directory).put('a', {'x': 1})
+        store = cache.Cache(directory=directory)
+        self.assertIn('a', store)
+        self.assertEqual(store.get('a'), {'x': 1})
+        self.assertEqual(len(store), 1)
+
+
+class CachedStatisticsTests(unittest.TestCase):
+    '''
+    Test that cached statistics match fresh ones, and that a changed column
+    only invalidates its own entries
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(4)
+        self.df = pd.DataFrame({'a': rng.normal(size=300),
+                                'b': rng.normal(size=300),
+                                'c': rng.choice(['x', 'y', None], 300),
+                                'd': rng.randint(0, 9, 300)})
+        self.df.loc[::5, 'a'] = np.nan
+        self.store = cache.enable()
+
+    def tearDown(self):
+        cache.disable()
+
+    def changed(self):
+        df = self.df.copy()
+        df.loc[3, 'b'] = 100.0
+        return df
+
+    def test_profile(self):
+        first = profile.build_profile(self.df).describe()
+        misses = self.store.misses
+        second = profile.build_profile(self.df).describe()
+        self.assertEqual(self.store.misses, misses)
+        pd.testing.assert_frame_equal(first, second)
+
+        self.store.hits = 0
+        changed = self.changed()
+        result = profile.build_profile(changed).describe()
+        # three profiles are reused, b is profiled and its moments computed
+        self.assertEqual(self.store.hits, 3)
+        cache.disable()
+        pd.testing.assert_frame_equal(
+            result, profile.build_profile(changed).describe())
+
+    def test_moments(self):
+        first = stats.numeric_moments(self.df)
+        pd.testing.assert_frame_equal(first, stats.numeric_moments(self.df))
+        cache.disable()
+        pd.testing.assert_frame_equal(first, stats.numeric_moments(self.df))
+
+    def test_correlation_tiles(self):
+        first = stats.correlation_pairs(self.df, threshold=0, block_size=1)
+        self.assertEqual(len(self.store), 6)
+        changed = self.changed()
+        self.store.hits = 0
+        result = stats.correlation_pairs(changed, threshold=0, block_size=1)
+        # only the tiles that do not involve b are reused
+        self.assertEqual(self.store.hits, 3)
+        self.assertEqual(len(self.store), 9)
+        cache.disable()
+        pd.testing.assert_frame_equal(
+            result, stats.correlation_pairs(changed, threshold=0,
+                                            block_size=1))
+        self.assertEqual(len(first), 3)
+
+    def test_null_mask(self):
+        first = missing.build_null_mask(self.df)
+        second = missing.build_null_mask(self.changed())
+        self.assertEqual(len(self.store), 5)
+        cache.disable()
+        fresh = missing.build_null_mask(self.df)
+        np.testing.assert_array_equal(first.bits, fresh.bits)
+        np.testing.assert_array_equal(second.bits, fresh.bits)
+        np.testing.assert_array_equal(first.null_counts(),
+                                      fresh.null_counts())
+
+
+if __name__ == '__main__':
+    unittest.main()
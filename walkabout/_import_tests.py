@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+# run from the folder holding the package, so it imports without installing
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ['matplotlib', 'seaborn', 'scipy', 'sklearn', 'tabulate', 'pandas']
+
+
+def loaded_after(statement):
+    '''
+    Run statement in a fresh interpreter and return the heavy modules it
+    imported
+    '''
+    code = (f'import sys\n{statement}\n'
+            f'print(" ".join(m for m in {HEAVY!r} if m in sys.modules))')
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                            check=True, capture_output=True, text=True)
+    return result.stdout.split()
+
+
+class LazyImportTests(unittest.TestCase):
+    '''
+    Test that import walkabout only loads what is used
+    '''
+    def test_bare_import(self):
+        self.assertEqual(loaded_after('import walkabout'), [])
+
+    def test_report_skips_plotting(self):
+        loaded = loaded_after('import walkabout as wa\nwa.report.nulls')
+        self.assertEqual(loaded, ['tabulate', 'pandas'])
+
+    def test_support_only(self):
+        loaded = loaded_after('import walkabout as wa\nwa.support.outlier_mask')
+        self.assertEqual(loaded, ['pandas'])
+
+    def test_plot(self):
+        loaded = loaded_after('from walkabout import plot')
+        self.assertIn('matplotlib', loaded)
+        self.assertIn('seaborn', loaded)
+
+    def test_attributes(self):
+        import walkabout
+        self.assertIn('report', dir(walkabout))
+        self.assertIs(walkabout.stats, sys.modules['walkabout.stats'])
+        with self.assertRaises(AttributeError):
+            walkabout.missing_module
+
+    def test_all_lists_submodules(self):
+        import walkabout
+        folder = os.path.dirname(walkabout.__file__)
+        public = {name[:-3] for name in os.listdir(folder)
+                  if name.endswith('.py') and not name.startswith('_')}
+        self.assertLessEqual(public, set(walkabout.__all__))
+
+
+if __name__ == '__main__':
+    unittest.main()
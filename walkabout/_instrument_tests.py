@@ -0,0 +1,75 @@
+import contextlib
+import io
+import tracemalloc
+import unittest
+import pandas as pd
+import numpy as np
+import walkabout
+from walkabout import instrument, report
+
+
+class ProfilingTests(unittest.TestCase):
+    '''
+    Test the stage recording in instrument.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        self.df = pd.DataFrame({'a': rng.normal(size=1000),
+                                'b': rng.choice(['x', 'y', None], 1000)})
+
+    def run_rundown(self, **kwargs):
+        with walkabout.profiling(**kwargs) as recording:
+            with contextlib.redirect_stdout(io.StringIO()):
+                report.rundown(self.df)
+        return recording
+
+    def test_inactive(self):
+        self.assertIs(instrument.stage('unique', 'a'), instrument._NULL)
+
+    def test_rundown_stages(self):
+        received = []
+        frame = self.run_rundown(callback=received.append).frame()
+        self.assertEqual(len(received), len(frame))
+        self.assertEqual(frame.iloc[-1]['stage'], 'rundown')
+        self.assertIsNone(frame.iloc[-1]['parent'])
+        stages = set(zip(frame['stage'], frame['parent']))
+        for item in [('profile', 'rundown'), ('column', 'profile'),
+                     ('unique', 'column'), ('describe', 'rundown'),
+                     ('format', 'nulls'), ('moments', 'profile')]:
+            self.assertIn(item, stages)
+        columns = frame[frame['stage'] == 'column']
+        self.assertEqual(list(columns['column']), ['a', 'b'])
+        self.assertTrue((frame['wall'] >= 0).all())
+        self.assertTrue((frame['peak_bytes'] >= 0).all())
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_columns(self):
+        totals = self.run_rundown(memory=False).columns()
+        self.assertEqual(sorted(totals.index), ['a', 'b'])
+        self.assertTrue(totals['wall'].is_monotonic_decreasing)
+        self.assertTrue(totals['peak_bytes'].isnull().all())
+
+    def test_nested_peaks(self):
+        with walkabout.profiling() as recording:
+            with instrument.stage('outer'):
+                with instrument.stage('inner'):
+                    block = np.ones(2 ** 20)
+                del block
+                small = np.ones(2 ** 10)
+        inner, outer = recording.records
+        self.assertGreaterEqual(inner['peak_bytes'], 8 * 2 ** 20)
+        self.assertGreaterEqual(outer['peak_bytes'], inner['peak_bytes'])
+        self.assertEqual(inner['parent'], 'outer')
+        self.assertEqual(len(small), 2 ** 10)
+
+    def test_nested_peaks_without_reset_peak(self):
+        reset_peak = tracemalloc.reset_peak
+        del tracemalloc.reset_peak
+        try:
+            self.test_nested_peaks()
+        finally:
+            tracemalloc.reset_peak = reset_peak
+
+
+if __name__ == '__main__':
+    unittest.main()
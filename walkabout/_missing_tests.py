@@ -0,0 +1,170 @@
+import tracemalloc
+import unittest
+import pandas as pd
+import numpy as np
+from walkabout import missing
+
+
+class BuildNullMaskTests(unittest.TestCase):
+    '''
+    Test the build_null_mask function in missing.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(4)
+        values = rng.random_sample((101, 5))
+        self.df = pd.DataFrame(np.where(values < .3, np.nan, values),
+                               columns=list('abcde'))
+        self.df['f'] = rng.choice(['x', None], 101)
+        self.mask = missing.build_null_mask(self.df)
+
+    def test_shape(self):
+        self.assertEqual(self.mask.shape, (101, 6))
+        self.assertEqual(self.mask.bits.shape, (6, 13))
+
+    def test_bits_unpack_to_isnull(self):
+        unpacked = np.unpackbits(self.mask.bits, axis=1)[:, :101].T
+        self.assertTrue(np.array_equal(unpacked.astype(bool),
+                                       self.df.isnull().to_numpy()))
+
+    def test_chunks_match_frame(self):
+        chunks = (self.df.iloc[i:i + 13] for i in range(0, 101, 13))
+        chunked = missing.build_null_mask(chunks)
+        self.assertEqual(chunked.n_rows, 101)
+        self.assertTrue(np.array_equal(chunked.bits, self.mask.bits))
+
+    def test_row_blocks_match(self):
+        default, missing.BLOCK_VALUES = missing.BLOCK_VALUES, 40
+        try:
+            blocked = missing.build_null_mask(self.df)
+            fractions, _ = blocked.binned_fractions(bins=4)
+        finally:
+            missing.BLOCK_VALUES = default
+        self.assertTrue(np.array_equal(blocked.bits, self.mask.bits))
+        self.assertTrue(np.allclose(fractions,
+                                    self.mask.binned_fractions(bins=4)[0]))
+
+    def test_memory_bounded_by_block(self):
+        df = pd.DataFrame(np.random.RandomState(0).random_sample((200000, 20)))
+        df = df.mask(df < .1)
+        default, missing.BLOCK_VALUES = missing.BLOCK_VALUES, 1 << 16
+        tracemalloc.start()
+        try:
+            mask = missing.build_null_mask(df)
+            mask.binned_fractions(bins=10)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            missing.BLOCK_VALUES = default
+        # the frame holds 32MB, its isnull matrix 4MB and the packed bits 0.5MB
+        self.assertLess(peak, 2 * 2 ** 20)
+
+    def test_null_counts(self):
+        self.assertEqual(self.mask.null_counts().to_dict(),
+                         self.df.isnull().sum().to_dict())
+
+    def test_binned_fractions(self):
+        fractions, starts = self.mask.binned_fractions(bins=4)
+        self.assertEqual(list(starts), [0, 32, 64, 96])
+        expected = [self.df.iloc[a:b].isnull().mean().to_numpy() for a, b in
+                    zip(starts, list(starts[1:]) + [101])]
+        self.assertTrue(np.allclose(fractions, expected))
+
+    def test_empty(self):
+        mask = missing.build_null_mask(iter([]))
+        self.assertEqual(mask.shape, (0, 0))
+        self.assertEqual(mask.binned_fractions()[0].shape, (0, 0))
+
+
+class NullPatternTests(unittest.TestCase):
+    '''
+    Test co_occurrence, phi and patterns of NullMask in missing.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(7)
+        # more than 64 features, so row keys take two words
+        values = rng.random_sample((203, 70))
+        values[values[:, 0] < .2, 1] = np.nan
+        self.df = pd.DataFrame(np.where(values < .02, np.nan, values))
+        self.df[70] = 1.0
+        self.mask = missing.build_null_mask(self.df)
+
+    def test_co_occurrence(self):
+        nulls = self.df.isnull().astype(int)
+        expected = nulls.T.dot(nulls)
+        self.assertTrue(np.array_equal(self.mask.co_occurrence().to_numpy(),
+                                       expected.to_numpy()))
+
+    def test_phi_matches_pandas(self):
+        expected = self.df.isnull().corr().to_numpy()
+        phi = self.mask.phi().to_numpy()
+        self.assertTrue(np.allclose(phi, expected, equal_nan=True))
+
+    def test_patterns_count_rows(self):
+        table = self.mask.patterns()
+        expected = self.df.isnull().value_counts()
+        self.assertEqual(len(table), len(expected))
+        self.assertEqual(table['Count'].sum(), 203)
+        self.assertEqual(sorted(table['Count']), sorted(expected))
+        self.assertTrue(table['Count'].is_monotonic_decreasing)
+
+    def test_codes_rebuild_mask(self):
+        table, codes = self.mask.patterns(return_codes=True)
+        rebuilt = table.drop(columns='Count').to_numpy()[codes]
+        self.assertTrue(np.array_equal(rebuilt, self.df.isnull().to_numpy()))
+
+    def test_empty(self):
+        mask = missing.build_null_mask(self.df.iloc[:0])
+        self.assertEqual(len(mask.patterns()), 0)
+        self.assertEqual(mask.co_occurrence().to_numpy().sum(), 0)
+
+
+class LittleMcarTests(unittest.TestCase):
+    '''
+    Test the little_mcar function in missing.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(11)
+        values = rng.multivariate_normal(
+            [1, -2, 3], [[2, .8, .3], [.8, 1, .4], [.3, .4, 1]], 2000)
+        self.df = pd.DataFrame(values, columns=list('abc'))
+
+    def test_complete_data(self):
+        result = missing.little_mcar(self.df)
+        self.assertEqual((result['dof'], result['patterns']), (0, 1))
+        self.assertTrue(np.isnan(result['p_value']))
+        self.assertTrue(np.allclose(result['mean'], self.df.mean()))
+        self.assertTrue(np.allclose(result['covariance'],
+                                    self.df.cov(ddof=0)))
+
+    def test_random_nulls_not_rejected(self):
+        rng = np.random.RandomState(3)
+        df = self.df.mask(rng.random_sample(self.df.shape) < .2)
+        result = missing.little_mcar(df)
+        self.assertEqual(result['patterns'], 8)
+        self.assertEqual(result['dof'], 3 * 4 - 3)
+        self.assertGreater(result['p_value'], .05)
+
+    def test_dependent_nulls_rejected(self):
+        df = self.df.copy()
+        df.loc[df['a'] > 1.5, 'b'] = np.nan
+        result = missing.little_mcar(df)
+        self.assertLess(result['p_value'], 1e-6)
+        # EM recovers the mean of b from its relation with a
+        self.assertLess(abs(result['mean']['b'] - self.df['b'].mean()),
+                        abs(df['b'].mean() - self.df['b'].mean()))
+
+    def test_ignores_constant_and_text(self):
+        df = self.df.copy()
+        df.loc[df['a'] > 1.5, 'b'] = np.nan
+        expected = missing.little_mcar(df)
+        df['constant'] = 4.0
+        df.loc[::5, 'constant'] = np.nan
+        df['text'] = 'x'
+        result = missing.little_mcar(df)
+        self.assertEqual(result['features'], ['a', 'b', 'c'])
+        self.assertEqual(result['patterns'], expected['patterns'])
+        self.assertAlmostEqual(result['statistic'], expected['statistic'])
+
+
+if __name__ == '__main__':
+    unittest.main()
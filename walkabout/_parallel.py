@@ -0,0 +1,203 @@
+'''
+Run independent per-column or per-task work on a thread or process pool
+'''
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+
+
+def resolve_jobs(n_jobs):
+    '''
+    Turn an n_jobs argument into a worker count
+
+    Input:
+    n_jobs: int or None. None and 1 mean serial, -1 means one worker per
+            CPU, and other negative values count back from that (-2 is
+            all CPUs but one)
+
+    Output:
+    Return an int of at least 1
+    '''
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        n_jobs = (os.cpu_count() or 1) + 1 + n_jobs
+    return max(int(n_jobs), 1)
+
+
+def map_columns(func, df, n_jobs=1, backend='thread'):
+    '''
+    Apply func to every column of df, spreading batches of columns across
+    a pool of workers, and return the results in column order
+
+    The thread backend shares df with its workers directly. The process
+    backend copies the buffers of numpy-backed columns into one shared
+    memory block that workers map without pickling; only object and
+    extension columns are pickled.
+
+    Input:
+    func: function taking a Pandas Series. Must be picklable (defined at
+          module level, or a functools.partial of one) for processes
+    df: Pandas DataFrame object
+    n_jobs: int, number of workers, see resolve_jobs
+    backend: 'thread' or 'process'
+
+    Output:
+    Return a list with func's result for each column
+    '''
+    if backend not in ('thread', 'process'):
+        raise ValueError("backend must be 'thread' or 'process'")
+    n_jobs = min(resolve_jobs(n_jobs), max(df.shape[1], 1))
+    positions = list(range(df.shape[1]))
+    if n_jobs == 1:
+        return [func(df.iloc[:, i]) for i in positions]
+
+    # a few batches per worker keeps the pool busy without much overhead
+    batches = np.array_split(positions, n_jobs * 4)
+    batches = [list(batch) for batch in batches if len(batch)]
+
+    if backend == 'thread':
+        with ThreadPoolExecutor(n_jobs) as pool:
+            parts = pool.map(lambda batch: [func(df.iloc[:, i])
+                                            for i in batch], batches)
+            return [result for part in parts for result in part]
+
+    shared, specs = _share_columns(df)
+    try:
+        with ProcessPoolExecutor(n_jobs) as pool:
+            futures = [pool.submit(_run_batch, func, shared.name,
+                                   [specs[i] for i in batch])
+                       for batch in batches]
+            return [result for future in futures
+                    for result in future.result()]
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def map_frame(func, df, items, n_jobs=1):
+    '''
+    Apply func(df, item) to every item on a pool of worker processes and
+    return the results in order
+
+    df is copied into shared memory once (see map_columns), and every
+    worker rebuilds a DataFrame viewing that block when it starts, so df
+    is not pickled per item.
+
+    Input:
+    func: picklable function taking a Pandas DataFrame and an item
+    df: Pandas DataFrame object
+    items: list of picklable items
+    n_jobs: int, number of workers, see resolve_jobs
+
+    Output:
+    Return a list with func's result for each item
+    '''
+    n_jobs = min(resolve_jobs(n_jobs), max(len(items), 1))
+    if n_jobs == 1:
+        return [func(df, item) for item in items]
+
+    shared, specs = _share_columns(df)
+    try:
+        with ProcessPoolExecutor(n_jobs, initializer=_attach_frame,
+                                 initargs=(shared.name, specs,
+                                           df.index)) as pool:
+            return list(pool.map(_run_item, [func] * len(items), items))
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+# the frame rebuilt by each map_frame worker, and the block it views
+_worker_frame = None
+_worker_shared = None
+
+
+def _attach_frame(shared_name, specs, index):
+    '''
+    Worker initializer of map_frame: view the shared block as a DataFrame
+    '''
+    global _worker_frame, _worker_shared
+    _worker_shared = _attach(shared_name)
+    columns = [_column_from_spec(_worker_shared, spec) for spec in specs]
+    for column in columns:
+        column.index = index
+    _worker_frame = pd.concat(columns, axis=1, copy=False) if columns \
+        else pd.DataFrame(index=index)
+
+
+def _run_item(func, item):
+    '''
+    Worker side of map_frame
+    '''
+    return func(_worker_frame, item)
+
+
+def _share_columns(df):
+    '''
+    Copy every numpy-backed column of df into one shared memory block
+
+    Output:
+    Return the SharedMemory object and a list with one spec per column:
+    either ('shared', name, dtype, offset, length) or ('pickled', series)
+    '''
+    # Python 3.8+, so only the process backend needs it
+    from multiprocessing import shared_memory
+    specs = []
+    offset = 0
+    layout = []
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind != 'O':
+            values = series.to_numpy()
+            layout.append((i, values, offset))
+            specs.append(('shared', series.name, values.dtype.str, offset,
+                          len(values)))
+            offset += values.nbytes
+        else:
+            specs.append(('pickled', series))
+
+    shared = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for i, values, start in layout:
+        target = np.ndarray(values.shape, dtype=values.dtype,
+                            buffer=shared.buf, offset=start)
+        target[:] = values
+    return shared, specs
+
+
+def _run_batch(func, shared_name, specs):
+    '''
+    Worker side of the process backend: rebuild each column from the
+    shared block (or its pickle) and apply func
+    '''
+    shared = _attach(shared_name)
+    try:
+        return [func(_column_from_spec(shared, spec)) for spec in specs]
+    finally:
+        shared.close()
+
+
+def _column_from_spec(shared, spec):
+    '''
+    Return the Series described by spec, viewing the shared block if needed
+    '''
+    if spec[0] == 'pickled':
+        return spec[1]
+    _, name, dtype, offset, length = spec
+    values = np.ndarray((length,), dtype=np.dtype(dtype), buffer=shared.buf,
+                        offset=offset)
+    return pd.Series(values, name=name, copy=False)
+
+
+def _attach(name):
+    '''
+    Attach to an existing shared memory block. The parent owns and unlinks
+    it; workers share the parent's resource tracker, so on Pythons without
+    the track argument registering it again is harmless.
+    '''
+    from multiprocessing import shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,139 @@
+import os
+import tempfile
+import unittest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib import cbook
+import pandas as pd
+import numpy as np
+from walkabout import plot
+
+
+class RenderTests(unittest.TestCase):
+    '''
+    Test the render function in plot.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(5)
+        self.df = pd.DataFrame({'a': rng.normal(size=500),
+                                'b': rng.choice(['x', 'y', None], 500),
+                                'c': rng.randint(0, 4, 500)})
+        self.df.loc[::7, 'a'] = np.nan
+        self.directory = tempfile.mkdtemp()
+        plt.close('all')
+
+    def test_writes_files_in_order(self):
+        specs = ['missingness_map',
+                 {'plot': 'boxplot', 'target': 'a', 'name': 'box'}]
+        paths = plot.render(self.df, specs, self.directory)
+        self.assertEqual([os.path.basename(path) for path in paths],
+                         ['00_missingness_map.png', 'box.png'])
+        for path in paths:
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(4), b'\x89PNG')
+        # nothing is left on the pyplot state
+        self.assertEqual(plt.get_fignums(), [])
+
+    def test_parallel_svg(self):
+        specs = ['univariate_distribution', 'null_correlation_heatmap',
+                 {'plot': 'boxplot', 'sample': 100, 'seed': 0}]
+        paths = plot.render(self.df, specs, self.directory, fmt='svg',
+                            n_jobs=2)
+        self.assertEqual(len(paths), 3)
+        for path in paths:
+            self.assertTrue(path.endswith('.svg'))
+            self.assertGreater(os.path.getsize(path), 0)
+
+    def test_unknown_plot(self):
+        with self.assertRaises(ValueError):
+            plot.render(self.df, ['render'], self.directory)
+
+
+class BoxStatsTests(unittest.TestCase):
+    '''
+    Test the boxplot summaries in plot.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(2)
+        self.values = pd.Series(rng.standard_t(3, 3001))
+        self.values[::10] = np.nan
+        self.labels = pd.Series(rng.choice([3, 1, 2], 3001))
+        self.rng = np.random.default_rng(0)
+
+    def assertMatchesMatplotlib(self, box, values):
+        expected = cbook.boxplot_stats(values.dropna().to_numpy())[0]
+        for key in ('q1', 'med', 'q3', 'whislo', 'whishi'):
+            self.assertAlmostEqual(box[key], expected[key])
+        self.assertEqual(sorted(box['fliers']), sorted(expected['fliers']))
+
+    def test_single_box(self):
+        box, = plot._box_stats(self.values, None, 10000, self.rng)
+        self.assertMatchesMatplotlib(box, self.values)
+
+    def test_grouped_boxes(self):
+        groups = plot._label_codes(self.labels, 10)
+        boxes = plot._box_stats(self.values, groups, 10000, self.rng)
+        # numeric labels are sorted like seaborn
+        self.assertEqual([box['label'] for box in boxes], ['1', '2', '3'])
+        for box in boxes:
+            self.assertMatchesMatplotlib(
+                box, self.values[self.labels == int(box['label'])])
+
+    def test_outliers_thinned(self):
+        box, = plot._box_stats(self.values, None, 5, self.rng)
+        self.assertEqual(len(box['fliers']), 7)
+        expected = cbook.boxplot_stats(self.values.dropna().to_numpy())[0]
+        self.assertEqual(box['fliers'].min(), expected['fliers'].min())
+        self.assertEqual(box['fliers'].max(), expected['fliers'].max())
+
+    def test_label_limit(self):
+        self.assertIsNone(plot._label_codes(self.values, 10))
+        self.assertIsNone(plot._label_codes(self.labels, 3))
+        codes, labels = plot._label_codes(pd.Series(['b', None, 'a']), 3)
+        self.assertEqual(labels, ['b', 'a'])
+        self.assertEqual(list(codes), [0, -1, 1])
+
+
+class TopLabelsTests(unittest.TestCase):
+    '''
+    Test the label cap of bivariate_categorical_distribution in plot.py
+    '''
+    def test_other_bucket(self):
+        table = pd.DataFrame({'no': [1, 9, 2, 8], 'yes': [1, 0, 5, 3]},
+                             index=pd.Index(list('abcd'), name='feature'))
+        top = plot._top_labels(table, 2)
+        self.assertEqual(list(top.index), ['b', 'd', 'Other (2)'])
+        self.assertEqual(top.loc['Other (2)'].tolist(), [3, 6])
+        self.assertEqual(top.index.name, 'feature')
+        self.assertIs(plot._top_labels(table, None), table)
+
+
+class ResidualPanelTests(unittest.TestCase):
+    '''
+    Test the residual plot panels in plot.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(9)
+        x = rng.uniform(0, 5, 2000)
+        self.df = pd.DataFrame({'x': x, 'y': 3 * x + rng.normal(0, 1, 2000)})
+        self.df.loc[::10, 'x'] = np.nan
+
+    def test_points_under_budget(self):
+        panel = plot._residual_panel(self.df, 'x', 'y', 5000, 50, 0)
+        x, residual = panel['points']
+        self.assertEqual(len(x), 1800)
+        self.assertAlmostEqual(residual.mean(), 0)
+        self.assertAlmostEqual(np.corrcoef(x, residual)[0, 1], 0)
+        self.assertEqual(len(panel['curve'][0]), 100)
+
+    def test_density_over_budget(self):
+        panel = plot._residual_panel(self.df, 'x', 'y', 500, 50, 0)
+        self.assertIsNone(panel['points'])
+        counts, x_edges, y_edges = panel['density']
+        self.assertEqual(counts.shape, (50, 50))
+        self.assertEqual(counts.sum(), 1800)
+
+
+if __name__ == '__main__':
+    unittest.main()
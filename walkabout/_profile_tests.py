@@ -0,0 +1,274 @@
+import unittest
+import pandas as pd
+import numpy as np
+from walkabout import profile
+
+
+class BuildProfileTests(unittest.TestCase):
+    '''
+    Test the build_profile function in profile.py
+    '''
+    def setUp(self):
+        self.df = pd.DataFrame({'a': [1.5, 2, np.nan, 8, -1, 3],
+                                'b': ['x', 'y', None, 'x', '?', 'x'],
+                                'c': [5, 5, 5, 5, 5, 5]})
+        self.profile = profile.build_profile(self.df)
+
+    def test_shape(self):
+        self.assertEqual(self.profile.shape, (6, 3))
+
+    def test_null_counts(self):
+        self.assertEqual([col.nulls for col in self.profile],
+                         list(self.df.isnull().sum()))
+
+    def test_nunique(self):
+        self.assertEqual([col.nunique for col in self.profile],
+                         list(self.df.nunique()))
+
+    def test_unique_values_match_series_unique(self):
+        self.assertEqual(self.profile['b'].unique_values,
+                         list(self.df['b'].unique()))
+
+    def test_unique_values_with_nan(self):
+        self.assertEqual(str(self.profile['a'].unique_values),
+                         str(list(self.df['a'].unique())))
+
+    def test_describe_matches_pandas(self):
+        expected = self.df.describe()
+        result = self.profile.describe()
+        self.assertEqual(list(result.columns), list(expected.columns))
+        self.assertTrue(np.allclose(result, expected))
+
+    def test_skew_and_kurtosis_match_pandas(self):
+        col = self.profile['a']
+        self.assertAlmostEqual(col.skew, self.df['a'].skew())
+        self.assertAlmostEqual(col.kurtosis, self.df['a'].kurtosis())
+
+    def test_constant_skew(self):
+        self.assertEqual(self.profile['c'].skew, 0)
+
+    def test_placeholder_hits(self):
+        self.assertEqual(self.profile['a'].placeholders, {-1: 1})
+        self.assertEqual(self.profile['b'].placeholders, {'?': 1})
+
+    def test_nullable_placeholders(self):
+        df = pd.DataFrame({'n': pd.array([1, -1, None, -999], dtype='Int64')})
+        col = profile.build_profile(df)['n']
+        self.assertEqual(col.placeholders, {-1: 1, -999: 1})
+        self.assertEqual(col.nulls, 1)
+
+    def test_value_counts(self):
+        self.assertEqual(dict(self.profile['b'].value_counts),
+                         {'x': 3, 'y': 1, '?': 1})
+
+    def test_empty_dataframe(self):
+        result = profile.build_profile(pd.DataFrame())
+        self.assertEqual(result.shape, (0, 0))
+
+
+class CategoricalProfileTests(unittest.TestCase):
+    '''
+    Test build_profile on categorical columns, which reuse their codes
+    '''
+    def setUp(self):
+        self.df = pd.DataFrame({'c': pd.Categorical(
+            ['b', None, 'c', 'b', 'a', 'c', 'b'], categories=list('dcba'))})
+        self.profile = profile.build_profile(self.df)
+
+    def test_unique_values_in_order_of_appearance(self):
+        self.assertEqual(str(self.profile['c'].unique_values),
+                         str(list(self.df['c'].unique())))
+        self.assertEqual(self.profile['c'].nunique, 3)
+
+    def test_value_counts_include_unseen_categories(self):
+        expected = self.df['c'].value_counts()
+        result = self.profile['c'].value_counts
+        self.assertEqual(result[expected.index].tolist(), expected.tolist())
+
+    def test_describe_without_numeric_columns(self):
+        expected = self.df.describe()
+        result = self.profile.describe()
+        self.assertEqual(result.astype(str).to_dict(),
+                         expected.astype(str).to_dict())
+
+
+class ParallelProfileTests(unittest.TestCase):
+    '''
+    Test build_profile with n_jobs > 1
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.df = pd.DataFrame({'c' + str(i): rng.normal(size=100)
+                                for i in range(9)})
+        self.df['s'] = rng.choice(['x', '?'], 100)
+        self.df['t'] = pd.date_range('2020-01-01', periods=100)
+        self.serial = profile.build_profile(self.df)
+
+    def check(self, result):
+        self.assertEqual(list(result.columns), list(self.df.columns))
+        for col in self.serial:
+            other = result[col.name]
+            self.assertEqual((other.count, other.nunique, other.placeholders),
+                             (col.count, col.nunique, col.placeholders))
+            self.assertEqual(str(other.mean), str(col.mean))
+
+    def test_threads(self):
+        self.check(profile.build_profile(self.df, n_jobs=3))
+
+    def test_processes(self):
+        self.check(profile.build_profile(self.df, n_jobs=2,
+                                         backend='process'))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            profile.build_profile(self.df, n_jobs=2, backend='gpu')
+
+
+class ApproximateProfileTests(unittest.TestCase):
+    '''
+    Test build_profile with approximate=True
+    '''
+    def setUp(self):
+        self.df = pd.DataFrame({'id': np.arange(5000),
+                                'c': ['a', 'b', None, 'a'] * 1250,
+                                'k': [np.nan] + [2.0] * 4999})
+        self.profile = profile.build_profile(self.df, approximate=True)
+
+    def test_high_cardinality_is_estimated(self):
+        col = self.profile['id']
+        self.assertEqual(col.nunique_exact, False)
+        self.assertLess(abs(col.nunique - 5000) / 5000, 4 * col.hll.error)
+        self.assertEqual(col.unique_values, list(range(10)))
+
+    def test_large_ids(self):
+        ids = pd.DataFrame({'id': np.int64(2 ** 60) + np.arange(200000)})
+        col = profile.build_profile(ids, approximate=True)['id']
+        self.assertLess(abs(col.nunique - 200000) / 200000,
+                        4 * col.hll.error)
+
+    def test_low_cardinality_is_exact(self):
+        col = self.profile['c']
+        self.assertEqual((col.nunique, col.nunique_exact), (2, True))
+        self.assertEqual(col.unique_values, ['a', 'b', None])
+
+    def test_constant_column(self):
+        col = self.profile['k']
+        self.assertEqual(col.nunique, 1)
+        self.assertEqual(str(col.unique_values), '[nan, 2.0]')
+
+    def test_nulls_and_moments_unchanged(self):
+        exact = profile.build_profile(self.df)
+        for col in exact:
+            self.assertEqual(self.profile[col.name].nulls, col.nulls)
+        self.assertAlmostEqual(self.profile['id'].std, exact['id'].std)
+
+    def test_placeholders(self):
+        self.assertEqual(profile.build_profile(
+            pd.DataFrame({'a': [-1, 2, -1]}), approximate=True)[
+                'a'].placeholders, {-1: 2})
+
+
+class MergeProfileTests(unittest.TestCase):
+    '''
+    Test merging profiles and build_profile_from_chunks in profile.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.df = pd.DataFrame({
+            'a': rng.exponential(size=200),
+            'b': rng.choice(['x', 'y', 'z', '?'], 200),
+            'c': rng.randint(0, 5, 200)})
+        self.df.loc[::7, 'a'] = np.nan
+        self.full = profile.build_profile(self.df)
+        self.chunked = profile.build_profile_from_chunks(
+            [self.df[:50], self.df[50:51], self.df[51:]])
+
+    def test_counts_match(self):
+        for col in self.full:
+            other = self.chunked[col.name]
+            self.assertEqual((col.count, col.nulls, col.nunique),
+                             (other.count, other.nulls, other.nunique))
+
+    def test_moments_match(self):
+        col = self.chunked['a']
+        self.assertAlmostEqual(col.mean, self.df['a'].mean())
+        self.assertAlmostEqual(col.std, self.df['a'].std())
+        self.assertAlmostEqual(col.skew, self.df['a'].skew())
+        self.assertAlmostEqual(col.kurtosis, self.df['a'].kurtosis())
+
+    def test_value_counts_match(self):
+        self.assertEqual(dict(self.chunked['b'].value_counts),
+                         dict(self.df['b'].value_counts()))
+
+    def test_quartiles_from_sketches(self):
+        expected = self.df['a'].quantile([.25, .5, .75])
+        result = self.chunked.describe()['a'][['25%', '50%', '75%']]
+        self.assertTrue(np.allclose(result, expected))
+
+    def test_placeholders_match(self):
+        self.assertEqual(self.chunked['b'].placeholders,
+                         self.full['b'].placeholders)
+
+    def test_max_labels_switches_to_estimate(self):
+        result = profile.build_profile_from_chunks(
+            [self.df[:100], self.df[100:]], max_labels=10)
+        self.assertEqual(result['a'].nunique_exact, False)
+        self.assertAlmostEqual(result['a'].nunique, self.df['a'].nunique(),
+                               delta=3)
+        self.assertEqual(result['b'].nunique_exact, True)
+
+    def test_missing_column_counts_as_nulls(self):
+        result = profile.build_profile_from_chunks(
+            [self.df[:100], self.df[100:].drop(columns='c')])
+        self.assertEqual(result['c'].nulls, 100)
+
+    def test_no_chunks(self):
+        self.assertEqual(profile.build_profile_from_chunks([]).shape, (0, 0))
+
+
+class SerializeProfileTests(unittest.TestCase):
+    '''
+    Test Profile.to_bytes, Profile.from_bytes and merge_profiles
+    '''
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'a': [1.5, np.nan, 3, 4, -1, 2],
+            'b': ['x', None, '?', 'x', 'y', 'x'],
+            'c': pd.date_range('2020-01-01', periods=6),
+            'd': [True, False, True, True, True, False]})
+
+    def test_round_trip(self):
+        before = profile.build_profile(self.df)
+        after = profile.Profile.from_bytes(before.to_bytes())
+        self.assertEqual(after.shape, before.shape)
+        for col in before:
+            other = after[col.name]
+            self.assertEqual(str(other.dtype), str(col.dtype))
+            self.assertEqual(other.placeholders, col.placeholders)
+            self.assertEqual(str(other.unique_values),
+                             str(col.unique_values))
+            self.assertEqual(list(other.value_counts),
+                             list(col.value_counts))
+        self.assertAlmostEqual(after['a'].kurtosis, before['a'].kurtosis)
+
+    def test_rejects_other_bytes(self):
+        with self.assertRaises(ValueError):
+            profile.Profile.from_bytes(b'not a profile')
+
+    def test_merge_serialized_shards(self):
+        shards = [profile.build_profile(self.df[i:i + 2]).to_bytes()
+                  for i in range(0, 6, 2)]
+        merged = profile.merge_profiles(shards)
+        full = profile.build_profile(self.df)
+        self.assertEqual(merged.shape, full.shape)
+        self.assertAlmostEqual(merged['a'].std, full['a'].std)
+        self.assertEqual([col.nunique for col in merged],
+                         [col.nunique for col in full])
+
+    def test_merge_nothing(self):
+        with self.assertRaises(ValueError):
+            profile.merge_profiles([])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+import pandas as pd
+import walkabout
+from walkabout import report, stream
+
+
+class EmptyFrameTests(unittest.TestCase):
+    '''
+    Test the reports on frames without rows
+    '''
+    def setUp(self):
+        self.df = pd.DataFrame({'a': pd.Series([], dtype=float),
+                                'b': pd.Series([], dtype=object)})
+
+    def run_report(self, func, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            func(*args)
+        return output.getvalue()
+
+    def test_nulls(self):
+        output = self.run_report(report.nulls, self.df)
+        self.assertIn('0.0%', output)
+
+    def test_rundown(self):
+        output = self.run_report(report.rundown, self.df)
+        self.assertIn('Rows: 0', output)
+
+    def test_header_only_chunks(self):
+        output = self.run_report(stream.nulls, [self.df])
+        self.assertIn('0.0%', output)
+
+    def test_no_chunks(self):
+        self.run_report(stream.rundown, [])
+
+
+class NullsTests(unittest.TestCase):
+    '''
+    Test the null correlation analysis of nulls in report.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        values = rng.normal(size=(200, 3))
+        values[values[:, 0] > .5, 1:] = np.nan
+        self.df = pd.DataFrame(values, columns=list('abc'))
+
+    def run_nulls(self, **kwargs):
+        with walkabout.profiling(memory=False) as recording:
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                report.nulls(self.df, **kwargs)
+        return output.getvalue(), set(recording.frame()['stage'])
+
+    def test_opt_in(self):
+        output, stages = self.run_nulls()
+        self.assertNotIn('null mask', stages)
+        self.assertNotIn('Nulls Correlate With', output)
+
+    def test_null_correlation(self):
+        output, stages = self.run_nulls(null_correlation=.5)
+        self.assertIn('null mask', stages)
+        self.assertIn('Nulls Correlate With', output)
+
+
+class AssessCategoricalsTests(unittest.TestCase):
+    '''
+    Test assess_categoricals in report.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.df = pd.DataFrame({'a': rng.normal(size=100),
+                                'b': rng.choice(['x', 'y'], 100),
+                                'c': rng.randint(0, 3, 100)})
+
+    def test_numeric_columns_not_profiled(self):
+        with walkabout.profiling(memory=False) as recording:
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                report.assess_categoricals(self.df)
+        self.assertEqual(list(recording.columns().index), ['b'])
+        self.assertIn('b', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
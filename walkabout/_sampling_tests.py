@@ -0,0 +1,125 @@
+import unittest
+import pandas as pd
+import numpy as np
+from walkabout import sampling, profile
+
+
+class SampleRowsTests(unittest.TestCase):
+    '''
+    Test the sample_rows function in sampling.py
+    '''
+    def setUp(self):
+        self.df = pd.DataFrame({'a': np.arange(1000)})
+
+    def test_size_and_order(self):
+        sample = sampling.sample_rows(self.df, 100, seed=0)
+        self.assertEqual(len(sample), 100)
+        self.assertTrue(sample['a'].is_monotonic_increasing)
+        self.assertEqual(sampling.population(sample), 1000)
+
+    def test_fraction(self):
+        self.assertEqual(len(sampling.sample_rows(self.df, .25)), 250)
+
+    def test_whole_frame(self):
+        self.assertIs(sampling.sample_rows(self.df, 5000), self.df)
+        self.assertEqual(sampling.population(self.df), 1000)
+
+    def test_resample_keeps_population(self):
+        sample = sampling.sample_rows(self.df, 100, seed=0)
+        self.assertEqual(sampling.population(
+            sampling.sample_rows(sample, 10, seed=0)), 1000)
+
+    def test_bad_fraction(self):
+        with self.assertRaises(ValueError):
+            sampling.sample_rows(self.df, 1.5)
+
+    def test_profile_population(self):
+        sample = sampling.sample_rows(self.df, 100, seed=0)
+        result = profile.build_profile(sample)
+        self.assertEqual((result.n_rows, result.population), (100, 1000))
+        self.assertTrue(result.sampled)
+        restored = profile.Profile.from_bytes(result.to_bytes())
+        self.assertEqual(restored.population, 1000)
+
+
+class ReservoirSampleTests(unittest.TestCase):
+    '''
+    Test the reservoir_sample function in sampling.py
+    '''
+    def chunks(self, n=1000, size=64):
+        df = pd.DataFrame({'a': np.arange(n)})
+        return (df.iloc[i:i + size] for i in range(0, n, size))
+
+    def test_size_and_population(self):
+        sample = sampling.reservoir_sample(self.chunks(), 50, seed=1)
+        self.assertEqual(len(sample), 50)
+        self.assertEqual(sample['a'].nunique(), 50)
+        self.assertTrue(sample['a'].is_monotonic_increasing)
+        self.assertEqual(sampling.population(sample), 1000)
+
+    def test_fewer_rows_than_reservoir(self):
+        sample = sampling.reservoir_sample(self.chunks(n=30), 50)
+        self.assertEqual(list(sample['a']), list(range(30)))
+
+    def test_uniform(self):
+        # every row should be about equally likely to be kept
+        hits = np.zeros(1000)
+        for seed in range(200):
+            sample = sampling.reservoir_sample(self.chunks(), 100, seed=seed)
+            hits[sample['a']] += 1
+        first, last = hits[:500].mean(), hits[500:].mean()
+        self.assertAlmostEqual(first, 20, delta=1.5)
+        self.assertAlmostEqual(last, 20, delta=1.5)
+
+
+class StratifiedSampleTests(unittest.TestCase):
+    '''
+    Test the stratified_sample function in sampling.py
+    '''
+    def setUp(self):
+        labels = ['a'] * 800 + ['b'] * 150 + ['c'] * 45 + [None] * 5
+        self.df = pd.DataFrame({'y': labels, 'x': np.arange(1000)})
+
+    def check(self, sample):
+        counts = sample['y'].value_counts()
+        self.assertEqual(len(sample), 100)
+        self.assertEqual(counts['a'], 80)
+        self.assertEqual(counts['b'], 15)
+        self.assertEqual(counts['c'], 4)
+        self.assertEqual(sample['y'].isnull().sum(), 1)
+
+    def test_frame(self):
+        self.check(sampling.stratified_sample(self.df, 'y', 100, seed=0))
+
+    def test_chunks(self):
+        chunks = (self.df.iloc[i:i + 70] for i in range(0, 1000, 70))
+        sample = sampling.stratified_sample(chunks, 'y', 100, seed=0)
+        self.check(sample)
+        self.assertTrue(sample['x'].is_monotonic_increasing)
+
+
+class IntervalTests(unittest.TestCase):
+    '''
+    Test the confidence interval helpers in sampling.py
+    '''
+    def test_proportion_interval(self):
+        low, high = sampling.proportion_interval(50, 500)
+        self.assertTrue(low < .1 < high)
+        narrow = sampling.proportion_interval(50, 500, population=600)
+        self.assertLess(narrow[1] - narrow[0], high - low)
+
+    def test_census_has_no_error(self):
+        low, high = sampling.proportion_interval(50, 500, population=500)
+        self.assertAlmostEqual(low, .1)
+        self.assertAlmostEqual(high, .1)
+        self.assertEqual(sampling.mean_margin(2.0, 500, 500), 0)
+
+    def test_correlation_interval(self):
+        low, high = sampling.correlation_interval(.5, 103)
+        self.assertTrue(low < .5 < high)
+        self.assertAlmostEqual(np.arctanh(high) - np.arctanh(.5), .196,
+                               places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
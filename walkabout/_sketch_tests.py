@@ -0,0 +1,120 @@
+import unittest
+import pandas as pd
+import numpy as np
+from walkabout import sketch
+
+
+class HyperLogLogTests(unittest.TestCase):
+    '''
+    Test the HyperLogLog sketch in sketch.py
+    '''
+    def test_empty(self):
+        self.assertEqual(sketch.HyperLogLog().estimate(), 0)
+
+    def test_small_cardinality_is_exact(self):
+        hll = sketch.HyperLogLog().add([1, 2, 3, 2, 1])
+        self.assertEqual(hll.estimate(), 3)
+
+    def test_large_cardinality_within_error(self):
+        hll = sketch.HyperLogLog().add(np.arange(200000))
+        self.assertLess(abs(hll.estimate() - 200000) / 200000,
+                        4 * hll.error)
+
+    def test_duplicates_ignored(self):
+        hll = sketch.HyperLogLog().add(np.arange(5000))
+        before = hll.estimate()
+        hll.add(np.arange(5000))
+        self.assertEqual(hll.estimate(), before)
+
+    def test_ints_and_floats_hash_alike(self):
+        a = sketch.HyperLogLog().add([1, 2, 3])
+        b = sketch.HyperLogLog().add([1.0, 2.0, 3.0])
+        self.assertEqual(list(a.registers), list(b.registers))
+
+    def test_large_ids(self):
+        # ids beyond 2**53 are distinct ints but collide as floats
+        ids = np.int64(1_400_000_000_000_000_000) + np.arange(200000)
+        hll = sketch.HyperLogLog().add(ids)
+        self.assertLess(abs(hll.estimate() - 200000) / 200000,
+                        4 * hll.error)
+        mixed = sketch.HyperLogLog().add(np.array([1.5, np.nan, 2.0, 2]))
+        self.assertEqual(mixed.estimate(), 3)
+
+    def test_strings(self):
+        hll = sketch.HyperLogLog().add(['a', 'b', 'a', 'c'])
+        self.assertEqual(hll.estimate(), 3)
+
+    def test_merge_is_union(self):
+        a = sketch.HyperLogLog().add(np.arange(0, 60000))
+        b = sketch.HyperLogLog().add(np.arange(30000, 90000))
+        merged = a.merge(b)
+        self.assertLess(abs(merged.estimate() - 90000) / 90000,
+                        4 * merged.error)
+
+    def test_merge_different_precision(self):
+        with self.assertRaises(ValueError):
+            sketch.HyperLogLog(10).merge(sketch.HyperLogLog(12))
+
+    def test_invalid_precision(self):
+        with self.assertRaises(ValueError):
+            sketch.HyperLogLog(30)
+
+    def test_round_trip(self):
+        hll = sketch.HyperLogLog(8).add(pd.Series(['x', 'y']))
+        other = sketch.HyperLogLog.from_dict(hll.to_dict())
+        self.assertEqual(list(other.registers), list(hll.registers))
+
+
+class KLLSketchTests(unittest.TestCase):
+    '''
+    Test the KLLSketch quantile sketch in sketch.py
+    '''
+    def setUp(self):
+        self.values = np.random.RandomState(0).lognormal(size=100000)
+        self.sorted = np.sort(self.values)
+
+    def rank_error(self, sketch, q):
+        estimate = sketch.quantile(q)
+        return abs(np.searchsorted(self.sorted, estimate) /
+                   len(self.sorted) - q)
+
+    def test_empty(self):
+        self.assertTrue(np.isnan(sketch.KLLSketch().quantile(.5)))
+
+    def test_small_input_is_exact(self):
+        values = pd.Series([10, .0003, -50, 1000, 0])
+        result = sketch.KLLSketch().add(values).quantile([.25, .5, .75])
+        self.assertEqual(list(result), list(values.quantile([.25, .5, .75])))
+
+    def test_ignores_nan(self):
+        result = sketch.KLLSketch().add([1, np.nan, 3])
+        self.assertEqual((result.count, result.quantile(.5)), (2, 2))
+
+    def test_large_input_rank_error(self):
+        kll = sketch.KLLSketch(seed=0).add(self.values)
+        self.assertLess(sum(len(level) for level in kll.levels), 1000)
+        for q in [.01, .25, .5, .75, .99]:
+            self.assertLess(self.rank_error(kll, q), .02)
+
+    def test_extremes_are_exact(self):
+        kll = sketch.KLLSketch().add(self.values)
+        self.assertEqual(kll.quantile(0), self.values.min())
+        self.assertEqual(kll.quantile(1), self.values.max())
+
+    def test_merge(self):
+        a = sketch.KLLSketch(seed=0).add(self.values[:50000])
+        b = sketch.KLLSketch(seed=1).add(self.values[50000:])
+        merged = a.merge(b)
+        self.assertEqual(merged.count, len(self.values))
+        for q in [.25, .5, .75]:
+            self.assertLess(self.rank_error(merged, q), .02)
+
+    def test_round_trip(self):
+        kll = sketch.KLLSketch().add(self.values)
+        other = sketch.KLLSketch.from_dict(kll.to_dict())
+        self.assertEqual(list(other.quantile([.1, .9])),
+                         list(kll.quantile([.1, .9])))
+
+
+if __name__ == '__main__':
+    unittest.main()
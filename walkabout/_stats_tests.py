@@ -0,0 +1,425 @@
+import tracemalloc
+import unittest
+import pandas as pd
+import numpy as np
+from sklearn.feature_selection import f_regression, f_classif
+from walkabout import stats
+
+
+class NumericMomentsTests(unittest.TestCase):
+    '''
+    Test the numeric_moments function in stats.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(2)
+        self.df = pd.DataFrame(rng.exponential(size=(100, 5)),
+                               columns=list('abcde'))
+        self.df.iloc[::7, 1] = np.nan
+        self.df['e'] = 4.0
+        self.df['f'] = np.nan
+        self.df['g'] = rng.randint(0, 9, 100)
+        self.df['h'] = 'text'
+        self.moments = stats.numeric_moments(self.df, block_size=3)
+
+    def test_features(self):
+        self.assertEqual(list(self.moments.index), list('abcdefg'))
+
+    def test_matches_pandas(self):
+        numeric = self.df.select_dtypes(include='number')
+        expected = pd.DataFrame({'count': numeric.count(),
+                                 'mean': numeric.mean(),
+                                 'std': numeric.std(),
+                                 'min': numeric.min(),
+                                 'max': numeric.max(),
+                                 'skew': numeric.skew(),
+                                 'kurtosis': numeric.kurtosis()})
+        result = self.moments[expected.columns]
+        self.assertTrue(np.allclose(result, expected, equal_nan=True))
+
+    def test_row_slices_match(self):
+        default, stats.BLOCK_VALUES = stats.BLOCK_VALUES, 7
+        try:
+            sliced = stats.numeric_moments(self.df, block_size=3)
+        finally:
+            stats.BLOCK_VALUES = default
+        pd.testing.assert_frame_equal(sliced, self.moments)
+
+    def test_memory_bounded_by_block(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame(rng.normal(size=(200000, 10)))
+        df[10] = pd.array(rng.randint(0, 5, 200000), dtype='Int64')
+        df.iloc[::3, 2] = np.nan
+        default, stats.BLOCK_VALUES = stats.BLOCK_VALUES, 1 << 14
+        tracemalloc.start()
+        try:
+            moments = stats.numeric_moments(df)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            stats.BLOCK_VALUES = default
+        # the frame holds 17MB, a slice 128KB
+        self.assertLess(peak, 2 * 2 ** 20)
+        self.assertTrue(np.allclose(moments['skew'],
+                                    df.astype(float).skew()))
+
+    def test_scalar_skew_and_kurtosis(self):
+        self.assertTrue(np.isnan(stats.skew(2, 1.0, 0.0)))
+        self.assertEqual(stats.kurtosis(10, 0.0, 0.0), 0.0)
+
+
+class CorrelationPairsTests(unittest.TestCase):
+    '''
+    Test the correlation_pairs function in stats.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        base = rng.normal(size=(300, 4))
+        values = np.repeat(base, 5, axis=1) + \
+            rng.normal(scale=.8, size=(300, 20))
+        self.df = pd.DataFrame(values,
+                               columns=['f' + str(i) for i in range(20)])
+
+    def expected(self, df, threshold, method='pearson'):
+        corr = df.corr(method=method)
+        cols = corr.columns
+        return {(cols[i], cols[j]): corr.iloc[i, j]
+                for i in range(len(cols)) for j in range(i + 1, len(cols))
+                if abs(corr.iloc[i, j]) > threshold}
+
+    def check(self, df, threshold=.5, method='pearson', **kwargs):
+        pairs = stats.correlation_pairs(df, threshold, method, **kwargs)
+        expected = self.expected(df, threshold, method)
+        result = {(a, b): value for a, b, value in
+                  pairs.itertuples(index=False)}
+        self.assertEqual(set(result), set(expected))
+        for key in expected:
+            self.assertAlmostEqual(result[key], expected[key], places=6)
+        return pairs
+
+    def test_matches_pandas(self):
+        self.check(self.df)
+
+    def test_small_blocks(self):
+        self.check(self.df, block_size=3)
+
+    def test_missing_values(self):
+        df = self.df.mask(np.random.RandomState(1).rand(*self.df.shape) < .1)
+        self.check(df, block_size=7)
+
+    def test_missing_values_in_some_blocks(self):
+        df = self.df.copy()
+        df.iloc[::3, 2] = np.nan
+        df.iloc[::5, 14] = np.nan
+        default, stats.BLOCK_VALUES = stats.BLOCK_VALUES, 50
+        try:
+            self.check(df, block_size=7)
+        finally:
+            stats.BLOCK_VALUES = default
+
+    def test_memory_bounded_by_block(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame(rng.normal(size=(100000, 20)))
+        df.iloc[::3, 2] = np.nan
+        default, stats.BLOCK_VALUES = stats.BLOCK_VALUES, 1 << 14
+        tracemalloc.start()
+        try:
+            stats.correlation_pairs(df, block_size=4)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            stats.BLOCK_VALUES = default
+        # the frame holds 16MB, two standardized blocks and a mask 10MB
+        self.assertLess(peak, 12 * 2 ** 20)
+
+    def test_spearman(self):
+        self.check(self.df, method='spearman', block_size=6)
+
+    def test_float32(self):
+        self.check(self.df, dtype=np.float32)
+
+    def test_sorted_by_absolute_value(self):
+        df = pd.DataFrame({'a': [1, 2, 3, 4], 'b': [4, 3, 2, 1.5],
+                           'c': [1, 2, 3, 5]})
+        pairs = self.check(df, .1)
+        values = list(pairs['Value'].abs())
+        self.assertEqual(values, sorted(values, reverse=True))
+
+    def test_constant_and_non_numeric_columns_skipped(self):
+        df = self.df.assign(k=1.0, s='x')
+        pairs = stats.correlation_pairs(df, .5)
+        self.assertFalse({'k', 's'} & set(pairs['Feature 1']) |
+                         set(pairs['Feature 2']) & {'k', 's'})
+
+    def test_no_pairs(self):
+        pairs = stats.correlation_pairs(self.df, .99)
+        self.assertEqual(list(pairs.columns),
+                         ['Feature 1', 'Feature 2', 'Value'])
+        self.assertEqual(len(pairs), 0)
+
+
+class InteractionFScoresTests(unittest.TestCase):
+    '''
+    Test the interaction_f_scores function in stats.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = pd.DataFrame(rng.normal(size=(200, 6)),
+                              columns=list('abcdef'))
+        self.X['k'] = 1.0
+        self.y_reg = self.X['a'] * self.X['b'] + rng.normal(size=200)
+        self.y_clas = np.where(self.X['c'] * self.X['d'] > 0, 'x', 'y')
+
+    def expanded(self):
+        cols = list(self.X.columns)
+        data = {}
+        for i in range(len(cols)):
+            for j in range(i, len(cols)):
+                name = cols[i] + ('^2' if i == j else ' * ' + cols[j])
+                data[name] = self.X[cols[i]] * self.X[cols[j]]
+        return pd.DataFrame(data)
+
+    def check(self, y, model, score_func, **kwargs):
+        expanded = self.expanded()
+        expected = pd.Series(score_func(expanded, y)[0],
+                             index=expanded.columns)
+        result = stats.interaction_f_scores(self.X, y, model, **kwargs)
+        self.assertEqual(sorted(result.index), sorted(expected.index))
+        self.assertTrue(np.allclose(result['Score'],
+                                    expected[result.index], equal_nan=True))
+        return result
+
+    def test_regression_matches_sklearn(self):
+        result = self.check(self.y_reg, 'reg', f_regression, block_size=5)
+        self.assertEqual(result.index[0], 'a * b')
+
+    def test_classification_matches_sklearn(self):
+        result = self.check(self.y_clas, 'clas', f_classif, block_size=4,
+                            n_jobs=2)
+        self.assertEqual(result.index[0], 'c * d')
+
+    def test_top_k(self):
+        full = stats.interaction_f_scores(self.X, self.y_reg)
+        top = stats.interaction_f_scores(self.X, self.y_reg, k=3,
+                                         block_size=2)
+        self.assertEqual(list(top.index), list(full.index[:3]))
+
+    def test_unknown_model(self):
+        with self.assertRaises(ValueError):
+            stats.interaction_f_scores(self.X, self.y_reg, model='svm')
+
+    def test_missing_values_rejected(self):
+        X = self.X.copy()
+        X.iloc[5, 0] = np.nan
+        for y, model in ((self.y_reg, 'reg'), (self.y_clas, 'clas')):
+            with self.assertRaisesRegex(ValueError, 'Input X contains NaN'):
+                stats.interaction_f_scores(X, y, model)
+        with self.assertRaisesRegex(ValueError, 'Input y contains NaN'):
+            stats.interaction_f_scores(self.X, self.y_reg.where(
+                self.y_reg > -3), 'reg')
+
+
+class FScorerTests(unittest.TestCase):
+    '''
+    Test the FScorer class in stats.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(1)
+        self.X = pd.DataFrame(rng.normal(size=(300, 5)), columns=list('abcde'))
+        self.y_reg = 2 * self.X['a'] + rng.normal(size=300)
+        self.y_clas = pd.Series(np.where(self.X['b'] > .5, 'hi',
+                                         np.where(self.X['b'] < -.5, 'lo',
+                                                  'mid')))
+
+    def chunked(self, y, model, sizes):
+        scorer = stats.FScorer(model)
+        start = 0
+        for size in sizes:
+            scorer.partial_fit(self.X.iloc[start:start + size],
+                               y.iloc[start:start + size])
+            start += size
+        return scorer
+
+    def test_regression_chunks_match_sklearn(self):
+        scores = self.chunked(self.y_reg, 'reg', [7, 93, 200]).scores()
+        self.assertEqual(scores.dtype, np.float64)
+        self.assertTrue(np.allclose(scores, f_regression(self.X,
+                                                         self.y_reg)[0]))
+
+    def test_missing_values_rejected(self):
+        X = self.X.copy()
+        X.iloc[3, 0] = np.nan
+        with self.assertRaisesRegex(ValueError, 'Input X contains NaN'):
+            stats.FScorer('reg').partial_fit(X, self.y_reg)
+        X.iloc[3, 0] = np.inf
+        with self.assertRaisesRegex(ValueError, 'infinity'):
+            stats.FScorer('clas').partial_fit(X, self.y_clas)
+        with self.assertRaisesRegex(ValueError, 'Input y contains NaN'):
+            stats.FScorer('clas').partial_fit(
+                self.X, self.y_clas.where(self.X['c'] > -2))
+
+    def test_constant_feature_scores_zero(self):
+        scores = stats.FScorer('reg').partial_fit(
+            self.X.assign(k=1.0), self.y_reg).scores()
+        self.assertEqual(scores['k'], 0.0)
+        self.assertEqual(scores.idxmax(), 'a')
+
+    def test_classification_chunks_match_sklearn(self):
+        # the first chunk is too small to see every class
+        scores = self.chunked(self.y_clas, 'clas', [3, 150, 147]).scores()
+        self.assertEqual(list(scores.index), list(self.X.columns))
+        self.assertTrue(np.allclose(scores, f_classif(self.X,
+                                                      self.y_clas)[0]))
+
+    def test_merge(self):
+        first = self.chunked(self.y_clas.iloc[:10], 'clas', [10])
+        second = stats.FScorer('clas').partial_fit(self.X.iloc[10:],
+                                                   self.y_clas.iloc[10:])
+        merged = first.merge(second)
+        self.assertTrue(np.allclose(merged.scores(),
+                                    f_classif(self.X, self.y_clas)[0]))
+
+    def test_mismatched_columns(self):
+        scorer = stats.FScorer().partial_fit(self.X, self.y_reg)
+        with self.assertRaises(ValueError):
+            scorer.partial_fit(self.X[['a', 'b']], self.y_reg)
+
+
+class BinnedDistributionTests(unittest.TestCase):
+    '''
+    Test the BinnedDistribution class in stats.py
+    '''
+    def setUp(self):
+        self.values = np.random.RandomState(3).normal(size=20000)
+
+    def test_matches_numpy_histogram(self):
+        binned = stats.BinnedDistribution(64).add(self.values)
+        counts, edges = np.histogram(self.values, 64)
+        self.assertTrue(np.array_equal(binned.counts, counts))
+        self.assertTrue(np.allclose(binned.edges, edges))
+
+    def test_chunks_widen_grid(self):
+        binned = stats.BinnedDistribution(64)
+        for chunk in np.array_split(np.sort(self.values)[::-1], 7):
+            binned.add(chunk)
+        self.assertEqual(binned.counts.sum(), len(self.values))
+        self.assertLessEqual(binned.low, self.values.min())
+        self.assertGreaterEqual(binned.edges[-1] + 1e-9, self.values.max())
+        self.assertAlmostEqual(binned.std, self.values.std(ddof=1))
+
+    def test_histogram_bins(self):
+        counts, edges = stats.BinnedDistribution().add(
+            self.values).histogram(16)
+        self.assertEqual(len(counts), 16)
+        self.assertEqual(counts.sum(), len(self.values))
+
+    def test_kde(self):
+        from scipy.stats import gaussian_kde
+        binned = stats.BinnedDistribution().add(self.values[:2000])
+        x, density = binned.kde()
+        self.assertAlmostEqual(density.sum() * binned.width, 1, places=3)
+        expected = gaussian_kde(self.values[:2000])(x)
+        self.assertLess(np.abs(density - expected).max(), .005)
+
+    def test_constant_and_empty(self):
+        counts, edges = stats.BinnedDistribution().add([5, 5]).histogram()
+        self.assertEqual(counts.tolist(), [2])
+        self.assertTrue(edges[0] <= 5 <= edges[1])
+        self.assertEqual(len(stats.BinnedDistribution().kde()[0]), 0)
+
+
+class UnivariateAggregatesTests(unittest.TestCase):
+    '''
+    Test the univariate_aggregates function in stats.py
+    '''
+    def test_chunks(self):
+        df = pd.DataFrame({'a': np.arange(10.0), 'b': list('xxyzyxxzwx')})
+        chunks = (df.iloc[i:i + 3] for i in range(0, 10, 3))
+        aggregates = stats.univariate_aggregates(chunks)
+        self.assertEqual(aggregates['a'].counts.sum(), 10)
+        self.assertEqual(aggregates['b'].to_dict(),
+                         df['b'].value_counts().to_dict())
+        self.assertEqual(list(aggregates['b'].index), list('xyzw'))
+
+
+class CategoricalCrosstabsTests(unittest.TestCase):
+    '''
+    Test the categorical_crosstabs function in stats.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(8)
+        self.df = pd.DataFrame({'hue': rng.choice(['b', 'a', None], 900),
+                                'c': rng.choice(['x', 'y', 'z', None], 900),
+                                'n': rng.normal(size=900)})
+        self.tables = stats.categorical_crosstabs(self.df, 'hue')
+
+    def test_matches_pandas(self):
+        self.assertEqual(list(self.tables), ['hue', 'c'])
+        expected = pd.crosstab(self.df['c'], self.df['hue'])
+        table = self.tables['c']
+        self.assertEqual(list(table.columns), list(pd.unique(
+            self.df['hue'].dropna())))
+        self.assertTrue(table.loc[expected.index, expected.columns].equals(
+            expected))
+
+    def test_chunks_match_frame(self):
+        chunks = (self.df.iloc[i:i + 100] for i in range(0, 900, 100))
+        chunked = stats.categorical_crosstabs(chunks, 'hue')
+        for column, table in self.tables.items():
+            self.assertTrue(chunked[column].equals(table))
+
+    def test_numeric_hue_sorted(self):
+        df = self.df.assign(hue=np.tile([3, 1, 2], 300))
+        table = stats.categorical_crosstabs(df, 'hue')['c']
+        self.assertEqual(list(table.columns), [1, 2, 3])
+        self.assertEqual(table.to_numpy().sum(), self.df['c'].count())
+
+
+class LowessTests(unittest.TestCase):
+    '''
+    Test the lowess function in stats.py
+    '''
+    def setUp(self):
+        rng = np.random.RandomState(6)
+        self.x = np.sort(rng.uniform(0, 10, 300))
+        self.y = np.sin(self.x / 2) + rng.normal(0, .2, 300)
+        self.y[::30] += 10
+
+    def naive(self, frac=2/3, iterations=3):
+        '''
+        Cleveland's algorithm with a separate weighted fit at every point
+        '''
+        x, y = self.x, self.y
+        k = int(np.ceil(frac * len(x)))
+        robust = np.ones(len(x))
+        for step in range(iterations + 1):
+            fitted = np.empty(len(x))
+            for i, point in enumerate(x):
+                distance = np.abs(x - point)
+                reach = np.partition(distance, k - 1)[k - 1]
+                w = np.clip(1 - (distance / reach) ** 3, 0, None) ** 3
+                slope, intercept = np.polyfit(x, y, 1,
+                                              w=np.sqrt(w * robust))
+                fitted[i] = intercept + slope * point
+            residual = y - fitted
+            scale = np.median(np.abs(residual))
+            robust = np.clip(1 - (residual / (6 * scale)) ** 2, 0,
+                             None) ** 2
+        return fitted
+
+    def test_matches_naive_at_every_point(self):
+        grid, fitted = stats.lowess(self.x, self.y, n_eval=len(self.x))
+        self.assertTrue(np.allclose(np.interp(self.x, grid, fitted),
+                                    self.naive()))
+
+    def test_ignores_outliers(self):
+        grid, fitted = stats.lowess(self.x, self.y, frac=.3)
+        self.assertEqual(len(grid), 100)
+        self.assertLess(np.abs(fitted - np.sin(grid / 2)).max(), .3)
+
+    def test_empty(self):
+        grid, fitted = stats.lowess([], [])
+        self.assertEqual((len(grid), len(fitted)), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -43,6 +43,36 @@ class SupportOutlierMaskTests(unittest.TestCase):
         outcome = pd.Series([False, False, True, False, False])
         self.assertEqual(list(support.outlier_mask(sample)), list(outcome))
 
+    def test_precomputed_quartiles(self):
+        sample = pd.Series([1, 2, 100, 4, 5])
+        self.assertEqual(
+            list(support.outlier_mask(sample, sketch=QuartileStub(2, 5))),
+            [False, False, True, False, False])
+
+
+class QuartileStub:
+    '''
+    Stand-in for a quantile sketch that returns fixed quartiles
+    '''
+    def __init__(self, q1, q3, q2=None):
+        self.values = {.25: q1, .5: q2, .75: q3}
+
+    def quantile(self, q):
+        return [self.values[item] for item in q]
+
+
+class SupportOutlierFencesTests(unittest.TestCase):
+    '''
+    Test the outlier_fences function in support.py
+    '''
+    def test_steady_step_values(self):
+        sample = pd.Series([1, 2, 3, 4, 5])
+        self.assertEqual(support.outlier_fences(sample), (-1, 7))
+
+    def test_precomputed_sketch(self):
+        self.assertEqual(
+            support.outlier_fences(sketch=QuartileStub(2, 4)), (-1, 7))
+
 
 class SupportTrimeanTests(unittest.TestCase):
     '''
@@ -74,6 +104,13 @@ class SupportTrimeanTests(unittest.TestCase):
                                'C': [.01, .1, .001, 1, 10]})
         self.assertEqual(list(support.trimean(sample)), [3, 10, .3025])
 
+    def test_precomputed_sketch(self):
+        self.assertEqual(support.trimean(sketch=QuartileStub(20, 40, 30)), 30)
+
+    def test_dict_of_sketches(self):
+        sketches = {'A': QuartileStub(2, 4, 3), 'B': QuartileStub(0, 0, 0)}
+        self.assertEqual(list(support.trimean(sketch=sketches)), [3, 0])
+
 
 class SupportVarianceCoefficientTests(unittest.TestCase):
     '''
@@ -232,6 +269,44 @@ class PlaceholdToNanTests(unittest.TestCase):
         sample = pd.DataFrame({'a': [1, 2, 3, 4, 5]})
         self.assertEqual(list(support.placehold_to_nan(sample, [6])['a']), list(sample['a']))
 
+    def test_inplace(self):
+        sample = pd.DataFrame({'a': [1, -1, 3], 'b': ['x', '?', 'y']})
+        self.assertEqual(support.placehold_to_nan(sample, inplace=True), None)
+        self.assertEqual(list(sample.isnull().sum()), [1, 1])
+
+    def test_original_unchanged(self):
+        sample = pd.DataFrame({'a': [1, -1, 3]})
+        support.placehold_to_nan(sample)
+        self.assertEqual(list(sample['a']), [1, -1, 3])
+
+    def test_series_input(self):
+        sample = pd.Series(['a', 'null', 'b'])
+        self.assertEqual(
+            list(support.placehold_to_nan(sample).isnull()),
+            [False, True, False])
+
+
+class PlaceholderCountsTests(unittest.TestCase):
+    '''
+    Test the placeholder_counts function in support.py
+    '''
+    def test_counts(self):
+        sample = pd.DataFrame({'a': [-1, 2, -1], 'b': ['?', '?', 'None']})
+        counts = support.placeholder_counts(sample)
+        self.assertEqual(counts.loc['a', -1], 2)
+        self.assertEqual(counts.loc['b', '?'], 2)
+        self.assertEqual(counts.loc['b', 'None'], 1)
+
+    def test_strings_skipped_on_numeric(self):
+        sample = pd.DataFrame({'a': [1.5, np.inf, -999]})
+        counts = support.placeholder_counts(sample, ['inf', np.inf, -999])
+        self.assertEqual(list(counts.loc['a']), [0, 1, 1])
+
+    def test_bool_feature(self):
+        sample = pd.DataFrame({'a': [True, False]})
+        counts = support.placeholder_counts(sample, [1, 0, -1])
+        self.assertEqual(list(counts.loc['a']), [0, 0, 0])
+
 if __name__ == '__main__':
     unittest.main()
  
\ No newline at end of file
@@ -0,0 +1,214 @@
+'''
+Memoize statistics of DataFrames that are reported on more than once
+
+Every column is fingerprinted by hashing its name, dtype and values, and
+results are stored under keys built from the fingerprints of the columns
+they were computed from. A report on an unchanged frame reuses every
+entry, and editing one column only invalidates the entries that read it.
+
+Caching is off until enable() is called:
+
+    import walkabout as wa
+    wa.cache.enable(max_bytes=512 * 2 ** 20)
+    wa.report.rundown(df)   # computes and stores column profiles
+    wa.report.nulls(df)     # reuses them
+'''
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['Cache', 'enable', 'disable', 'active', 'fingerprint']
+
+
+MAX_BYTES = 256 * 2 ** 20
+
+_active = None
+
+
+class Cache:
+    '''
+    Least recently used store of computed results within a memory budget,
+    optionally persisted to disk. Values are kept pickled, so every get
+    returns a fresh copy that callers may modify.
+
+    Input:
+    max_bytes: int, default 256MB. Budget for the pickled values held in
+               memory; the least recently used are dropped beyond it
+    directory: string or None, default None. Folder to also write every
+               entry to, so entries survive restarts and are shared by
+               processes using the same folder. It is not size limited.
+    sample: int or None, default None. Rows hashed per column when
+            fingerprinting. None hashes every row. An int hashes that many
+            evenly spaced rows, which is much faster on large frames but
+            misses edits to the rows in between.
+    '''
+    def __init__(self, max_bytes=MAX_BYTES, directory=None, sample=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.sample = sample
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries or (
+            self.directory is not None and os.path.exists(self._path(key)))
+
+    def column_key(self, series):
+        '''
+        Fingerprint of a column, see fingerprint()
+        '''
+        return fingerprint(series, self.sample)
+
+    def key(self, kind, *parts):
+        '''
+        Build an entry key from the kind of result and everything it
+        depends on, such as column fingerprints and options
+
+        Output:
+        Return a string
+        '''
+        digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+        return f'{kind}-{digest}'
+
+    def get(self, key):
+        '''
+        Output:
+        Return the value stored under key, or None if there is none
+        '''
+        data = self.entries.get(key)
+        if data is not None:
+            self.entries.move_to_end(key)
+        elif self.directory is not None:
+            data = self._read(key)
+            if data is not None:
+                self._hold(key, data)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(data)
+
+    def put(self, key, value):
+        '''
+        Store value under key, evicting the least recently used entries
+        that no longer fit in the budget
+
+        Output:
+        Return value
+        '''
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._hold(key, data)
+        if self.directory is not None:
+            # write then rename, so readers never see half a file
+            path = self._path(key)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        return value
+
+    def clear(self):
+        '''
+        Drop every entry held in memory. Files in directory are kept.
+        '''
+        self.entries.clear()
+        self.size = 0
+
+    def _hold(self, key, data):
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+        if len(data) > self.max_bytes:
+            return
+        self.entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, dropped = self.entries.popitem(last=False)
+            self.size -= len(dropped)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+def fingerprint(series, sample=None):
+    '''
+    Hex digest identifying a column by its name, dtype, length and values.
+    The index is not included.
+
+    Numpy-backed columns hash their raw bytes. Object and extension columns
+    hash the values from Pandas.util.hash_pandas_object. Categorical columns
+    also hash their categories and whether they are ordered, since unused
+    categories show in value counts.
+
+    Input:
+    series: Pandas Series object
+    sample: int or None, hash only this many evenly spaced rows
+
+    Output:
+    Return a string
+    '''
+    dtype = series.dtype
+    header = (series.name, str(dtype), len(series))
+    if isinstance(dtype, pd.CategoricalDtype):
+        header += (dtype.ordered, str(dtype.categories.dtype))
+    digest = hashlib.sha1(repr(header).encode())
+    if isinstance(dtype, pd.CategoricalDtype):
+        digest.update(pd.util.hash_pandas_object(
+            dtype.categories, index=False).to_numpy().view(np.uint8))
+    if sample is not None and len(series) > sample:
+        series = series.iloc[np.linspace(0, len(series) - 1,
+                                         sample).astype(np.int64)]
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind not in 'OV':
+        values = np.ascontiguousarray(series.to_numpy())
+    else:
+        values = pd.util.hash_pandas_object(series, index=False).to_numpy()
+    digest.update(values.view(np.uint8))
+    return digest.hexdigest()
+
+
+def enable(max_bytes=MAX_BYTES, directory=None, sample=None):
+    '''
+    Start caching the column profiles, numeric moments, correlation tiles
+    and null masks that reports and plots compute
+
+    Input:
+    max_bytes, directory, sample: see Cache
+
+    Output:
+    Return the new active Cache object
+    '''
+    global _active
+    _active = Cache(max_bytes, directory, sample)
+    return _active
+
+
+def disable():
+    '''
+    Stop caching and drop the active cache
+    '''
+    global _active
+    _active = None
+
+
+def active():
+    '''
+    Output:
+    Return the active Cache object, or None when caching is off
+    '''
+    return _active
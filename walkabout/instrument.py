@@ -0,0 +1,200 @@
+'''
+Opt-in instrumentation of the stages reports go through, and of every column
+
+Inside a profiling() block, each stage records its wall time, CPU time and
+peak allocation:
+
+    import walkabout as wa
+    with wa.profiling() as recording:
+        wa.report.rundown(df)
+    recording.frame()     # one row per stage
+    recording.columns()   # cost of profiling each column, costliest first
+
+Outside of a block, stage() returns a shared no-op context, so the
+instrumented code runs at full speed.
+'''
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+import pandas as pd
+
+
+__all__ = ['profiling', 'stage', 'staged', 'Recording']
+
+
+COLUMNS = ['stage', 'column', 'parent', 'wall', 'cpu', 'peak_bytes']
+
+_recordings = []
+_open = {}
+_lock = threading.Lock()
+_local = threading.local()
+_NULL = nullcontext()
+
+
+class Recording:
+    '''
+    The stages timed inside one profiling() block
+
+    Input:
+    callback: function or None, called with the dict of each stage as soon
+              as it finishes, with the keys in COLUMNS
+    memory: bool, whether peak allocations are traced
+    '''
+    def __init__(self, callback=None, memory=True):
+        self.callback = callback
+        self.memory = memory
+        self.records = []
+
+    def add(self, record):
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def frame(self):
+        '''
+        Output:
+        Return a Pandas DataFrame with a row per stage in the order they
+        finished, and the columns:
+        stage: name of the stage
+        column: the column the stage worked on, or None
+        parent: name of the enclosing stage, or None
+        wall: seconds elapsed
+        cpu: seconds of CPU used by the thread that ran the stage
+        peak_bytes: most memory allocated during the stage on top of what
+                    was allocated when it started, or None without memory
+        '''
+        return pd.DataFrame(self.records, columns=COLUMNS)
+
+    def columns(self):
+        '''
+        Total cost of profiling each column, to find the columns that
+        dominate a report
+
+        Output:
+        Return a Pandas DataFrame indexed by column, with the summed wall
+        and cpu seconds and the largest peak_bytes, costliest first
+        '''
+        frame = self.frame()
+        frame = frame[frame['stage'] == 'column']
+        totals = frame.groupby('column', sort=False, dropna=False).agg(
+            {'wall': 'sum', 'cpu': 'sum', 'peak_bytes': 'max'})
+        return totals.sort_values('wall', ascending=False)
+
+
+@contextmanager
+def profiling(callback=None, memory=True):
+    '''
+    Record the stages and columns of every report run inside the block
+
+    Columns profiled in worker processes (backend='process') are not
+    recorded. With threads, CPU time is per thread and peaks are for the
+    whole process.
+
+    Input:
+    callback: function or None, called with the dict of each stage as soon
+              as it finishes
+    memory: bool, default True. Trace peak allocations with tracemalloc.
+            Tracing slows down stages that allocate many Python objects,
+            such as hashing text labels, many times over, so compare
+            times from a run with memory=False
+
+    Output:
+    Yield a Recording object
+    '''
+    recording = Recording(callback, memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    _recordings.append(recording)
+    try:
+        yield recording
+    finally:
+        _recordings.remove(recording)
+        if started:
+            tracemalloc.stop()
+
+
+def stage(name, column=None):
+    '''
+    Context that records a stage when profiling() is active
+
+    Input:
+    name: string, name of the stage
+    column: name of the column the stage works on, if any
+
+    Output:
+    Return a context manager
+    '''
+    if not _recordings:
+        return _NULL
+    return _timed(name, column)
+
+
+def staged(func):
+    '''
+    Decorator recording every call of func as a stage named after it
+    '''
+    name = func.__name__.lstrip('_')
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with stage(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def _timed(name, column):
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    tracing = tracemalloc.is_tracing()
+    entry = {'peak': 0, 'start': 0}
+    if tracing:
+        with _lock:
+            _fold_peak()
+            entry['start'] = entry['peak'] = \
+                tracemalloc.get_traced_memory()[0]
+            _open[id(entry)] = entry
+    parent = stack[-1] if stack else None
+    stack.append(name)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall
+        cpu = time.thread_time() - cpu
+        stack.pop()
+        peak = None
+        if tracing:
+            with _lock:
+                if tracemalloc.is_tracing():
+                    _fold_peak()
+                    peak = entry['peak'] - entry['start']
+                del _open[id(entry)]
+        record = dict(zip(COLUMNS, (name, column, parent, wall, cpu, peak)))
+        for recording in list(_recordings):
+            recording.add(record)
+
+
+def _fold_peak():
+    '''
+    Credit the peak traced since the last reset to every open stage, then
+    start a new peak, so nested stages each keep their own
+    '''
+    current, peak = tracemalloc.get_traced_memory()
+    for entry in _open.values():
+        entry['peak'] = max(entry['peak'], peak)
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+        return
+    # before Python 3.9 only a restart starts a new peak; it forgets the
+    # traced blocks, so the open stages count from the new zero
+    frames = tracemalloc.get_traceback_limit()
+    tracemalloc.stop()
+    tracemalloc.start(frames)
+    for entry in _open.values():
+        entry['start'] -= current
+        entry['peak'] -= current
@@ -0,0 +1,460 @@
+'''
+Compact null masks for analysing where values are missing
+'''
+import numpy as np
+import pandas as pd
+from . import cache
+
+
+__all__ = ['NullMask', 'build_null_mask', 'little_mcar']
+
+
+BLOCK_BYTES = 1 << 16
+BLOCK_VALUES = 1 << 22
+
+
+# number of set bits in every possible byte
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None],
+                         axis=1).sum(axis=1).astype(np.uint8)
+
+
+class NullMask:
+    '''
+    Where the nulls of a dataframe are, one bit per value. Each column's
+    mask is packed into bytes of 8 consecutive rows, so 5M rows take about
+    625KB per column instead of 5MB as booleans.
+
+    Attributes:
+    columns: Pandas Index of column labels
+    n_rows: int, number of rows
+    bits: numpy uint8 array of shape (n_columns, ceil(n_rows / 8)), the
+          packed masks with the first row in the highest bit
+    '''
+    def __init__(self, columns, n_rows, bits):
+        self.columns = columns
+        self.n_rows = n_rows
+        self.bits = bits
+
+    @property
+    def shape(self):
+        return (self.n_rows, len(self.columns))
+
+    def null_counts(self):
+        '''
+        Output:
+        Return a Pandas Series of the number of nulls in each column
+        '''
+        counts = POPCOUNT[self.bits].sum(axis=1, dtype=np.int64)
+        return pd.Series(counts, index=self.columns)
+
+    def binned_fractions(self, bins=1000):
+        '''
+        Share of null values in each column within consecutive groups of
+        rows. Groups are whole bytes of the packed masks, so they hold a
+        multiple of 8 rows, except for the last.
+
+        Input:
+        bins: int, default 1000, the most row groups to return
+
+        Output:
+        Return a tuple of a float array of shape (groups, n_columns), and
+        an int array with the first row of each group
+        '''
+        n_bytes = self.bits.shape[1]
+        if n_bytes == 0:
+            return np.empty((0, len(self.columns))), np.empty(0, np.int64)
+        per_bin = -(-n_bytes // max(bins, 1))
+        starts = np.arange(0, n_bytes, per_bin)
+        nulls = np.zeros((len(self.columns), len(starts)), dtype=np.uint32)
+        # count a block of bytes at a time, adding up bins split between
+        # blocks, so the temporaries stay small however many rows there are
+        step = max(BLOCK_VALUES // max(len(self.columns), 1), 1)
+        for start in range(0, n_bytes, step):
+            stop = min(start + step, n_bytes)
+            first = start // per_bin
+            edges = np.append(0, np.arange((first + 1) * per_bin, stop,
+                                           per_bin) - start)
+            nulls[:, first:first + len(edges)] += np.add.reduceat(
+                POPCOUNT[self.bits[:, start:stop]], edges, axis=1,
+                dtype=np.uint32)
+        first_rows = starts * 8
+        sizes = np.diff(np.append(first_rows, self.n_rows))
+        return (nulls / sizes).T, first_rows
+
+    def co_occurrence(self):
+        '''
+        Number of rows where both features of each pair are null, counted
+        by and-ing the packed masks 64 rows at a time and counting bits
+
+        Output:
+        Return a Pandas DataFrame of ints, features by features, with the
+        null counts on the diagonal
+        '''
+        p = len(self.columns)
+        both = np.zeros((p, p), dtype=np.int64)
+        words = _as_words(self.bits)
+        # only features with nulls can share them
+        nullable = np.flatnonzero(words.any(axis=1))
+        for start in range(0, words.shape[1], BLOCK_BYTES // 8):
+            block = words[nullable, start:start + BLOCK_BYTES // 8]
+            for k, i in enumerate(nullable):
+                shared = _popcount(block[k] & block[k:]).sum(axis=1)
+                shared = shared.astype(np.int64)
+                both[i, nullable[k:]] += shared
+        both = np.triu(both) + np.triu(both, 1).T
+        return pd.DataFrame(both, index=self.columns, columns=self.columns)
+
+    def phi(self):
+        '''
+        Phi coefficient between the null indicators of every pair of
+        features, the same as df.isnull().corr() but from bit counts
+
+        Output:
+        Return a Pandas DataFrame of floats, features by features. Pairs
+        involving a feature that is never or always null are NaN.
+        '''
+        both = self.co_occurrence().to_numpy().astype(np.float64)
+        n = self.n_rows
+        nulls = np.diag(both)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            spread = np.sqrt(nulls * (n - nulls))
+            phi = (n * both - np.outer(nulls, nulls)) / \
+                np.outer(spread, spread)
+        return pd.DataFrame(np.clip(phi, -1, 1), index=self.columns,
+                            columns=self.columns)
+
+    def patterns(self, return_codes=False):
+        '''
+        Every distinct combination of null features across rows
+
+        The column masks are transposed a block of rows at a time into one
+        packed key per row, and the keys are hashed to group the rows.
+
+        Input:
+        return_codes: bool, default False, also return the pattern number
+                      of every row
+
+        Output:
+        Return a Pandas DataFrame with one row per pattern, a bool column
+        per feature (True where null) and a 'Count' column, most common
+        pattern first. With return_codes, also return an int array giving
+        each row's position in that DataFrame.
+        '''
+        keys = self._row_keys()
+        if keys.shape[1] == 1:
+            codes, _ = pd.factorize(keys[:, 0])
+        else:
+            codes = pd.DataFrame(keys).groupby(
+                list(range(keys.shape[1])), sort=False).ngroup().to_numpy()
+        # the key of each pattern, taken from the first row that has it
+        n_patterns = int(codes.max()) + 1 if len(codes) else 0
+        first = np.empty(n_patterns, dtype=np.intp)
+        first[codes[::-1]] = np.arange(len(codes))[::-1]
+        uniques = keys[first]
+        counts = np.bincount(codes, minlength=n_patterns)
+        order = np.argsort(-counts, kind='stable')
+        flags = _key_bits(uniques[order], len(self.columns))
+        table = pd.DataFrame(flags, columns=self.columns)
+        table['Count'] = counts[order]
+        if not return_codes:
+            return table
+        rank = np.empty(len(order), dtype=np.intp)
+        rank[order] = np.arange(len(order))
+        return table, rank[codes]
+
+    def _row_keys(self):
+        '''
+        Pack each row's null flags into uint64 words, 64 features per word
+        '''
+        p = len(self.columns)
+        n_words = max(-(-p // 64), 1)
+        keys = np.zeros((self.n_rows, n_words), dtype=np.uint64)
+        step = max(BLOCK_BYTES * 64 // max(p, 1), 1)
+        for start in range(0, self.bits.shape[1], step):
+            flags = np.unpackbits(self.bits[:, start:start + step], axis=1)
+            rows = slice(start * 8, min((start + step) * 8, self.n_rows))
+            flags = flags[:, :rows.stop - rows.start].T
+            padded = np.zeros((len(flags), n_words * 64), dtype=np.uint8)
+            padded[:, :p] = flags
+            keys[rows] = np.packbits(padded, axis=1).view('>u8').astype(
+                np.uint64)
+        return keys
+
+
+def _as_words(bits):
+    '''
+    View packed masks as uint64 words, padding each row with zero bytes
+    '''
+    pad = -bits.shape[1] % 8
+    if pad:
+        bits = np.pad(bits, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(bits).view(np.uint64)
+
+
+def _popcount(words):
+    '''
+    Number of set bits in each uint64 word (the SWAR bit counting trick)
+    '''
+    words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    words = (words & np.uint64(0x3333333333333333)) + \
+        ((words >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    words = (words + (words >> np.uint64(4))) & np.uint64(0x0f0f0f0f0f0f0f0f)
+    return (words * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def _key_bits(keys, p):
+    '''
+    Unpack row keys from _row_keys back into a bool array of p features
+    '''
+    as_bytes = keys.astype('>u8').view(np.uint8).reshape(
+        len(keys), keys.shape[1] * 8)
+    return np.unpackbits(as_bytes, axis=1)[:, :p].astype(bool)
+
+
+def build_null_mask(data):
+    '''
+    Pack the null masks of a dataframe, one chunk at a time. A single
+    DataFrame is taken a block of rows at a time, so only the packed bits
+    are ever held in full.
+
+    Input:
+    data: Pandas DataFrame object, or an iterable of DataFrame chunks
+
+    Output:
+    Return a NullMask object
+    '''
+    if isinstance(data, pd.DataFrame):
+        if cache.active() is not None:
+            return _cached_null_mask(data, cache.active())
+        return NullMask(data.columns, len(data),
+                        _pack_nulls(data, slice(None)))
+    columns = None
+    packed = []
+    carry = None
+    n_rows = 0
+    for chunk in data:
+        if columns is None:
+            columns = chunk.columns
+            carry = np.zeros((0, len(columns)), dtype=bool)
+        mask = np.concatenate([carry, chunk.isnull().to_numpy(dtype=bool)])
+        n_rows += len(chunk)
+        # pack whole bytes now, keep the rows left over for the next chunk
+        whole = len(mask) - len(mask) % 8
+        packed.append(np.packbits(mask[:whole], axis=0).T)
+        carry = mask[whole:]
+    if columns is None:
+        return NullMask(pd.Index([]), 0, np.zeros((0, 0), dtype=np.uint8))
+    if len(carry):
+        packed.append(np.packbits(carry, axis=0).T)
+    bits = np.ascontiguousarray(np.concatenate(packed, axis=1))
+    return NullMask(columns, n_rows, bits)
+
+
+def _cached_null_mask(df, store):
+    '''
+    Pack the null mask of one frame, reusing the packed bits of every column
+    that is unchanged since it was last packed
+    '''
+    keys = [store.key('nulls', store.column_key(df.iloc[:, i]))
+            for i in range(df.shape[1])]
+    rows = [store.get(key) for key in keys]
+    todo = [i for i, row in enumerate(rows) if row is None]
+    if todo:
+        fresh = _pack_nulls(df, todo)
+        for i, row in zip(todo, fresh):
+            rows[i] = store.put(keys[i], np.ascontiguousarray(row))
+    if not rows:
+        return NullMask(df.columns, len(df),
+                        np.zeros((0, (len(df) + 7) // 8), dtype=np.uint8))
+    return NullMask(df.columns, len(df), np.stack(rows))
+
+
+def _pack_nulls(df, columns):
+    '''
+    Packed null masks of the columns of df selected by columns, a list of
+    positions or a slice, converted a block of whole bytes of rows at a time
+
+    Output:
+    Return a uint8 array of shape (n_columns, ceil(n_rows / 8))
+    '''
+    n_rows = len(df)
+    p = df.iloc[:0, columns].shape[1]
+    bits = np.empty((p, (n_rows + 7) // 8), dtype=np.uint8)
+    step = max(BLOCK_VALUES // max(p, 1) // 8, 1) * 8
+    for start in range(0, n_rows, step):
+        block = df.iloc[start:start + step, columns].isnull()
+        bits[:, start // 8:(start + len(block) + 7) // 8] = np.packbits(
+            block.to_numpy(dtype=bool), axis=0).T
+    return bits
+
+
+def little_mcar(df, max_iter=200, tol=1e-8):
+    '''
+    Little's (1988) chi-square test that the numeric features of df are
+    missing completely at random (MCAR)
+
+    Rows are grouped by missingness pattern once, and each pattern is
+    reduced to its row count, sums and cross products. The EM estimates of
+    the mean and covariance, and the test statistic, are then computed from
+    those per-pattern statistics, so the cost of every EM step depends on
+    the number of patterns and features rather than the number of rows.
+
+    Input:
+    df: Pandas DataFrame object. Only numeric features that vary are used.
+    max_iter: int, default 200, most EM iterations
+    tol: float, default 1e-8, stop once no estimate moves more than this,
+         relative to the feature variances
+
+    Output:
+    Return a dict with the 'statistic', degrees of freedom 'dof', 'p_value',
+    number of 'patterns', the 'features' tested, and EM estimates 'mean'
+    (Pandas Series) and 'covariance' (Pandas DataFrame). The p-value is NaN
+    when there is nothing to test.
+    '''
+    from scipy.stats import chi2
+
+    numeric = df.select_dtypes('number')
+    patterns, codes = build_null_mask(numeric).patterns(return_codes=True)
+    observed = ~patterns.drop(columns='Count').to_numpy(dtype=bool)
+    counts = patterns['Count'].to_numpy()
+
+    # shift and scale by the first rows so the sums of squares keep their
+    # precision, without a pass over the data just for that
+    step = max(BLOCK_VALUES // max(numeric.shape[1], 1), 1)
+    head = numeric.iloc[:step]
+    center = head.mean().fillna(0).to_numpy(dtype=np.float64)
+    scale = head.std().to_numpy(dtype=np.float64)
+    scale[~np.isfinite(scale) | (scale == 0)] = 1
+    sums, cross = _pattern_moments(numeric, codes, len(patterns), center,
+                                   scale, step)
+
+    # features that never vary say nothing about the other features
+    varies = _varies(observed, counts, sums, cross)
+    features = numeric.columns[varies]
+    center, scale = center[varies], scale[varies]
+    observed, counts, sums, cross = _merge_patterns(
+        observed[:, varies], counts, sums[:, varies],
+        cross[:, varies][:, :, varies])
+    p = len(features)
+    mean, cov = _em_moments(observed, counts, sums, cross, max_iter, tol)
+
+    statistic = 0.
+    for k in range(len(counts)):
+        obs = observed[k]
+        if not obs.any():
+            continue
+        diff = sums[k, obs] / counts[k] - mean[obs]
+        statistic += counts[k] * diff @ np.linalg.pinv(
+            cov[np.ix_(obs, obs)]) @ diff
+    dof = int(observed.sum() - p) if len(counts) else 0
+    p_value = float(chi2.sf(statistic, dof)) if dof > 0 else np.nan
+    return {'statistic': float(statistic), 'dof': dof, 'p_value': p_value,
+            'patterns': len(counts), 'features': list(features),
+            'mean': pd.Series(mean * scale + center, index=features),
+            'covariance': pd.DataFrame(cov * np.outer(scale, scale),
+                                       index=features, columns=features)}
+
+
+def _pattern_moments(numeric, codes, n_patterns, center, scale, step):
+    '''
+    Sums and cross products of the standardized values of every pattern,
+    with nulls counted as zero, gathered step rows at a time
+    '''
+    p = numeric.shape[1]
+    sums = np.zeros((n_patterns, p))
+    cross = np.zeros((n_patterns, p, p))
+    # small int codes are sorted by radix rather than comparison
+    codes = codes.astype(np.min_scalar_type(max(n_patterns - 1, 0)))
+    for start in range(0, len(numeric), step):
+        values = numeric.iloc[start:start + step].to_numpy(dtype=np.float64)
+        block_codes = codes[start:start + step]
+        order = np.argsort(block_codes, kind='stable')
+        # gathering the rows by pattern copies them, so work in place
+        block, block_codes = values[order], block_codes[order]
+        block -= center
+        block /= scale
+        block[np.isnan(block)] = 0
+        starts = np.flatnonzero(np.r_[True, block_codes[1:] !=
+                                      block_codes[:-1]])
+        present = block_codes[starts]
+        sums[present] += np.add.reduceat(block, starts, axis=0)
+        bounds = np.append(starts, len(block))
+        for k, a, b in zip(present, bounds[:-1], bounds[1:]):
+            cross[k] += block[a:b].T @ block[a:b]
+    return sums, cross
+
+
+def _varies(observed, counts, sums, cross):
+    '''
+    Whether each feature has at least two different observed values,
+    judged from the per-pattern statistics
+    '''
+    n = (observed * counts[:, None]).sum(axis=0)
+    total = sums.sum(axis=0)
+    squares = np.einsum('kjj->j', cross)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        spread = squares / n - (total / n) ** 2
+        return (n > 1) & (spread > 1e-12 * squares / n)
+
+
+def _merge_patterns(observed, counts, sums, cross):
+    '''
+    Combine the statistics of patterns that became equal once features
+    were dropped
+    '''
+    if observed.shape[1] == 0:
+        return observed[:0], counts[:0], sums[:0], cross[:0]
+    observed, inverse = np.unique(observed, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    merged_counts = np.bincount(inverse, weights=counts,
+                                minlength=len(observed)).astype(np.int64)
+    merged_sums = np.zeros((len(observed),) + sums.shape[1:])
+    merged_cross = np.zeros((len(observed),) + cross.shape[1:])
+    np.add.at(merged_sums, inverse, sums)
+    np.add.at(merged_cross, inverse, cross)
+    return observed, merged_counts, merged_sums, merged_cross
+
+
+def _em_moments(observed, counts, sums, cross, max_iter, tol):
+    '''
+    EM estimates of the mean and covariance from per-pattern statistics.
+    The E step fills in each pattern's expected sums and cross products of
+    its missing features from their regression on the observed ones.
+    '''
+    n, p = counts.sum(), observed.shape[1]
+    available = (observed * counts[:, None]).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nan_to_num((sums * observed).sum(axis=0) / available)
+    cov = np.eye(p)
+    for _ in range(max_iter):
+        total = np.zeros(p)
+        total_cross = np.zeros((p, p))
+        for k in range(len(counts)):
+            obs, mis = observed[k], ~observed[k]
+            n_k, s, t = counts[k], sums[k].copy(), cross[k].copy()
+            if mis.any():
+                o, m = np.flatnonzero(obs), np.flatnonzero(mis)
+                # regression of the missing features on the observed ones
+                slope = cov[np.ix_(m, o)] @ np.linalg.pinv(
+                    cov[np.ix_(o, o)])
+                resid = cov[np.ix_(m, m)] - slope @ cov[np.ix_(o, m)]
+                intercept = mean[m] - slope @ mean[o]
+                s_o, t_oo = s[o], t[np.ix_(o, o)]
+                fitted = slope @ s_o
+                s[m] = n_k * intercept + fitted
+                t[np.ix_(o, m)] = np.outer(s_o, intercept) + t_oo @ slope.T
+                t[np.ix_(m, o)] = t[np.ix_(o, m)].T
+                t[np.ix_(m, m)] = n_k * np.outer(intercept, intercept) + \
+                    np.outer(intercept, fitted) + \
+                    np.outer(fitted, intercept) + \
+                    slope @ t_oo @ slope.T + n_k * resid
+            total += s
+            total_cross += t
+        new_mean = total / n
+        new_cov = total_cross / n - np.outer(new_mean, new_mean)
+        change = max(np.abs(new_mean - mean).max(initial=0),
+                     np.abs(new_cov - cov).max(initial=0))
+        mean, cov = new_mean, new_cov
+        if change < tol:
+            break
+    return mean, cov
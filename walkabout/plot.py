@@ -1,92 +1,145 @@
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+from functools import partial
 from math import ceil
-from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LinearSegmentedColormap, LogNorm
+from matplotlib.figure import Figure
+from . import sampling, stats, missing, support
+from ._parallel import map_frame
 
 
 __all__ = ['univariate_distribution', 'bivariate_categorical_distribution',
            'residuals', 'boxplot', 'correlation_heatmap',
-           'null_correlation_heatmap', 'missingness_map']
+           'null_correlation_heatmap', 'missingness_map', 'render']
+
+
+BLOCK_ROWS = 1 << 16
 
 
 def univariate_distribution(df, cols=5, figsize=(20, 15),
-                            hspace=0.5, wspace=0.5):
+                            hspace=0.5, wspace=0.5, sample=None, seed=None,
+                            bins=50, kde=True, label_limit=50, fig=None):
     '''
     Plot the distribution of all features in a dataframe
     original function found here:
     https://github.com/dformoso/sklearn-classification/blob/master/Data%20Science%20Workbook%20-%20Census%20Income%20Dataset.ipynb
 
+    Histograms and label counts are computed up front and drawn as bars,
+    so drawing time depends on the number of bins, not rows.
+
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame object, or an iterable of DataFrame chunks such
+        as pd.read_csv(path, chunksize=100000)
     cols: number of graphs to display per row
     figsize: tuple of floats representing height and width of the plots
     hspace: the amount of height reserved for space between subplots
     wspace: the amount of width reserved for space between subplots
+    sample: int number of rows or float fraction of rows, default None.
+            Plot a random sample of df. Chunks only take a number of rows
+    seed: int or None, seed for the random sample
+    bins: int, default 50, approximate number of histogram bars
+    kde: bool, default True, draw a kernel density estimate over the
+         histograms of numeric features
+    label_limit: int or None, default 50, the most labels drawn for a
+                 categorical feature, most frequent first
+    fig: matplotlib Figure to draw on, default None for a new pyplot figure
 
     Output:
     Display n graphs to the screen, where n is the number of features in df
     '''
+    if sample is not None and isinstance(df, pd.DataFrame):
+        df = sampling.sample_rows(df, sample, seed)
+    elif sample is not None:
+        df = sampling.reservoir_sample(df, sample, seed)
+    aggregates = stats.univariate_aggregates(df)
+
     # plot settings
-    fig = plt.figure(figsize=figsize)
+    fig = _figure(fig, figsize)
     fig.subplots_adjust(left=None, bottom=None, right=None, top=None,
                         wspace=wspace, hspace=hspace)
-    rows = ceil(float(df.shape[1]) / cols)
+    rows = ceil(float(len(aggregates)) / cols)
+    if isinstance(df, pd.DataFrame):
+        _sample_title(fig, df)
 
     # plot graphs, graph type determined by categoric or numeric feature
-    for i, column in enumerate(df.columns):
+    for i, (column, aggregate) in enumerate(aggregates.items()):
         ax = fig.add_subplot(rows, cols, i + 1)
         ax.set_title(column)
-        if df.dtypes[column] == np.object:
-            g = sns.countplot(y=column, data=df)
-            substrings = [s.get_text()[:18] for s in g.get_yticklabels()]
-            g.set(yticklabels=substrings)
-            plt.xticks(rotation=25)
+        if isinstance(aggregate, stats.BinnedDistribution):
+            _histogram_bars(ax, aggregate, bins, kde)
         else:
-            g = sns.distplot(df[column])
-            plt.xticks(rotation=25)
+            _count_bars(ax, aggregate, label_limit)
+        ax.tick_params(axis='x', labelrotation=25)
 
 
 def bivariate_categorical_distribution(df, hue, cols=5, figsize=(20, 15),
-                                       hspace=0.2, wspace=0.5):
+                                       hspace=0.2, wspace=0.5, sample=None,
+                                       seed=None, fig=None, label_limit=20):
     '''
     Plot a count of the categories from each categorical feature split by hue
     original function found here:
     https://github.com/dformoso/sklearn-classification/blob/master/Data%20Science%20Workbook%20-%20Census%20Income%20Dataset.ipynb
 
+    The counts of every feature against hue are tabulated up front and
+    drawn as grouped bars, so drawing time depends on the number of labels,
+    not rows.
+
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame object, or an iterable of DataFrame chunks such
+        as pd.read_csv(path, chunksize=100000)
     hue: a categorical feature, likely the target feature
     cols: number of graphs to display per row
     figsize: tuple of floats representing height and width of the plots
     hspace: the amount of height reserved for space between subplots
     wspace: the amount of width reserved for space between subplots
+    sample: int number of rows or float fraction of rows, default None.
+            Plot a sample of df stratified by hue, so each label of hue
+            keeps its share of the rows. Chunks only take a number of rows
+    seed: int or None, seed for the random sample
+    fig: matplotlib Figure to draw on, default None for a new pyplot figure
+    label_limit: int or None, default 20, the most labels drawn for a
+                 feature, most frequent first. The rest are counted
+                 together in one 'Other' bar
 
     Output:
     Display n graphs to the screen, where n is the number of features in df
     '''
+    if sample is not None:
+        df = sampling.stratified_sample(df, hue, sample, seed)
+    tables = stats.categorical_crosstabs(df, hue)
+
     # plot settings
-    df = df.select_dtypes(include=[np.object])
-    fig = plt.figure(figsize=figsize)
+    fig = _figure(fig, figsize)
     fig.subplots_adjust(left=None, bottom=None, right=None, top=None,
                         wspace=wspace, hspace=hspace)
-    rows = ceil(float(df.shape[1]) / cols)
+    rows = ceil(float(len(tables)) / cols)
+    if isinstance(df, pd.DataFrame):
+        _sample_title(fig, df)
 
     # plot each feature's distribution against hue
-    for i, column in enumerate(df.columns):
+    for i, (column, table) in enumerate(tables.items()):
         ax = fig.add_subplot(rows, cols, i + 1)
         ax.set_title(column)
-        g = sns.countplot(y=column, hue=hue, data=df)
-        substrings = [s.get_text()[:10] for s in g.get_yticklabels()]
-        g.set(yticklabels=substrings)
+        _grouped_bars(ax, _top_labels(table, label_limit))
 
 
-def residuals(df, target, cols=3, figsize=(10, 15), hspace=1, wspace=1):
+def residuals(df, target, cols=3, figsize=(10, 15), hspace=1, wspace=1,
+              sample=None, seed=None, fig=None, points=5000, bins=100,
+              n_jobs=1):
     '''
     Create residual plots for all numeric features. Useful for
     seeing heteroscedasticity.
 
+    Each panel shows the residuals of a linear fit of target on the
+    feature with a LOWESS curve through them. The curve is fit on at most
+    points residuals, and features with more rows are drawn as a 2-D
+    histogram of all residuals instead of a scatter, so the point budget
+    rather than the number of rows sets the runtime.
+
     Input:
     df: Pandas DataFrame object
     target: string of the target feature in df
@@ -94,33 +147,53 @@ def residuals(df, target, cols=3, figsize=(10, 15), hspace=1, wspace=1):
     figsize: tuple of floats representing height and width of the plots
     hspace: the amount of height reserved for space between subplots
     wspace: the amount of width reserved for space between subplots
+    sample: int number of rows or float fraction of rows, default None.
+            Plot a random sample of df
+    seed: int or None, seed for the random sample and the LOWESS subsample
+    fig: matplotlib Figure to draw on, default None for a new pyplot figure
+    points: int, default 5000, the most residuals scattered and used to
+            fit the LOWESS curve per feature
+    bins: int, default 100, bins along each axis of the 2-D histograms
+    n_jobs: int, default 1, number of panels computed in parallel
+            processes, -1 for one per CPU
 
     Output:
     Display n graphs to the screen, where n is the number of
     numeric features in df
     '''
-    X = df.drop(target, axis=1).select_dtypes(include='number')
-    y = df[target]
+    if sample is not None:
+        df = sampling.sample_rows(df, sample, seed)
+    columns = [column for column in df.select_dtypes(include='number')
+               if column != target]
+    panels = map_frame(partial(_residual_panel, target=target,
+                               points=points, bins=bins, seed=seed),
+                       df[columns + [target]], columns, n_jobs)
 
     # plot settings
-    fig = plt.figure(figsize=figsize)
+    fig = _figure(fig, figsize)
     fig.subplots_adjust(left=None, bottom=None, right=None, top=None,
                         wspace=wspace, hspace=hspace)
-    rows = ceil(float(df.shape[1]) / cols)
+    rows = ceil(float(len(columns)) / cols)
+    _sample_title(fig, df)
 
     # plot graphs
-    for i, column in enumerate(X.columns):
+    for i, (column, panel) in enumerate(zip(columns, panels)):
         ax = fig.add_subplot(rows, cols, i + 1)
-        sns.residplot(X[column], y, line_kws=dict(color='r'), lowess=True)
-        ax.set_title(column)
+        _draw_residuals(ax, panel)
+        ax.set(title=column, xlabel=column, ylabel=target)
 
 
 def boxplot(df, target=None, label_limit=10, figsize=(10, 10),
-            cols=3, wspace=.5, hspace=.5):
+            cols=3, wspace=.5, hspace=.5, sample=None, stratify=None,
+            seed=None, fig=None, outlier_limit=1000):
     '''
     Plot the box plot of all numeric features, or plot all features
     against a numeric feature.
 
+    The quartiles, whiskers and outliers of every box are computed up
+    front and drawn with matplotlib's bxp, so drawing time depends on the
+    number of boxes and outliers shown, not rows.
+
     Input:
     df: Pandas DataFrame object
     target: string, default None. Name of the target numeric feature in df.
@@ -132,32 +205,55 @@ def boxplot(df, target=None, label_limit=10, figsize=(10, 10),
     figsize: tuple of floats representing height and width of the plots
     hspace: the amount of height reserved for space between subplots
     wspace: the amount of width reserved for space between subplots
+    sample: int number of rows or float fraction of rows, default None.
+            Plot a random sample of df
+    stratify: string, default None. Name of a categorical feature whose
+              label shares the sample should keep
+    seed: int or None, seed for the random sample and thinned outliers
+    fig: matplotlib Figure to draw on, default None for a new pyplot figure
+    outlier_limit: int, default 1000, the most outliers drawn per box. More
+                   are thinned to a random outlier_limit, plus the most
+                   extreme on each side
 
     Output:
     Display graphs to the screen
     '''
-    # plot settings
-    fig = plt.figure(figsize=figsize)
-    fig.subplots_adjust(left=None, bottom=None, right=None, top=None,
-                        wspace=wspace, hspace=hspace)
-    rows = ceil(float(df.shape[1]) / cols)
+    if sample is not None and stratify is not None:
+        df = sampling.stratified_sample(df, stratify, sample, seed)
+    elif sample is not None:
+        df = sampling.sample_rows(df, sample, seed)
+    rng = np.random.default_rng(seed)
 
     if target is None:  # Univariate boxplot
         numerics = df.select_dtypes(include='number').columns
-        for i, column in enumerate(numerics):
-            ax = fig.add_subplot(rows, cols, i + 1)
-            ax.set_title(column)
-            g = sns.boxplot(df[column])
+        boxes = {column: _box_stats(df[column], None, outlier_limit, rng)
+                 for column in numerics}
     else:  # bivariate boxplot
-        columns = [col for col in df.columns
-                   if ((df[col].nunique() < 10) and (col != target))]
-        for i, column in enumerate(columns):
-            ax = fig.add_subplot(rows, cols, i + 1)
-            ax.set_title(column)
-            g = sns.boxplot(df[column], df[target])
+        boxes = {}
+        for column in df.columns:
+            groups = _label_codes(df[column], label_limit) \
+                if column != target else None
+            if groups is not None:
+                boxes[column] = _box_stats(df[target], groups,
+                                           outlier_limit, rng)
+
+    # plot settings
+    fig = _figure(fig, figsize)
+    fig.subplots_adjust(left=None, bottom=None, right=None, top=None,
+                        wspace=wspace, hspace=hspace)
+    rows = ceil(float(len(boxes)) / cols)
+    _sample_title(fig, df)
+
+    for i, (column, summary) in enumerate(boxes.items()):
+        ax = fig.add_subplot(rows, cols, i + 1)
+        ax.set_title(column)
+        _draw_boxes(ax, summary, vert=target is not None)
+        ax.set_xlabel(column)
+        if target is not None:
+            ax.set_ylabel(target)
 
 
-def correlation_heatmap(df, figsize=(5, 5), annot=True):
+def correlation_heatmap(df, figsize=(5, 5), annot=True, fig=None):
     '''
     Heatmap of feature correlations of df
 
@@ -165,66 +261,409 @@ def correlation_heatmap(df, figsize=(5, 5), annot=True):
     df: Pandas DataFrame object
     figsize: tuple of the height and width of the heatmap
     annot: bool, whether to display values inside the heatmap
+    fig: matplotlib Figure to draw on, default None for a new pyplot figure
 
     Output:
     Display heatmap of the feature correlations of df
     '''
-    corr = df.corr()
+    _lower_heatmap(df.corr(), _figure(fig, figsize), annot)
 
-    # generate a mask for the upper triangle
-    mask = np.zeros_like(corr, dtype=np.bool)
-    mask[np.triu_indices_from(mask)] = True
 
-    # plot it
-    plt.subplots(figsize=figsize)
-    sns.heatmap(corr, mask=mask, annot=annot, square=True)
-
-
-def null_correlation_heatmap(df, figsize=(5, 5), annot=True):
+def null_correlation_heatmap(df, figsize=(5, 5), annot=True, fig=None):
     '''
     Heatmap of correlation heatmap of nulls
 
+    The phi correlations of the null indicators are counted from packed
+    null masks, without building a boolean copy of df.
+
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame object, an iterable of DataFrame chunks, or a
+        NullMask from missing.build_null_mask()
     figsize: tuple of the height and width of the heatmap
     annot: bool, whether to display values inside the heatmap
+    fig: matplotlib Figure to draw on, default None for a new pyplot figure
 
     Output:
     Display heatmap of the correlations of nulls in df
     '''
-    null_df = df.isnull()
-    correlation_heatmap(null_df, figsize, annot)
+    mask = df if isinstance(df, missing.NullMask) else \
+        missing.build_null_mask(df)
+    _lower_heatmap(mask.phi(), _figure(fig, figsize), annot)
+
+
+def _lower_heatmap(corr, fig, annot):
+    '''
+    Draw the lower triangle of a correlation matrix on fig
+    '''
+    # generate a mask for the upper triangle
+    mask = np.zeros_like(corr, dtype=bool)
+    mask[np.triu_indices_from(mask)] = True
+
+    # plot it
+    sns.heatmap(corr, mask=mask, annot=annot, square=True,
+                ax=fig.add_subplot())
 
 
-def missingness_map(df, figsize=(5, 5), data_name='DataFrame'):
+def missingness_map(df, figsize=(5, 5), data_name='DataFrame', bins=1000,
+                    fig=None):
     '''
     Graph of the location of all missing values in a dataframe
 
+    Rows are grouped into at most bins bands, each shaded by the share of
+    its values that are null, and drawn as a single image, so the cost of
+    drawing does not grow with the number of rows.
+
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame object, an iterable of DataFrame chunks, or a
+        NullMask from missing.build_null_mask()
+    figsize: tuple of the height and width of the graph
     data_name: string for the title of the graph
+    bins: int, default 1000, the most bands of rows, about one per pixel
+    fig: matplotlib Figure to draw on, default None for a new pyplot figure
+         that is shown once drawn
 
     Output
     Graph of the location of all missing values in a dataframe
     '''
     # map where nulls are in the dataframe
-    null_map = df.isnull()
+    mask = df if isinstance(df, missing.NullMask) else \
+        missing.build_null_mask(df)
+    fractions, _ = mask.binned_fractions(bins)
 
-    # create a binary colormap
+    # create a colormap from black (no nulls) to white (all nulls)
     myColors = ((0, 0, 0, 1), (1, 1, 1, 1))
-    cmap = LinearSegmentedColormap.from_list('Custom', myColors, len(myColors))
-
-    # use sns.heatmap and basic cleanup
-    ax = sns.heatmap(null_map, vmin=0, vmax=1, cmap=cmap,)
+    cmap = LinearSegmentedColormap.from_list('Custom', myColors)
+
+    # draw the bands as one image and clean up
+    show = fig is None
+    fig = _figure(fig, figsize)
+    ax = fig.add_subplot()
+    image = ax.imshow(fractions, vmin=0, vmax=1, cmap=cmap, aspect='auto',
+                      interpolation='nearest',
+                      extent=(-.5, len(mask.columns) - .5, mask.n_rows, 0))
+    ax.set_xticks(np.arange(len(mask.columns)))
+    ax.set_xticklabels([str(col) for col in mask.columns], rotation=90)
     ax.set(yticks=[])
     ax.set_ylabel('Observations\n(Descending Order)')
     ax.set_xlabel('Features')
-    plt.title(f'Missingness Map for {data_name}')
+    ax.set_title(f'Missingness Map for {data_name}')
 
-    # Binary color bar with labels
-    ax.collections[0].colorbar.set_ticks([.75, .25])
-    ax.collections[0].colorbar.set_ticklabels(['Null', 'Not Null'])
+    # color bar from not null to null
+    colorbar = fig.colorbar(image, ax=ax)
+    colorbar.set_ticks([0, .5, 1])
+    colorbar.set_ticklabels(['Not Null', '50% Null', 'Null'])
 
     # display the graph
-    plt.subplots(figsize=figsize)
-    plt.show()
+    if show:
+        plt.show()
+
+
+def render(df, specs, directory='.', fmt='png', dpi=100, n_jobs=1):
+    '''
+    Draw plots without a display and save each one to a file
+
+    Every plot is drawn on its own matplotlib Figure with an Agg canvas,
+    never through pyplot, so plots can be drawn side by side in worker
+    processes and in scheduled jobs with no screen.
+
+    Input:
+    df: Pandas DataFrame object
+    specs: list of plots. Each is the name of a plot function in this
+           module, such as 'missingness_map', or a dict with that name
+           under 'plot', an optional file name (without extension) under
+           'name', and keyword arguments of the function, for example
+           {'plot': 'boxplot', 'target': 'age', 'sample': 10000}
+    directory: string, folder to write to, created if it does not exist
+    fmt: 'png' (default) or 'svg'
+    dpi: int, default 100, resolution of png files
+    n_jobs: int, default 1, number of plots drawn at once in separate
+            processes, -1 for one per CPU
+
+    Output:
+    Return a list of the paths written, in the order of specs
+    '''
+    if fmt not in ('png', 'svg'):
+        raise ValueError("fmt must be 'png' or 'svg'")
+    jobs = []
+    for i, spec in enumerate(specs):
+        spec = {'plot': spec} if isinstance(spec, str) else dict(spec)
+        kind = spec.pop('plot')
+        if kind not in __all__ or kind == 'render':
+            raise ValueError(f'unknown plot {kind!r}')
+        name = spec.pop('name', f'{i:02d}_{kind}')
+        jobs.append((kind, spec, os.path.join(directory, f'{name}.{fmt}')))
+    os.makedirs(directory, exist_ok=True)
+    return map_frame(partial(_render_file, fmt=fmt, dpi=dpi), df, jobs,
+                     n_jobs)
+
+
+def _render_file(df, job, fmt, dpi):
+    '''
+    Draw one plot of render on a new Agg figure and save it
+    '''
+    kind, kwargs, path = job
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    globals()[kind](df, fig=fig, **kwargs)
+    fig.savefig(path, format=fmt, dpi=dpi)
+    return path
+
+
+def _figure(fig, figsize):
+    '''
+    Size and return fig, or a new pyplot figure when fig is None
+    '''
+    if fig is None:
+        return plt.figure(figsize=figsize)
+    fig.set_size_inches(figsize)
+    return fig
+
+
+def _sample_title(fig, df):
+    '''
+    Title the figure with the sample size when df is a sample
+    '''
+    population = sampling.population(df)
+    if population > len(df):
+        fig.suptitle(f'Random sample of {len(df)} of {population} rows')
+
+
+def _histogram_bars(ax, distribution, bins, kde):
+    '''
+    Draw a density histogram of a BinnedDistribution, with its KDE
+    '''
+    counts, edges = distribution.histogram(bins)
+    if len(counts) == 0:
+        return
+    widths = np.diff(edges)
+    ax.bar(edges[:-1], counts / (counts.sum() * widths), width=widths,
+           align='edge', alpha=.4, edgecolor='white', linewidth=.5)
+    if kde:
+        x, density = distribution.kde()
+        keep = (x >= edges[0] - 3 * widths[0]) & \
+            (x <= edges[-1] + 3 * widths[-1]) | (density > density.max() / 1e3)
+        ax.plot(x[keep], density[keep])
+
+
+def _count_bars(ax, counts, label_limit):
+    '''
+    Draw horizontal bars for the most frequent labels in counts, keeping
+    their order of appearance like seaborn's countplot
+    '''
+    if label_limit is not None and len(counts) > label_limit:
+        top = np.argsort(-counts.to_numpy(), kind='stable')[:label_limit]
+        counts = counts.iloc[np.sort(top)]
+    positions = np.arange(len(counts))
+    ax.barh(positions, counts.to_numpy())
+    ax.set_yticks(positions)
+    ax.set_yticklabels([str(label)[:18] for label in counts.index])
+    ax.set_ylim(len(counts) - .5, -.5)
+
+
+class _Quantiles:
+    '''
+    Quantiles already computed for several groups, in the form of a sketch
+    for support.outlier_fences
+
+    Input:
+    table: Pandas DataFrame with a row per group and a column per quantile
+    '''
+    def __init__(self, table):
+        self.table = table
+
+    def quantile(self, q):
+        return [self.table[p].to_numpy() for p in q]
+
+
+def _label_codes(series, limit):
+    '''
+    Integer codes (-1 for nulls) and labels of a feature with fewer than
+    limit distinct values, in seaborn's order: categories, sorted numbers,
+    or order of appearance. Returns None as soon as limit labels are seen,
+    so features with many labels stop after their first block of rows.
+    '''
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if len(series.cat.categories) >= limit:
+            return None
+        return (series.cat.codes.to_numpy(dtype=np.intp),
+                list(series.cat.categories))
+    labels = {}
+    codes = np.empty(len(series), dtype=np.intp)
+    for start in range(0, len(series), BLOCK_ROWS):
+        block_codes, uniques = pd.factorize(
+            series.iloc[start:start + BLOCK_ROWS])
+        mapping = np.array([labels.setdefault(label, len(labels))
+                            for label in uniques] + [-1], dtype=np.intp)
+        if len(labels) >= limit:
+            return None
+        codes[start:start + BLOCK_ROWS] = mapping[block_codes]
+    names = list(labels)
+    if pd.api.types.is_numeric_dtype(series.dtype) and names:
+        order = np.argsort(names, kind='stable')
+        rank = np.empty(len(order) + 1, dtype=np.intp)
+        rank[order] = np.arange(len(order))
+        rank[-1] = -1
+        codes, names = rank[codes], [names[i] for i in order]
+    return codes, names
+
+
+def _box_stats(values, groups, outlier_limit, rng):
+    '''
+    Quartiles, whiskers and outliers of values, for each group
+
+    Input:
+    values: Pandas Series of numbers
+    groups: tuple of int codes (-1 for null) and labels from _label_codes,
+            or None for a single box
+    outlier_limit: int, the most outliers kept per box, see boxplot
+    rng: numpy Generator used to thin outliers
+
+    Output:
+    Return a list of dicts in the form matplotlib's Axes.bxp takes, one
+    per group with values
+    '''
+    values = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if groups is None:
+        labels = ['']
+        values = values[~np.isnan(values)]
+        bounds = np.array([0, len(values)])
+    else:
+        codes, labels = groups
+        keep = ~np.isnan(values) & (codes >= 0)
+        values, codes = values[keep], codes[keep]
+        # radix sort the small codes so every group is a slice of values
+        order = np.argsort(codes.astype(np.min_scalar_type(len(labels))),
+                           kind='stable')
+        values = values[order]
+        bounds = np.r_[0, np.cumsum(np.bincount(codes,
+                                                minlength=len(labels)))]
+    slices = [values[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    # values is a copy, so quantiles may partition it in place
+    table = pd.DataFrame([np.quantile(part, [.25, .5, .75],
+                                      overwrite_input=True)
+                          if len(part) else [np.nan] * 3
+                          for part in slices], columns=[.25, .5, .75])
+    low, high = support.outlier_fences(sketch=_Quantiles(table))
+
+    boxes = []
+    for i, part in enumerate(slices):
+        if not len(part):
+            continue
+        above_low, below_high = part >= low[i], part <= high[i]
+        # whiskers reach the furthest values inside the fences
+        whislo = part.min(where=above_low, initial=np.inf)
+        whishi = part.max(where=below_high, initial=-np.inf)
+        fliers = part[~(above_low & below_high)]
+        if len(fliers) > outlier_limit:
+            fliers = np.r_[rng.choice(fliers, outlier_limit, replace=False),
+                           fliers.min(), fliers.max()]
+        boxes.append({'label': str(labels[i]), 'q1': table[.25][i],
+                      'med': table[.5][i], 'q3': table[.75][i],
+                      'whislo': whislo, 'whishi': whishi, 'fliers': fliers})
+    return boxes
+
+
+def _draw_boxes(ax, boxes, vert):
+    '''
+    Draw summaries from _box_stats with matplotlib's bxp, styled like
+    seaborn's boxplot
+    '''
+    if not boxes:
+        return
+    gray = '.25'
+    artists = ax.bxp(
+        boxes, vert=vert, widths=.8, patch_artist=True,
+        boxprops={'edgecolor': gray}, whiskerprops={'color': gray},
+        capprops={'color': gray}, medianprops={'color': gray},
+        flierprops={'marker': 'd', 'markerfacecolor': gray,
+                    'markeredgecolor': gray, 'markersize': 5})
+    colors = sns.color_palette(n_colors=len(boxes), desat=.75)
+    for patch, color in zip(artists['boxes'], colors):
+        patch.set_facecolor(color)
+
+
+def _top_labels(table, label_limit):
+    '''
+    Keep the label_limit most frequent rows of a crosstab in their order,
+    and sum the rest into one 'Other' row
+    '''
+    if label_limit is None or len(table) <= label_limit:
+        return table
+    totals = table.sum(axis=1).to_numpy()
+    top = np.sort(np.argsort(-totals, kind='stable')[:label_limit])
+    rest = np.setdiff1d(np.arange(len(table)), top)
+    other = table.iloc[rest].sum().to_frame(f'Other ({len(rest)})').T
+    return pd.concat([table.iloc[top], other]).rename_axis(
+        table.index.name)
+
+
+def _grouped_bars(ax, table):
+    '''
+    Draw a crosstab from stats.categorical_crosstabs as horizontal bars
+    grouped by label, with a color per label of hue, like seaborn's
+    countplot
+    '''
+    n_hue = max(table.shape[1], 1)
+    height = .8 / n_hue
+    positions = np.arange(len(table))
+    colors = sns.color_palette(n_colors=n_hue, desat=.75)
+    for j, (label, color) in enumerate(zip(table.columns, colors)):
+        ax.barh(positions - .4 + height * (j + .5), table[label].to_numpy(),
+                height=height, color=color, label=str(label))
+    ax.set_yticks(positions)
+    ax.set_yticklabels([str(label)[:10] for label in table.index])
+    ax.set_ylim(len(table) - .5, -.5)
+    ax.set(xlabel='count', ylabel=table.index.name)
+    if table.shape[1]:
+        ax.legend(title=table.columns.name)
+
+
+def _residual_panel(df, column, target, points, bins, seed):
+    '''
+    Everything residuals draws for one feature: the residuals of a linear
+    fit of target on column, as points or a 2-D histogram, and a LOWESS
+    curve fit on at most points of them
+    '''
+    data = df[[column, target]].to_numpy(dtype=np.float64, na_value=np.nan)
+    data = data[~np.isnan(data).any(axis=1)]
+    x, y = data[:, 0], data[:, 1]
+    panel = {'curve': (np.empty(0), np.empty(0)),
+             'points': (x, np.zeros(len(x)))}
+    if len(x) < 2:
+        return panel
+
+    # least squares line of y on x, flat if x does not vary
+    x_mean, y_mean = x.mean(), y.mean()
+    spread = np.dot(x - x_mean, x - x_mean)
+    slope = np.dot(x - x_mean, y - y_mean) / spread if spread > 0 else 0.
+    residual = y - y_mean - slope * (x - x_mean)
+
+    chosen = slice(None)
+    if len(x) > points:
+        rng = np.random.default_rng(seed)
+        chosen = np.sort(rng.choice(len(x), points, replace=False))
+        panel['points'] = None
+        panel['density'] = np.histogram2d(x, residual, bins)
+    else:
+        panel['points'] = (x, residual)
+    panel['curve'] = stats.lowess(x[chosen], residual[chosen])
+    return panel
+
+
+def _draw_residuals(ax, panel):
+    '''
+    Draw a panel from _residual_panel like seaborn's residplot
+    '''
+    color = sns.color_palette()[0]
+    if panel['points'] is not None:
+        ax.scatter(*panel['points'], color=color, s=12, alpha=.8,
+                   linewidths=0)
+    else:
+        # log shading keeps the spread of sparse tails visible
+        counts, x_edges, y_edges = panel['density']
+        ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0),
+                      cmap=sns.light_palette(color, as_cmap=True),
+                      norm=LogNorm())
+    ax.axhline(0, ls=':', c='.2')
+    ax.plot(*panel['curve'], color='r')
@@ -0,0 +1,840 @@
+'''
+Single-pass column profiling engine used by the report functions
+'''
+import json
+import zlib
+from functools import partial
+import pandas as pd
+import numpy as np
+from . import support, stats, sampling, cache, instrument
+from .sketch import HyperLogLog, KLLSketch
+from ._parallel import map_columns
+
+
+__all__ = ['Profile', 'ColumnProfile', 'build_profile',
+           'build_profile_from_chunks', 'merge_profiles']
+
+
+QUANTILES = (.25, .5, .75)
+HLL_PRECISION = 12
+FORMAT_HEADER = b'WAPF\x01'
+
+
+class ColumnProfile:
+    '''
+    Statistics for a single feature, computed once and reused by every report
+
+    Attributes:
+    name: the column label
+    dtype: the column's dtype
+    numeric: bool, whether the column is treated as numeric
+    count: int, number of non-null values
+    nulls: int, number of null values
+    mean, m2, m3, m4: mean and sums of the 2nd-4th powers of the deviations
+                      from the mean (numeric columns only)
+    min, max: smallest and largest values (numeric columns only)
+    quantiles: dict of quantile -> value (numeric columns only)
+    sketch: KLLSketch of the values, kept when profiling for a later merge
+            (numeric columns only)
+    nunique: int, number of unique non-null values
+    nunique_exact: bool, False when nunique is an estimate (see hll) or
+                   a lower bound
+    hll: HyperLogLog sketch of the distinct values, kept once a column has
+         too many labels to count exactly or in approximate mode
+    unique_values: list of the first unique values (nulls included) in
+                   order of appearance
+    value_counts: Pandas Series of label -> count in order of appearance,
+                  None when the column had more labels than max_labels
+    placeholders: dict of placeholder -> number of hits
+    '''
+    def __init__(self, name, dtype, numeric=False):
+        self.name = name
+        self.dtype = dtype
+        self.numeric = numeric
+        self.count = 0
+        self.nulls = 0
+        self.mean = np.nan
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.quantiles = {}
+        self.sketch = None
+        self.nunique = 0
+        self.nunique_exact = True
+        self.hll = None
+        self.unique_values = []
+        self.value_counts = None
+        self.placeholders = {}
+
+    @property
+    def total(self):
+        return self.count + self.nulls
+
+    @property
+    def var(self):
+        '''Sample variance (ddof=1), matching Pandas'''
+        if self.count < 2:
+            return np.nan
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.var)
+
+    @property
+    def skew(self):
+        '''Adjusted Fisher-Pearson skew, matching Pandas.Series.skew()'''
+        return stats.skew(self.count, self.m2, self.m3)
+
+    @property
+    def kurtosis(self):
+        '''Unbiased excess kurtosis, matching Pandas.Series.kurtosis()'''
+        return stats.kurtosis(self.count, self.m2, self.m4)
+
+    def merge(self, other, unq_limit=10, max_labels=None):
+        '''
+        Combine the statistics of the same feature from two parts of a dataset
+
+        Quantiles are estimated from the merged sketches when both parts
+        kept one, otherwise they are dropped.
+
+        Input:
+        other: ColumnProfile object for the same feature
+        unq_limit: number of unique values to keep
+        max_labels: int or None, drop value_counts once there are more
+                    labels than this
+
+        Output:
+        Return a new ColumnProfile object
+        '''
+        numeric = self.numeric and other.numeric
+        col = ColumnProfile(self.name, _merge_dtypes(self.dtype, other.dtype),
+                            numeric)
+        col.count = self.count + other.count
+        col.nulls = self.nulls + other.nulls
+        if numeric:
+            _merge_moments(col, self, other)
+            if self.sketch is not None and other.sketch is not None:
+                col.sketch = self.sketch.merge(other.sketch)
+                col.quantiles = dict(zip(QUANTILES,
+                                         col.sketch.quantile(QUANTILES)))
+
+        col.placeholders = dict(self.placeholders)
+        for item, hits in other.placeholders.items():
+            col.placeholders[item] = col.placeholders.get(item, 0) + hits
+        col.unique_values = _merge_uniques(self.unique_values,
+                                           other.unique_values, unq_limit)
+
+        if self.value_counts is not None and other.value_counts is not None:
+            counts = pd.concat([self.value_counts, other.value_counts])
+            counts = counts.groupby(level=0, sort=False).sum()
+            col.nunique = len(counts)
+            col.nunique_exact = self.nunique_exact and other.nunique_exact
+            if max_labels is None or len(counts) <= max_labels:
+                col.value_counts = counts
+            else:
+                col.hll = HyperLogLog(HLL_PRECISION).add(counts.index)
+        else:
+            left, right = self.distinct_sketch(), other.distinct_sketch()
+            lower_bound = max(self.nunique, other.nunique)
+            col.nunique_exact = False
+            if left is None or right is None:
+                col.nunique = lower_bound
+            else:
+                col.hll = left.merge(right)
+                col.nunique = max(col.hll.estimate(), lower_bound)
+        return col
+
+    def distinct_sketch(self):
+        '''
+        Return a HyperLogLog sketch of the column's distinct values, built
+        from the counted labels if needed, or None if neither is kept
+        '''
+        if self.hll is not None:
+            return self.hll
+        if self.value_counts is not None:
+            return HyperLogLog(HLL_PRECISION).add(self.value_counts.index)
+        return None
+
+    def to_dict(self):
+        '''
+        Return the statistics as a dict of JSON-friendly values
+        '''
+        counts = None
+        if self.value_counts is not None:
+            counts = [[_encode_value(label) for label in
+                       self.value_counts.index],
+                      [int(count) for count in self.value_counts]]
+        return {
+            'name': _encode_value(self.name),
+            'dtype': str(self.dtype),
+            'numeric': self.numeric,
+            'count': int(self.count),
+            'nulls': int(self.nulls),
+            'moments': [float(self.mean), float(self.m2), float(self.m3),
+                        float(self.m4), float(self.min), float(self.max)],
+            'quantiles': [[q, float(v)] for q, v in self.quantiles.items()],
+            'sketch': None if self.sketch is None else self.sketch.to_dict(),
+            'nunique': int(self.nunique),
+            'nunique_exact': self.nunique_exact,
+            'hll': None if self.hll is None else self.hll.to_dict(),
+            'unique_values': [_encode_value(v) for v in self.unique_values],
+            'value_counts': counts,
+            'placeholders': [[_encode_value(item), int(hits)] for item, hits
+                             in self.placeholders.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        '''
+        Rebuild a ColumnProfile from the output of to_dict()
+        '''
+        col = cls(_decode_value(data['name']), _decode_dtype(data['dtype']),
+                  data['numeric'])
+        col.count = data['count']
+        col.nulls = data['nulls']
+        col.mean, col.m2, col.m3, col.m4, col.min, col.max = data['moments']
+        col.quantiles = {q: v for q, v in data['quantiles']}
+        if data['sketch'] is not None:
+            col.sketch = KLLSketch.from_dict(data['sketch'])
+        col.nunique = data['nunique']
+        col.nunique_exact = data['nunique_exact']
+        if data['hll'] is not None:
+            col.hll = HyperLogLog.from_dict(data['hll'])
+        col.unique_values = [_decode_value(v) for v in data['unique_values']]
+        if data['value_counts'] is not None:
+            labels, counts = data['value_counts']
+            col.value_counts = pd.Series(
+                counts, index=pd.Index([_decode_value(v) for v in labels],
+                                       dtype=object), dtype='int64')
+        col.placeholders = {_decode_value(item): hits
+                            for item, hits in data['placeholders']}
+        return col
+
+
+class Profile:
+    '''
+    Per-column statistics for a whole dataframe, built by build_profile()
+
+    Attributes:
+    n_rows: int, number of rows profiled
+    columns: dict of column label -> ColumnProfile, in column order
+    placeholders: list of placeholder values that were scanned for
+    unq_limit: int, number of unique values kept for each column
+    population: int, number of rows in the data the profiled rows were
+                sampled from, n_rows when they were not sampled
+    '''
+    def __init__(self, n_rows, columns, placeholders, unq_limit,
+                 population=None):
+        self.n_rows = n_rows
+        self.columns = columns
+        self.placeholders = placeholders
+        self.unq_limit = unq_limit
+        self.population = n_rows if population is None else population
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __iter__(self):
+        return iter(self.columns.values())
+
+    def __len__(self):
+        return len(self.columns)
+
+    def merge(self, other, max_labels=None):
+        '''
+        Combine the profiles of two parts of a dataset, as if the parts
+        had been concatenated row-wise and profiled together
+
+        Input:
+        other: Profile object
+        max_labels: int or None, drop a column's value_counts once it has
+                    more labels than this
+
+        Output:
+        Return a new Profile object
+        '''
+        unq_limit = max(self.unq_limit, other.unq_limit)
+        columns = {}
+        for name in list(self.columns) + list(other.columns):
+            if name in columns:
+                continue
+            left = self.columns.get(name) or \
+                _empty_column(other.columns[name], self.n_rows)
+            right = other.columns.get(name) or \
+                _empty_column(self.columns[name], other.n_rows)
+            columns[name] = left.merge(right, unq_limit, max_labels)
+        placeholders = list(dict.fromkeys(self.placeholders +
+                                          other.placeholders))
+        return Profile(self.n_rows + other.n_rows, columns, placeholders,
+                       unq_limit, self.population + other.population)
+
+    def to_bytes(self):
+        '''
+        Serialize the profile to compact bytes, suitable for sending a
+        worker's partial profile to be merged elsewhere
+
+        Output:
+        Return a bytes object readable by Profile.from_bytes()
+        '''
+        data = {'n_rows': int(self.n_rows),
+                'population': int(self.population),
+                'unq_limit': int(self.unq_limit),
+                'placeholders': [_encode_value(item)
+                                 for item in self.placeholders],
+                'columns': [col.to_dict() for col in self]}
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        return FORMAT_HEADER + zlib.compress(payload)
+
+    @classmethod
+    def from_bytes(cls, data):
+        '''
+        Rebuild a Profile from the output of Profile.to_bytes()
+
+        Input:
+        data: bytes object
+
+        Output:
+        Return a Profile object
+        '''
+        if not data.startswith(FORMAT_HEADER):
+            raise ValueError('data is not a serialized walkabout Profile')
+        data = json.loads(zlib.decompress(data[len(FORMAT_HEADER):]))
+        columns = {}
+        for item in data['columns']:
+            col = ColumnProfile.from_dict(item)
+            columns[col.name] = col
+        placeholders = [_decode_value(item) for item in data['placeholders']]
+        return cls(data['n_rows'], columns, placeholders, data['unq_limit'],
+                   data.get('population'))
+
+    @property
+    def shape(self):
+        return (self.n_rows, len(self.columns))
+
+    @property
+    def sampled(self):
+        return self.population > self.n_rows
+
+    @property
+    def numeric_columns(self):
+        return [col.name for col in self if col.numeric]
+
+    @property
+    def categorical_columns(self):
+        return [col.name for col in self if not col.numeric]
+
+    def describe(self):
+        '''
+        Equivalent of Pandas.DataFrame.describe() built from the profile
+
+        Output:
+        Return a Pandas DataFrame of summary statistics, one column per
+        numeric feature. Like Pandas, a dataframe without numeric features
+        is summarized by count, unique, top and freq instead.
+        '''
+        if len(self) and not self.numeric_columns:
+            return self._describe_categorical()
+        stats = {}
+        for col in self:
+            if not col.numeric:
+                continue
+            stats[col.name] = [col.count, col.mean, col.std, col.min] + \
+                [col.quantiles.get(q, np.nan) for q in QUANTILES] + \
+                [col.max]
+        index = ['count', 'mean', 'std', 'min'] + \
+            [f'{q:.0%}' for q in QUANTILES] + ['max']
+        return pd.DataFrame(stats, index=index, columns=list(stats))
+
+    def _describe_categorical(self):
+        stats = {}
+        for col in self:
+            top, freq = np.nan, np.nan
+            if col.value_counts is not None and len(col.value_counts):
+                top = col.value_counts.idxmax()
+                freq = col.value_counts.max()
+            stats[col.name] = [col.count, col.nunique, top, freq]
+        return pd.DataFrame(stats, index=['count', 'unique', 'top', 'freq'],
+                            columns=list(stats), dtype=object)
+
+
+def build_profile(df, placeholders=support.PLACEHOLDERS, unq_limit=10,
+                  max_labels=10000, approximate=False,
+                  precision=HLL_PRECISION, quantile_sketch=False,
+                  n_jobs=1, backend='thread'):
+    '''
+    Profile every column of df in a single pass
+
+    Input:
+    df: Pandas DataFrame object
+    placeholders: list of common placeholder values used in place of null
+    unq_limit: number of unique values to keep for each column
+    max_labels: int or None, default 10000. Columns with more unique values
+                than this do not keep their value_counts
+    approximate: bool, default False. Estimate nUnique with a HyperLogLog
+                 sketch instead of counting every label, and stop collecting
+                 unique values after the first unq_limit. Value counts are
+                 not kept.
+    precision: int, HyperLogLog precision used when approximate is True
+    quantile_sketch: bool, default False. Also keep a KLL sketch of each
+                     numeric column so quartiles survive merging
+    n_jobs: int, default 1. Number of workers profiling columns at the same
+            time, -1 for one per CPU
+    backend: 'thread' (default) or 'process'. Threads share df directly;
+             processes map numeric columns from shared memory and suit
+             object-heavy frames, where threads contend for the GIL
+
+    Output:
+    Return a Profile object. With walkabout.cache enabled, only the columns
+    that changed since they were last profiled with the same options are
+    profiled again.
+    '''
+    profiles = [None] * df.shape[1]
+    store = cache.active()
+    if store is not None:
+        options = (tuple(placeholders), unq_limit, max_labels, approximate,
+                   precision, quantile_sketch)
+        with instrument.stage('cache lookup'):
+            keys = [store.key('profile', store.column_key(df.iloc[:, i]),
+                              options) for i in range(df.shape[1])]
+            profiles = [store.get(key) for key in keys]
+    todo = [i for i, col in enumerate(profiles) if col is None]
+    pending = df if len(todo) == df.shape[1] else df.iloc[:, todo]
+
+    # on the empty head, as select_dtypes copies the columns it selects
+    numerics = frozenset(
+        pending.iloc[:0].select_dtypes(include='number').columns)
+    func = partial(_profile_any, numerics=numerics, placeholders=placeholders,
+                   unq_limit=unq_limit, max_labels=max_labels,
+                   approximate=approximate, precision=precision,
+                   quantile_sketch=quantile_sketch)
+    results = map_columns(func, pending, n_jobs, backend)
+
+    # moments of every numeric column come from one pass over the 2-D block
+    numeric = [col for col in results if col.numeric]
+    with instrument.stage('moments'):
+        moments = stats.numeric_moments(pending, n_jobs=n_jobs)
+    for col, row in zip(numeric, moments.itertuples(index=False)):
+        if col.count:
+            col.mean, col.m2, col.m3, col.m4 = row.mean, row.m2, row.m3, row.m4
+            col.min, col.max = row.min, row.max
+    for i, col in zip(todo, results):
+        profiles[i] = col if store is None else store.put(keys[i], col)
+    columns = {col.name: col for col in profiles}
+    return Profile(len(df), columns, list(placeholders), unq_limit,
+                   sampling.population(df))
+
+
+def build_profile_from_chunks(chunks, placeholders=support.PLACEHOLDERS,
+                              unq_limit=10, max_labels=10000):
+    '''
+    Profile a dataset that arrives as an iterator of DataFrame chunks,
+    such as pd.read_csv(..., chunksize=n). Only one chunk and the
+    accumulated statistics are held in memory at a time.
+
+    Quartiles are estimated from mergeable KLL sketches.
+
+    Input:
+    chunks: iterable of Pandas DataFrame objects sharing the same columns
+    placeholders: list of common placeholder values used in place of null
+    unq_limit: number of unique values to keep for each column
+    max_labels: int or None, default 10000. Columns with more unique values
+                than this stop tracking labels, and their nUnique becomes
+                a lower bound
+
+    Output:
+    Return a Profile object
+    '''
+    profile = None
+    for chunk in chunks:
+        part = build_profile(chunk, placeholders, unq_limit, max_labels,
+                             quantile_sketch=True)
+        profile = part if profile is None else \
+            profile.merge(part, max_labels)
+    if profile is None:
+        profile = Profile(0, {}, list(placeholders), unq_limit)
+    return profile
+
+
+def merge_profiles(profiles, max_labels=None):
+    '''
+    Merge the partial profiles of several shards of a dataset
+
+    Counts, nulls, placeholder hits, value counts and nUnique (while every
+    shard kept its labels) are exact. Mean, std, skew and kurtosis match
+    profiling the concatenated shards up to floating point rounding
+    (relative error around 1e-12). Quartiles are only available when every
+    shard was profiled with quantile_sketch=True, and are then estimates
+    with a rank error of about 1% (see sketch.KLLSketch).
+
+    Input:
+    profiles: iterable of Profile objects, or bytes from Profile.to_bytes()
+    max_labels: int or None, drop a column's value_counts once it has
+                more labels than this
+
+    Output:
+    Return a Profile object
+    '''
+    merged = None
+    for part in profiles:
+        if isinstance(part, bytes):
+            part = Profile.from_bytes(part)
+        merged = part if merged is None else merged.merge(part, max_labels)
+    if merged is None:
+        raise ValueError('merge_profiles requires at least one profile')
+    return merged
+
+
+def _profile_any(series, numerics, placeholders, unq_limit, max_labels,
+                 approximate, precision, quantile_sketch):
+    '''
+    Profile one column with the exact or approximate engine, for map_columns
+    '''
+    numeric = series.name in numerics
+    with instrument.stage('column', series.name):
+        if approximate:
+            return _profile_column_approx(series, numeric, placeholders,
+                                          unq_limit, precision,
+                                          quantile_sketch)
+        return _profile_column(series, numeric, placeholders, unq_limit,
+                               max_labels, quantile_sketch)
+
+
+def _profile_column(series, numeric, placeholders, unq_limit, max_labels,
+                    quantile_sketch=False):
+    '''
+    Compute every statistic for a single column
+
+    Input:
+    series: Pandas Series object
+    numeric: bool, whether to compute moments and quantiles
+    placeholders: list of common placeholder values used in place of null
+    unq_limit: number of unique values to keep
+    max_labels: int or None, the most labels to keep value_counts for
+    quantile_sketch: bool, whether to keep a KLL sketch of numeric values
+
+    Output:
+    Return a ColumnProfile object
+    '''
+    col = ColumnProfile(series.name, series.dtype, numeric)
+
+    # one hash pass gives the uniques, their counts, and the nulls
+    with instrument.stage('unique', series.name):
+        codes, uniques = _factorize(series)
+        null_mask = codes == -1
+        counts = np.bincount(codes[~null_mask], minlength=len(uniques))
+        col.nulls = int(null_mask.sum())
+        col.count = len(series) - col.nulls
+        col.nunique = len(uniques)
+        col.unique_values = _first_uniques(series, codes, uniques, null_mask,
+                                           unq_limit)
+    with instrument.stage('placeholders', series.name):
+        col.placeholders = _placeholders_in_uniques(series.dtype, uniques,
+                                                    counts, placeholders)
+
+    with instrument.stage('labels', series.name):
+        if max_labels is None or len(uniques) <= max_labels:
+            col.value_counts = pd.Series(counts, index=uniques,
+                                         dtype='int64')
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # declared but unseen categories are labels too, like
+                # Series.value_counts() counts them
+                unseen = series.cat.categories.difference(uniques,
+                                                          sort=False)
+                col.value_counts = pd.concat([col.value_counts, pd.Series(
+                    0, index=unseen, dtype='int64')])
+        else:
+            col.hll = HyperLogLog(HLL_PRECISION).add(uniques)
+    if numeric:
+        with instrument.stage('quantiles', series.name):
+            _profile_numeric(col, series, quantile_sketch)
+    return col
+
+
+def _profile_column_approx(series, numeric, placeholders, unq_limit,
+                           precision, quantile_sketch=False):
+    '''
+    Compute the statistics of a single column without a full unique pass
+
+    Input:
+    series: Pandas Series object
+    numeric: bool, whether to compute moments and quantiles
+    placeholders: list of common placeholder values used in place of null
+    unq_limit: number of unique values to keep
+    precision: int, HyperLogLog precision
+    quantile_sketch: bool, whether to keep a KLL sketch of numeric values
+
+    Output:
+    Return a ColumnProfile object
+    '''
+    col = ColumnProfile(series.name, series.dtype, numeric)
+    null_mask = series.isnull().to_numpy()
+    col.nulls = int(null_mask.sum())
+    col.count = len(series) - col.nulls
+    values = series[~null_mask]
+
+    with instrument.stage('placeholders', series.name):
+        hits = support.placeholder_counts(series.to_frame(), placeholders)
+        hits = hits.iloc[0] if len(hits) else hits
+        col.placeholders = {item: int(n) for item, n in hits.items() if n}
+
+    with instrument.stage('unique', series.name):
+        _approximate_uniques(col, series, values, null_mask, unq_limit,
+                             precision)
+
+    if numeric:
+        with instrument.stage('quantiles', series.name):
+            _profile_numeric(col, series, quantile_sketch)
+    return col
+
+
+def _approximate_uniques(col, series, values, null_mask, unq_limit,
+                         precision):
+    '''
+    Fill in the unique values and nUnique of a column, scanning only until
+    more than unq_limit values are seen and estimating nUnique after that
+    '''
+    # constant columns are caught with one comparison, no hashing
+    if col.count and (values.to_numpy() == values.iloc[0]).all():
+        col.nunique = 1
+        col.unique_values = [values.iloc[0]]
+        if col.nulls:
+            position = int(null_mask.argmax() > (~null_mask).argmax())
+            col.unique_values.insert(position, series[null_mask].iloc[0])
+        col.unique_values = col.unique_values[:unq_limit]
+    else:
+        col.unique_values, complete = _scan_uniques(series, unq_limit)
+        seen = sum(1 for value in col.unique_values if not pd.isnull(value))
+        if complete:
+            col.nunique = seen
+        else:
+            col.hll = HyperLogLog(precision).add(values)
+            col.nunique = max(col.hll.estimate(), seen + 1)
+            col.nunique_exact = False
+
+
+def _scan_uniques(series, unq_limit, block=4096):
+    '''
+    Collect unique values in order of appearance, one growing block of rows
+    at a time, stopping as soon as more than unq_limit have been seen
+
+    Output:
+    Return a list of at most unq_limit values and a bool that is True when
+    the whole column was scanned and every unique value is in the list
+    '''
+    values = []
+    has_null = False
+    start = 0
+    while start < len(series):
+        for value in pd.unique(series.iloc[start:start + block]):
+            if pd.isnull(value):
+                if has_null:
+                    continue
+                has_null = True
+            elif any(_same_value(value, seen) for seen in values):
+                continue
+            values.append(value)
+            if len(values) > unq_limit:
+                return values[:unq_limit], False
+        start += block
+        block *= 2
+    return values, True
+
+
+def _profile_numeric(col, series, quantile_sketch=False):
+    '''
+    Fill in the quantiles of a numeric column. The moments and extremes are
+    filled in for all numeric columns at once by build_profile.
+
+    Input:
+    col: ColumnProfile object to update
+    series: Pandas Series object containing numeric values
+    quantile_sketch: bool, whether to keep a KLL sketch of the values
+    '''
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    values = values[~np.isnan(values)]
+    if quantile_sketch:
+        col.sketch = KLLSketch().add(values)
+    if len(values) == 0:
+        col.quantiles = {q: np.nan for q in QUANTILES}
+        return
+    col.quantiles = dict(zip(QUANTILES, np.quantile(values, QUANTILES)))
+
+
+def _factorize(series):
+    '''
+    pd.factorize, except that categorical columns reuse their codes rather
+    than hashing them again
+
+    Output:
+    Return the codes, in order of first appearance with -1 for nulls, and
+    the unique values
+    '''
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.factorize(series)
+    codes = series.cat.codes.to_numpy()
+    present = codes >= 0
+    # first position of each category, found by writing positions backwards
+    n_categories = len(series.cat.categories)
+    first = np.full(n_categories, len(codes))
+    positions = np.flatnonzero(present)
+    first[codes[positions[::-1]]] = positions[::-1]
+    order = np.argsort(first, kind='stable')[:np.count_nonzero(
+        first < len(codes))]
+    # the extra last slot maps the null code -1 to itself
+    relabel = np.full(n_categories + 1, -1, dtype=np.intp)
+    relabel[order] = np.arange(len(order))
+    return relabel[codes], series.cat.categories[order]
+
+
+def _first_uniques(series, codes, uniques, null_mask, unq_limit):
+    '''
+    Return the first unq_limit unique values in order of appearance,
+    with the first null placed where it appears, like Series.unique()
+    '''
+    values = list(uniques[:unq_limit])
+    if null_mask.any():
+        first_null = int(null_mask.argmax())
+        before = codes[:first_null]
+        position = int(before.max()) + 1 if first_null else 0
+        if position < unq_limit:
+            values.insert(position, series.iloc[first_null])
+            values = values[:unq_limit]
+    return values
+
+
+def _placeholders_in_uniques(dtype, uniques, counts, placeholders):
+    '''
+    Count how often each placeholder occurs using the already counted uniques
+
+    Input:
+    dtype: the dtype of the column the uniques came from
+    uniques: array of unique values from pd.factorize
+    counts: array of counts for each unique value
+    placeholders: list of common placeholder values used in place of null
+
+    Output:
+    Return a dict of placeholder -> count for placeholders that are present
+    '''
+    candidates = support._compatible_placeholders(dtype, placeholders)
+    if not candidates or len(uniques) == 0:
+        return {}
+    mask = support._isin(uniques, candidates)
+    return support._placeholder_hits(uniques[mask], counts[mask], candidates)
+
+
+def _merge_moments(col, a, b):
+    '''
+    Combine count, mean, and central moment sums of two parts into col
+    (Pebay, 2008), along with the extremes
+    '''
+    keys = ('count', 'mean', 'm2', 'm3', 'm4', 'min', 'max')
+    merged = stats._merge_block_moments(
+        {key: np.float64(getattr(a, key)) for key in keys},
+        {key: np.float64(getattr(b, key)) for key in keys})
+    for key in keys[1:]:
+        setattr(col, key, float(merged[key]))
+
+
+def _merge_uniques(left, right, unq_limit):
+    '''
+    Append the unique values of right that are not already in left, keeping
+    order of appearance and at most unq_limit values
+    '''
+    values = list(left)
+    has_null = any(pd.isnull(value) for value in values)
+    for value in right:
+        if len(values) >= unq_limit:
+            break
+        if pd.isnull(value):
+            if not has_null:
+                values.append(value)
+                has_null = True
+        elif not any(_same_value(value, seen) for seen in values):
+            values.append(value)
+    return values
+
+
+def _same_value(a, b):
+    '''
+    Equality that never raises and treats nulls as different from values
+    '''
+    if pd.isnull(b):
+        return False
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+def _merge_dtypes(a, b):
+    '''
+    Return the dtype that can hold values of both dtypes
+    '''
+    if a == b:
+        return a
+    try:
+        return np.result_type(a, b)
+    except TypeError:
+        return np.dtype('O')
+
+
+def _empty_column(template, n_rows):
+    '''
+    Return a ColumnProfile of n_rows nulls for a column missing from a part
+    '''
+    col = ColumnProfile(template.name, template.dtype, template.numeric)
+    col.nulls = n_rows
+    if template.sketch is not None:
+        col.sketch = KLLSketch()
+    col.unique_values = [np.nan] if n_rows else []
+    col.value_counts = pd.Series([], dtype='int64')
+    return col
+
+
+def _encode_value(value):
+    '''
+    Tag a label with its type so it survives a JSON round trip
+    '''
+    if value is None:
+        return ['n', None]
+    if value is pd.NaT:
+        return ['T', None]
+    if isinstance(value, (bool, np.bool_)):
+        return ['b', bool(value)]
+    if isinstance(value, (int, np.integer)):
+        return ['i', int(value)]
+    if isinstance(value, (float, np.floating)):
+        return ['f', float(value)]
+    if isinstance(value, str):
+        return ['s', value]
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return ['t', pd.Timestamp(value).isoformat()]
+    if isinstance(value, (pd.Timedelta, np.timedelta64)):
+        return ['d', int(pd.Timedelta(value).value)]
+    return ['s', str(value)]
+
+
+def _decode_value(item):
+    '''
+    Inverse of _encode_value
+    '''
+    kind, value = item
+    if kind == 'T':
+        return pd.NaT
+    if kind == 't':
+        return pd.Timestamp(value)
+    if kind == 'd':
+        return pd.Timedelta(value)
+    return value
+
+
+def _decode_dtype(name):
+    '''
+    Turn a dtype's string form back into a dtype, falling back to object
+    '''
+    try:
+        return pd.api.types.pandas_dtype(name)
+    except TypeError:
+        return np.dtype('O')
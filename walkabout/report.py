@@ -1,171 +1,391 @@
-import pandas as pd
 import numpy as np
-from math import ceil
 from tabulate import tabulate
-from sklearn.feature_selection import SelectKBest
-from sklearn.feature_selection import f_regression, f_classif
-from . import support
+from . import support, stats, sampling, missing, instrument
+from .profile import Profile, build_profile
 
 
 __all__ = ['nulls', 'type_and_unique', 'rundown', 'assess_categoricals',
-           'numeric_distribution', 'high_correlations',
+           'numeric_distribution', 'high_correlations', 'mcar_test',
            'simple_feature_importance', 'interaction_feature_importance']
 
 
-def nulls(df, placeholders=support.PLACEHOLDERS):
+@instrument.staged
+def nulls(df, placeholders=support.PLACEHOLDERS, n_jobs=1, sample=None,
+          seed=None, null_correlation=None, mcar=False, alpha=.05):
     '''
     Report null distribution, any possible placeholders, and
     simple recommendations
 
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame or Profile object
     placeholders: list of common placeholder values used in place of null.
-                  Report.nulls() is case sensitive ('none' != 'None')
+                  Report.nulls() is case sensitive ('none' != 'None').
+                  Ignored when df is a Profile, which was already scanned.
+    n_jobs: int, default 1, number of columns profiled in parallel,
+            -1 for one per CPU
+    sample: int number of rows or float fraction of rows, default None.
+            Report on a random sample of df, with a 95% confidence
+            interval for each %Null
+    seed: int or None, seed for the random sample
+    null_correlation: float or None, default None. List the features whose
+                      nulls correlate (phi) with each feature's nulls at
+                      least this much, such as .5, and summarize the
+                      missingness patterns. The pattern table can hold a
+                      row per distinct pattern, up to one per row of df,
+                      so None skips this analysis. Needs a DataFrame
+                      rather than a Profile.
+    mcar: bool, default False, run Little's MCAR test on the numeric
+          features (see mcar_test) and use it in their recommendations.
+          Needs a DataFrame rather than a Profile.
+    alpha: float, default .05, significance level of the MCAR test
 
     Output:
     Print report to screen
     '''
-    null_count = df.isnull().sum().loc
-    total = len(df)
+    if sample is not None and not isinstance(df, Profile):
+        with instrument.stage('sample'):
+            df = sampling.sample_rows(df, sample, seed)
+    profile = _as_profile(df, placeholders=placeholders, n_jobs=n_jobs)
+    total = profile.n_rows
     headers = ['Column', 'Nulls', '%Null', 'Placeholders', 'Recommendation']
+    if profile.sampled:
+        headers.insert(3, '95% CI')
     table = []
 
+    # the null masks show which features go missing together
+    mask, partners = None, {}
+    if null_correlation is not None and not isinstance(df, Profile) and \
+            any(col.nulls for col in profile):
+        with instrument.stage('null mask'):
+            mask = missing.build_null_mask(df)
+            partners = _null_partners(mask.phi(), null_correlation)
+    little = None
+    if mcar and not isinstance(df, Profile):
+        with instrument.stage('mcar'):
+            little = missing.little_mcar(df)
+        tested = set(little['features']) if little['dof'] > 0 else set()
+
     # Iterate through each column and append null details to table
-    for column in df.columns:
-        calc = null_count[column]/total*100
+    for col in profile:
+        # a frame without rows has no nulls, rather than dividing by zero
+        calc = col.nulls/total*100 if total else 0.0
         null_per = str(calc)+'%'
-        p_hold = _placeholders_present(df[column], placeholders)
-        rec = _null_rec_lookup(calc, p_hold)
-        table.append([column, null_count[column], null_per, p_hold, rec])
+        p_hold = support.list_to_string(list(col.placeholders))
+        is_mcar = None
+        if little is not None and col.name in tested:
+            is_mcar = bool(little['p_value'] >= alpha)
+        rec = _null_rec_lookup(calc, p_hold, is_mcar)
+        row = [col.name, col.nulls, null_per, p_hold, rec]
+        if profile.sampled:
+            low, high = sampling.proportion_interval(col.nulls, total,
+                                                     profile.population)
+            row.insert(3, f'{low:.1%} - {high:.1%}')
+        if partners:
+            row.append(support.list_to_string(partners.get(col.name, [])))
+        table.append(row)
+    if partners:
+        headers.append('Nulls Correlate With')
 
     # output with tabulate library
-    print(tabulate(table, headers))
+    _print_table(table, headers)
+    if mask is not None:
+        with instrument.stage('patterns'):
+            summary = _pattern_summary(mask.patterns())
+        print(summary)
+    if little is not None:
+        print(_mcar_summary(little, alpha))
+    _print_sample_note(profile)
+
+
+def _null_partners(phi, threshold):
+    '''
+    Map each feature to the other features whose null indicators have a
+    phi correlation of at least threshold with its own, strongest first
+    '''
+    values = phi.to_numpy(copy=True)
+    np.fill_diagonal(values, np.nan)
+    partners = {}
+    for i, name in enumerate(phi.index):
+        hits = np.flatnonzero(values[i] >= threshold)
+        if len(hits):
+            hits = hits[np.argsort(-values[i, hits], kind='stable')]
+            partners[name] = [f'{phi.columns[j]} ({values[i, j]:.2f})'
+                              for j in hits]
+    return partners
+
+
+def _pattern_summary(patterns):
+    '''
+    One line describing the distinct missingness patterns of the rows
+    '''
+    top = patterns.iloc[0]
+    missing_features = [name for name in patterns.columns[:-1] if top[name]]
+    described = support.list_to_string(missing_features) or 'nothing'
+    share = top['Count'] / patterns['Count'].sum()
+    return (f'Missingness Patterns: {len(patterns)}. The most common, '
+            f'missing {described}, covers {share:.1%} of rows.')
+
+
+@instrument.staged
+def mcar_test(df, alpha=.05, sample=None, seed=None):
+    '''
+    Little's test of whether the numeric features are missing completely
+    at random (MCAR). If they are, dropping incomplete rows or simple
+    imputation will not bias estimates; if not, the nulls depend on the
+    data and imputing from the other features is safer.
+
+    Rows are grouped once by their pattern of nulls and the test works
+    from per-pattern sums, so its cost grows with the number of patterns
+    rather than rows. See missing.little_mcar.
+
+    Input:
+    df: Pandas DataFrame object
+    alpha: float, default .05, significance level
+    sample: int number of rows or float fraction of rows, default None.
+            Test a random sample of df
+    seed: int or None, seed for the random sample
+
+    Output:
+    Print report to the screen and return the dict of results from
+    missing.little_mcar
+    '''
+    if sample is not None:
+        with instrument.stage('sample'):
+            df = sampling.sample_rows(df, sample, seed)
+    with instrument.stage('mcar'):
+        result = missing.little_mcar(df)
+    _print_table([[result['statistic'], result['dof'], result['p_value'],
+                   result['patterns']]],
+                 ['Chi-Square', 'DF', 'P-Value', 'Patterns'])
+    print()
+    print(_mcar_summary(result, alpha))
+    population = sampling.population(df)
+    if population > len(df):
+        print(_sample_note(len(df), population))
+    return result
+
+
+def _mcar_summary(result, alpha):
+    '''
+    One line stating the outcome of Little's MCAR test
+    '''
+    if not result['dof'] > 0:
+        return "Little's MCAR Test: no numeric nulls to test."
+    verdict = 'rejected' if result['p_value'] < alpha else 'not rejected'
+    return (f"Little's MCAR Test: p = {result['p_value']:.4g} over "
+            f"{result['patterns']} patterns, missing completely at random "
+            f"is {verdict} at alpha {alpha}.")
 
 
+@instrument.staged
 def _describe(df):
     '''
     Simple mod to Pandas.DataFrame.describe() to support Reports.rundown
 
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame or Profile object
 
     Output:
     Print report to screen
     '''
-    headers = ['Column'] + list(df.describe()[1:].T)
-    table = df.describe()[1:].T.reset_index().to_numpy()
+    profile = _as_profile(df)
+    with instrument.stage('statistics'):
+        describe = profile.describe()[1:].T
+        if profile.sampled and 'mean' in describe:
+            counts = [profile[name].count for name in describe.index]
+            margin = sampling.mean_margin(describe['std'].astype(float),
+                                          counts, profile.population)
+            describe.insert(1, '±95%', margin)
+    headers = ['Column'] + list(describe)
+    table = describe.reset_index().to_numpy()
 
     # output with tabulate library
-    print(tabulate(table, headers))
+    _print_table(table, headers)
+    _print_sample_note(profile, '±95% is the margin of error of the mean.')
 
 
-def type_and_unique(df, unq_limit=10):
+@instrument.staged
+def type_and_unique(df, unq_limit=10, approximate=False, precision=12,
+                    n_jobs=1, sample=None, seed=None):
     '''
     Report data type of all features, number of unique values, and
     some of those values
 
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame or Profile object
     unq_limit: number of unique items from each feature to display
                if unique items is less than unq_limit then all
                items are displayed
+    approximate: bool, default False. Estimate nUnique with a HyperLogLog
+                 sketch instead of an exact unique pass. Estimates are
+                 marked with ~ and their standard error is reported.
+    precision: int between 4 and 18, default 12, HyperLogLog precision.
+               Higher is more accurate and uses 2**precision bytes per
+               feature.
+    n_jobs: int, default 1, number of columns profiled in parallel,
+            -1 for one per CPU
+    sample: int number of rows or float fraction of rows, default None.
+            Report on a random sample of df. nUnique then only counts
+            values that made it into the sample.
+    seed: int or None, seed for the random sample
 
     Output:
     Print report to screen
     '''
-    cols = df.columns
-    d_types = list(df.dtypes)
-    num_unique = list(df.nunique())
+    profile = _as_profile(df, sample, seed, unq_limit=unq_limit,
+                          approximate=approximate, precision=precision,
+                          n_jobs=n_jobs)
     table = []
     headers = ['Column', 'Type', 'nUnique', 'Unique Values']
-
-    for i in range(len(cols)):
-        unique_vals = support.list_to_string(
-                      list(df[cols[i]].unique()[:unq_limit]))
-        if num_unique[i] == 1:
+    show_error = any(col.hll is not None and not col.nunique_exact
+                     for col in profile)
+    if show_error:
+        headers.insert(3, 'nUnique Error')
+
+    for col in profile:
+        shown = col.unique_values[:unq_limit]
+        unique_vals = support.list_to_string(shown)
+        if col.nunique == 1:
             unique_vals += ' WARNING: CONSTANT VALUE'
-        elif (len(list(df[cols[i]].unique())) > unq_limit):
+        elif (col.nunique + (col.nulls > 0)) > len(shown):
             unique_vals += '...'
-        table.append([cols[i], str(d_types[i]), num_unique[i], unique_vals])
-    print(tabulate(table, headers))
-
-
+        row = [col.name, str(col.dtype), _nunique_label(col), unique_vals]
+        if show_error:
+            error = ''
+            if col.hll is not None and not col.nunique_exact:
+                error = f'±{col.hll.error:.1%}'
+            row.insert(3, error)
+        table.append(row)
+    _print_table(table, headers)
+    _print_sample_note(profile, 'nUnique counts sampled values only and may '
+                       'be higher in the full data.')
+
+
+@instrument.staged
 def rundown(df, include_shape=True, include_describe=True,
-            include_nulls=True, include_types_uniques=True):
+            include_nulls=True, include_types_uniques=True,
+            approximate=False, n_jobs=1, sample=None, seed=None):
     '''
     Report giving an overview of a dataframe
 
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame or Profile object
+    approximate: bool, default False. Estimate the number of unique values
+                 with a HyperLogLog sketch, see type_and_unique
+    n_jobs: int, default 1, number of columns profiled in parallel,
+            -1 for one per CPU. For a process pool, pass a Profile built
+            with profile.build_profile(df, n_jobs=n, backend='process')
+    sample: int number of rows or float fraction of rows, default None.
+            Report on a random sample of df, with confidence intervals
+            for the estimates
+    seed: int or None, seed for the random sample
 
     Output:
     Print report to screen
     '''
+    profile = _as_profile(df, sample, seed, approximate=approximate,
+                          n_jobs=n_jobs)
     if include_shape is True:
         print('DataFrame Shape')
-        print(f'Rows: {df.shape[0]}    Columns: {df.shape[1]}')
+        print(f'Rows: {profile.population}    Columns: {profile.shape[1]}')
+        if profile.sampled:
+            print(f'Sampled Rows: {profile.n_rows}')
         print()
     if include_describe is True:
-        _describe(df)
+        _describe(profile)
         print()
     if include_nulls is True:
-        nulls(df)
+        nulls(profile)
         print()
     if include_types_uniques is True:
-        type_and_unique(df)
+        type_and_unique(profile)
 
 
+@instrument.staged
 def assess_categoricals(df, low_thresh=.05, high_thresh=.51,
-                        return_low_violators=False):
+                        return_low_violators=False, n_jobs=1,
+                        max_violators=50, sample=None, seed=None):
     '''
     Report for categorical features, highlighting labels in a feature
     that are the majority or extreme minority classifiers
 
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame or Profile object
     low_thresh: float minimum percent distribution desired before binning
     high_thresh: float max percent distribution for majority classifiers
     return_low_violators: bool, if true, include labels below low_thresh
                           as part of report
+    n_jobs: int, default 1, number of columns profiled in parallel,
+            -1 for one per CPU
+    max_violators: int or None, default 50. The most violating labels
+                   listed per feature, most frequent first; the rest are
+                   summarized as "... (n more)"
+    sample: int number of rows or float fraction of rows, default None.
+            Assess a random sample of df, noting the margin of error of
+            the label shares
+    seed: int or None, seed for the random sample
 
     Output:
     Print report to screen
     '''
-    cols = df.select_dtypes(exclude='number').columns
+    if not isinstance(df, Profile):
+        # numeric features are skipped below, so they are never profiled
+        df = df.select_dtypes(exclude='number')
+    profile = _as_profile(df, sample, seed, max_labels=None, n_jobs=n_jobs)
     headers = ['Feature', '# Below Thresh', 'nUnique', 'High Thresh Violators']
     if return_low_violators is True:
         headers.append('Low Thresh Violators')
     table = []
 
     # iterate over all features
-    for feature in cols:
-        val_counts = df[feature].value_counts(normalize=True)
-        low_thresh_count = 0
-        low_thresh_violators = []
-        high_thresh_violators = []
-
-        # count and record values below low_thresh, and above high_thresh
-        for label in val_counts.index:
-            if val_counts[label] < low_thresh:
-                low_thresh_count += 1
-                low_thresh_violators.append(label)
-            elif val_counts[label] > high_thresh:
-                high_thresh_violators.append(label)
+    for col in profile:
+        if col.numeric:
+            continue
+        if col.value_counts is None:
+            row = [col.name, '', _nunique_label(col),
+                   'Too many labels to assess']
+            table.append(row + [''] if return_low_violators else row)
+            continue
+
+        # classify every label at once, most frequent first
+        counts = col.value_counts.to_numpy()
+        order = np.argsort(-counts, kind='stable')
+        share = counts[order] / col.count
+        labels = col.value_counts.index[order]
+        low = share < low_thresh
+        high = ~low & (share > high_thresh)
 
         # append to table based on whether we are returning low_violators
+        row = [col.name, int(low.sum()), len(counts),
+               _violator_string(labels, high, max_violators)]
         if return_low_violators is True:
-            table.append([feature, low_thresh_count, len(val_counts),
-                          support.list_to_string(high_thresh_violators),
-                          support.list_to_string(low_thresh_violators)])
-        else:
-            table.append([feature, low_thresh_count, len(val_counts),
-                          support.list_to_string(high_thresh_violators)])
+            row.append(_violator_string(labels, low, max_violators))
+        table.append(row)
 
     # output with tabulate library
-    print(tabulate(table, headers))
+    _print_table(table, headers)
+    if profile.sampled:
+        # the widest interval is the one for a share of one half
+        low, high = sampling.proportion_interval(profile.n_rows / 2,
+                                                 profile.n_rows,
+                                                 profile.population)
+        _print_sample_note(profile, 'Label shares are within '
+                           f'±{(high - low) / 2:.1%} (95%).')
 
 
-def numeric_distribution(df):
+def _violator_string(labels, mask, limit):
+    '''
+    Join the labels selected by mask, stringifying at most limit of them
+    '''
+    hits = np.flatnonzero(mask)
+    text = support.list_to_string(list(labels[hits[:limit]]))
+    if limit is not None and len(hits) > limit:
+        text += ', ... ({} more)'.format(len(hits) - limit)
+    return text
+
+
+@instrument.staged
+def numeric_distribution(df, n_jobs=1, sample=None, seed=None):
     '''
     Report the skew and excess kurtosis of all numeric features in a dataframe
 
@@ -173,67 +393,151 @@ def numeric_distribution(df):
     the normal distribution(kurtosis = 3)
 
     Input:
-    df: Pandas DataFrame object
+    df: Pandas DataFrame or Profile object
+    n_jobs: int, default 1, number of column blocks reduced in parallel,
+            -1 for one per CPU
+    sample: int number of rows or float fraction of rows, default None.
+            Report on a random sample of df, noting the standard errors
+    seed: int or None, seed for the random sample
 
     Output:
     Print report to the screen
     '''
     headers = ['Feature', 'Skew', 'Skew Meaning', 'Excess Kurtosis']
     table = []
-    cols = df.select_dtypes(include='number').columns
+    if isinstance(df, Profile):
+        profile = df
+        shape = [(col.name, col.skew, col.kurtosis) for col in df
+                 if col.numeric]
+    else:
+        if sample is not None:
+            df = sampling.sample_rows(df, sample, seed)
+        profile = Profile(len(df), {}, [], 0, sampling.population(df))
+        with instrument.stage('moments'):
+            moments = stats.numeric_moments(df, n_jobs=n_jobs)
+        shape = zip(moments.index, moments['skew'], moments['kurtosis'])
+
+    for name, skew, kurtosis in shape:
+        table.append([name, skew, _skew_translation(skew), kurtosis])
+
+    _print_table(table, headers)
+    if profile.sampled:
+        # normal-theory standard errors of sample skew and kurtosis
+        n = profile.n_rows
+        skew_error = sampling.Z_95 * np.sqrt(6 / n)
+        kurtosis_error = sampling.Z_95 * np.sqrt(24 / n)
+        _print_sample_note(profile, f'Skew is within ±{skew_error:.2f} and '
+                           f'Excess Kurtosis within ±{kurtosis_error:.2f} '
+                           'for normal data (95%).')
+
+
+@instrument.staged
+def high_correlations(df, threshold=.7, method='pearson', block_size=1024,
+                      dtype=np.float64, sample=None, seed=None):
+    '''
+    Report correlations in df that exceed the threshold.
 
-    for col in cols:
-        skew = df[col].skew()
-        table.append([col, skew, _skew_translation(skew),
-                     (df[col].kurtosis()-3)])
+    Input:
+    df: Pandas DataFrame object
+    threshold: float, default is .7, range should be between [-1, 1],
+    method: 'pearson' (default) or 'spearman'
+    block_size: int, number of features correlated per tile, the full
+                correlation matrix is never built
+    dtype: np.float64 (default) or np.float32 for a faster, lighter pass
+    sample: int number of rows or float fraction of rows, default None.
+            Correlate a random sample of df and add the 95% confidence
+            interval of each correlation as 'CI Low' and 'CI High'
+    seed: int or None, seed for the random sample
 
-    print(tabulate(table, headers))
+    Output:
+    Print report to the screen and return the pairs as a Pandas DataFrame
+    sorted by absolute correlation
+    '''
+    if sample is not None:
+        with instrument.stage('sample'):
+            df = sampling.sample_rows(df, sample, seed)
+    with instrument.stage('correlations'):
+        pairs = stats.correlation_pairs(df, abs(threshold), method,
+                                        block_size, dtype)
+    population = sampling.population(df)
+    if population > len(df):
+        pairs['CI Low'], pairs['CI High'] = sampling.correlation_interval(
+            pairs['Value'].to_numpy(), len(df))
+    _print_table(pairs.to_numpy(), list(pairs.columns))
+    print('\nThreshold:', threshold)
+    if population > len(df):
+        print(_sample_note(len(df), population))
+    return pairs
 
 
-def high_correlations(df, threshold=.7):
+def _as_profile(df, sample=None, seed=None, **kwargs):
     '''
-    Report correlations in df that exceed the threshold.
+    Return df unchanged if it is already a Profile, otherwise profile it
 
     Input:
-    df: Pandas DataFrame object
-    threshold: float, default is .7, range should be between [-1, 1],
+    df: Pandas DataFrame or Profile object
+    sample: int, float or None, profile a random sample of df's rows,
+            see sampling.sample_rows
+    seed: int or None, seed for the random sample
+    kwargs: keyword arguments passed on to build_profile
 
     Output:
-    Print report to the screen.
+    Return a Profile object
     '''
+    if isinstance(df, Profile):
+        return df
+    if sample is not None:
+        with instrument.stage('sample'):
+            df = sampling.sample_rows(df, sample, seed)
+    with instrument.stage('profile'):
+        return build_profile(df, **kwargs)
 
-    table = []
-    headers = ['Feature 1', 'Feature 2', 'Value']
-    corr_df = df.corr()
-    columns = corr_df.columns
-
-    for i in range(len(corr_df)):
-        for j in range(i+1, len(corr_df)):
-            if ((corr_df.iloc[i, j]**2) > (threshold**2)):
-                table.append([columns[i], columns[j], corr_df.iloc[i, j]])
-    print(tabulate(table, headers))
-    print('\nThreshold:', threshold)
 
+def _print_table(table, headers):
+    '''
+    Format a table with the tabulate library and print it
+    '''
+    with instrument.stage('format'):
+        text = tabulate(table, headers)
+    print(text)
 
-def _placeholders_present(column, placeholders=support.PLACEHOLDERS):
+
+def _sample_note(n_rows, population):
+    '''
+    Line saying how much of the data a report was estimated from
+    '''
+    return (f'Estimated from a random sample of {n_rows} of {population} '
+            f'rows ({n_rows / population:.2%}).')
+
+
+def _print_sample_note(profile, detail=''):
+    '''
+    Print the sample note, and any detail about the estimates, when the
+    profile was built from a sample
     '''
-    Return a list of values that are both in column and placeholders
+    if profile.sampled:
+        note = _sample_note(profile.n_rows, profile.population)
+        print(note + ' ' + detail if detail else note)
+
+
+def _nunique_label(col):
+    '''
+    Format a column's unique count, marking estimates and lower bounds
 
     Input:
-    column: Pandas Series object
-    placeholders: a list of values commonly used in place of null
+    col: ColumnProfile object
 
     Output:
-    Return a list of values that are both in column and placeholders
+    Return an int, or a string such as '~1200' or '10000+'
     '''
-    p_holds = []
-    for item in placeholders:
-        if len(column.isin([item]).unique()) == 2:
-            p_holds.append(item)
-    return support.list_to_string(list(set(p_holds)))
+    if col.nunique_exact:
+        return col.nunique
+    if col.hll is not None:
+        return f'~{col.nunique}'
+    return f'{col.nunique}+'
 
 
-def _null_rec_lookup(null_percent, placeholders=None):
+def _null_rec_lookup(null_percent, placeholders=None, mcar=None):
     '''
     Recommend course of action for handling nulls based on
     findings from Report.nulls
@@ -241,12 +545,12 @@ def _null_rec_lookup(null_percent, placeholders=None):
     Input:
     null_percent: float, percent of a column that is null
     placeholders: bool, whether the column contains placeholders
+    mcar: bool or None, whether Little's test found the nulls consistent
+          with MCAR, None if the column was not tested
 
     Output:
     Return a string recommendation
     '''
-    # Recommendation Change - Include MCAR once Little's T-test added
-    # https://www.youtube.com/watch?v=2gkw2T5jAfo&feature=youtu.be
     # https://stefvanbuuren.name/fimd/sec-MCAR.html
     if placeholders:
         return 'Possible Placeholders: Replace and rerun nulls report.'
@@ -255,8 +559,16 @@ def _null_rec_lookup(null_percent, placeholders=None):
     elif null_percent >= 75:
         return 'Near Empty Column: Create binary feature or drop'
     elif null_percent >= 25:
-        return 'Partially Filled Column: Assess manually'
+        if mcar is None:
+            return 'Partially Filled Column: Assess manually'
+        return 'Partially Filled Column: Assess manually' + \
+            (' (MCAR)' if mcar else ' (not MCAR)')
     elif null_percent > 0:
+        if mcar:
+            return 'Mostly Filled Column: Impute values or drop rows (MCAR)'
+        elif mcar is False:
+            return 'Mostly Filled Column: Impute from other features ' \
+                '(not MCAR)'
         return 'Mostly Filled Column: Impute values'
     else:
         return ''
@@ -280,34 +592,39 @@ def _skew_translation(skew):
         return 'Approximately Symmetric'
 
 
+@instrument.staged
 def simple_feature_importance(X, y, model='reg'):
-    score_func = {'reg': f_regression,
-                  'clas': f_classif}
-
-    # Score each of the features
-    bestfeatures = SelectKBest(score_func=score_func[model], k='all')
-    fit = bestfeatures.fit(X, y)
-
-    # Organize and return the scores
-    featureScores = pd.DataFrame([X.columns, fit.scores_]).T
-    featureScores.columns = ['Feature', 'Score']
-    return featureScores.sort_values(
-            'Score', ascending=False).set_index('Feature')
-
-
-def interaction_feature_importance(X, y, model='reg'):
-    df = pd.DataFrame()
-    cols = X.columns
-
-    # iterate over all features to get interaction features
-    for i in range(len(cols)):
-        for j in range(i, len(cols)):
-            # naming the feature
-            feature = cols[i] + ' * ' + cols[j]
-            if cols[i] == cols[j]:
-                feature = cols[i] + '^2'
-            # create the interaction feature
-            df[feature] = X[cols[i]] * X[cols[j]]
-
-    # call simple_feature_importance on the new dataframe
-    return simple_feature_importance(df, y, model)
+    '''
+    Score each feature in X against y with a univariate F-test
+
+    Input:
+    X: Pandas DataFrame object of numeric features
+    y: target feature
+    model: 'reg' for regression or 'clas' for classification
+
+    Output:
+    Return a Pandas DataFrame of float scores indexed by feature, best first
+    '''
+    scores = stats.FScorer(model).partial_fit(X, y).scores()
+    scores.index.name = 'Feature'
+    return scores.to_frame().sort_values('Score', ascending=False)
+
+
+@instrument.staged
+def interaction_feature_importance(X, y, model='reg', k=None, block_size=256,
+                                   n_jobs=1):
+    '''
+    Score every pairwise interaction (product) of the features in X
+
+    Input:
+    X: Pandas DataFrame object of numeric features
+    y: target feature
+    model: 'reg' for regression or 'clas' for classification
+    k: int or None, default None. Keep only the k best interactions
+    block_size: int, number of interaction features built at a time
+    n_jobs: int, default 1, number of blocks scored in parallel
+
+    Output:
+    Return a Pandas DataFrame of scores indexed by feature, best first
+    '''
+    return stats.interaction_f_scores(X, y, model, k, block_size, n_jobs)
@@ -0,0 +1,293 @@
+'''
+Row samplers for exploring tables too large to report on in full
+
+Samples are ordinary DataFrames that remember the size of the data they
+were drawn from (see population()), so reports on a sample can say how far
+their estimates may be from the full data.
+'''
+import numpy as np
+import pandas as pd
+
+
+__all__ = ['sample_rows', 'reservoir_sample', 'stratified_sample',
+           'population', 'proportion_interval', 'mean_margin',
+           'correlation_interval']
+
+
+SAMPLE_ATTR = 'walkabout_sample'
+Z_95 = 1.959964
+
+
+def sample_rows(df, sample, seed=None):
+    '''
+    Draw a simple random sample of rows without replacement, keeping the
+    rows in their original order
+
+    Input:
+    df: Pandas DataFrame object
+    sample: int number of rows, or float fraction of rows between 0 and 1
+    seed: int or None, seed for the random number generator
+
+    Output:
+    Return a Pandas DataFrame. df itself is returned when the sample would
+    cover every row.
+    '''
+    n = _sample_size(sample, len(df))
+    if n >= len(df):
+        return df
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(df), n, replace=False))
+    return _mark(df.iloc[rows], population(df), None)
+
+
+def reservoir_sample(chunks, n, seed=None):
+    '''
+    Draw a simple random sample of n rows from an iterable of DataFrame
+    chunks in one pass, holding at most n rows plus one chunk in memory
+
+    Every row gets a random key and the n smallest keys are kept (a bottom-k
+    reservoir), which gives each set of n rows the same chance of being
+    drawn no matter how the data is chunked.
+
+    Input:
+    chunks: iterable of Pandas DataFrame objects, for example
+            pd.read_csv(path, chunksize=100000)
+    n: int, number of rows to keep
+    seed: int or None, seed for the random number generator
+
+    Output:
+    Return a Pandas DataFrame of at most n rows in their original order
+    '''
+    return _reservoir(chunks, n, None, seed)
+
+
+def stratified_sample(data, by, sample, seed=None):
+    '''
+    Draw a sample with the same share of rows from every label of by as the
+    full data, so class balance is kept for plots split by by
+
+    Each label gets round(sample * its share) rows, rounded so the total
+    is exact, and at least one row when sample allows it. Nulls in by are
+    a label of their own.
+
+    Input:
+    data: Pandas DataFrame object, or an iterable of DataFrame chunks
+    by: label of the column to stratify by
+    sample: int number of rows. A DataFrame also accepts a float fraction
+            of rows between 0 and 1
+    seed: int or None, seed for the random number generator
+
+    Output:
+    Return a Pandas DataFrame of the sampled rows in their original order
+    '''
+    if isinstance(data, pd.DataFrame):
+        n = _sample_size(sample, len(data))
+        if n >= len(data):
+            return data
+        return _reservoir([data], n, by, seed)
+    return _reservoir(data, sample, by, seed)
+
+
+def population(df):
+    '''
+    Number of rows in the data df was sampled from, len(df) if it is not a
+    sample
+
+    Input:
+    df: Pandas DataFrame object
+
+    Output:
+    Return an int
+    '''
+    return df.attrs.get(SAMPLE_ATTR, {}).get('population', len(df))
+
+
+def proportion_interval(hits, n, population=None, z=Z_95):
+    '''
+    Wilson score interval for a proportion estimated from a sample, with
+    the finite population correction
+
+    Input:
+    hits: int or array of ints, number of sampled rows with the property
+    n: int, sample size
+    population: int or None, number of rows sampled from. None means
+                infinite
+    z: float, default 1.96 for a 95% interval
+
+    Output:
+    Return a tuple of the lower and upper bounds, as floats or arrays
+    '''
+    hits = np.asarray(hits, dtype=np.float64)
+    if n == 0:
+        return np.full(hits.shape, np.nan), np.full(hits.shape, np.nan)
+    p = hits / n
+    z2 = (z * _fpc(n, population)) ** 2
+    center = (p + z2 / (2 * n)) / (1 + z2 / n)
+    half = np.sqrt(z2 * p * (1 - p) / n + z2 * z2 / (4 * n * n)) / \
+        (1 + z2 / n)
+    return np.clip(center - half, 0, 1), np.clip(center + half, 0, 1)
+
+
+def mean_margin(std, n, population=None, z=Z_95):
+    '''
+    Half width of the confidence interval of a mean estimated from a sample
+
+    Input:
+    std: float or array, sample standard deviation
+    n: int or array, number of non-null sampled values
+    population: int or None, number of rows sampled from
+    z: float, default 1.96 for a 95% interval
+
+    Output:
+    Return a float or array
+    '''
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return z * np.asarray(std) / np.sqrt(n) * _fpc(n, population)
+
+
+def correlation_interval(r, n, z=Z_95):
+    '''
+    Fisher z confidence interval of a correlation estimated from n rows
+
+    Input:
+    r: float or array of correlations
+    n: int, number of rows
+    z: float, default 1.96 for a 95% interval
+
+    Output:
+    Return a tuple of the lower and upper bounds, as floats or arrays
+    '''
+    with np.errstate(invalid='ignore', divide='ignore'):
+        center = np.arctanh(np.clip(r, -1, 1))
+        half = z / np.sqrt(n - 3)
+        return np.tanh(center - half), np.tanh(center + half)
+
+
+def _sample_size(sample, total):
+    '''
+    Turn a row count or fraction into a number of rows
+    '''
+    if isinstance(sample, float):
+        if not 0 < sample <= 1:
+            raise ValueError('a sample fraction must be between 0 and 1')
+        return int(round(sample * total))
+    if sample < 0:
+        raise ValueError('sample must not be negative')
+    return int(sample)
+
+
+def _fpc(n, population):
+    '''
+    Finite population correction for sampling n of population rows
+    '''
+    if population is None or population <= 1:
+        return 1.0
+    return np.sqrt(np.clip((population - n) / (population - 1), 0, 1))
+
+
+def _mark(sample, size, by):
+    '''
+    Record on sample how many rows it was drawn from, and the stratifier
+    '''
+    sample.attrs = dict(sample.attrs)
+    sample.attrs[SAMPLE_ATTR] = {'population': int(size), 'by': by}
+    return sample
+
+
+def _reservoir(chunks, n, by, seed):
+    '''
+    Bottom-k sampler behind reservoir_sample and stratified_sample. With by
+    it keeps up to n candidates per label, then trims every label to its
+    share once the label counts are known.
+    '''
+    rng = np.random.default_rng(seed)
+    labels = {}
+    kept = None
+    keys = np.empty(0)
+    strata = np.empty(0, dtype=np.intp)
+    positions = np.empty(0, dtype=np.int64)
+    counts = np.zeros(0, dtype=np.int64)
+    seen = 0
+    for chunk in chunks:
+        chunk_keys = rng.random(len(chunk))
+        chunk_strata = np.zeros(len(chunk), dtype=np.intp)
+        if by is not None:
+            chunk_strata = _label_codes(chunk[by], labels)
+            counts = np.concatenate([counts, np.zeros(
+                len(labels) - len(counts), dtype=np.int64)])
+            counts += np.bincount(chunk_strata, minlength=len(labels))
+
+        # trim the chunk on its own first so only candidates are copied
+        chosen = _bottom_k(chunk_keys, chunk_strata, n)
+        part = chunk.iloc[chosen]
+        kept = part if kept is None else pd.concat([kept, part])
+        keys = np.concatenate([keys, chunk_keys[chosen]])
+        strata = np.concatenate([strata, chunk_strata[chosen]])
+        positions = np.concatenate([positions, seen + chosen])
+        seen += len(chunk)
+
+        chosen = _bottom_k(keys, strata, n)
+        kept, keys = kept.iloc[chosen], keys[chosen]
+        strata, positions = strata[chosen], positions[chosen]
+
+    if kept is None:
+        return pd.DataFrame()
+    if by is not None:
+        quota = _allocate(counts, min(n, seen))
+        chosen = _bottom_k(keys, strata, quota)
+        kept, positions = kept.iloc[chosen], positions[chosen]
+    kept = kept.iloc[np.argsort(positions, kind='stable')]
+    return _mark(kept, seen, by)
+
+
+def _bottom_k(keys, strata, k):
+    '''
+    Positions of the k smallest keys within each stratum. k is an int, or
+    an array with the quota of every stratum.
+    '''
+    order = np.lexsort((keys, strata))
+    ordered = strata[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(
+        np.r_[starts, len(order)]))
+    limit = k[ordered] if np.ndim(k) else k
+    return np.sort(order[rank < limit])
+
+
+def _allocate(counts, n):
+    '''
+    Split n rows across strata in proportion to counts, by largest
+    remainder, giving every non-empty stratum at least one row if possible
+    '''
+    total = counts.sum()
+    if total == 0:
+        return np.zeros(len(counts), dtype=np.int64)
+    exact = counts * n / total
+    quota = np.floor(exact).astype(np.int64)
+    present = counts > 0
+    if n >= present.sum():
+        quota[present & (quota == 0)] = 1
+    short = n - quota.sum()
+    if short > 0:
+        remainder = np.where(quota < counts, exact - quota, -np.inf)
+        quota[np.argsort(-remainder, kind='stable')[:short]] += 1
+    elif short < 0:
+        # minimums overshot, take rows back from the largest strata
+        for i in np.argsort(-quota, kind='stable')[:-short]:
+            quota[i] -= 1
+    return np.minimum(quota, counts)
+
+
+def _label_codes(values, labels):
+    '''
+    Codes of values in the running dict of labels, adding new labels
+    '''
+    codes, uniques = pd.factorize(values)
+    # the extra last slot stands for nulls, which factorize codes as -1
+    mapping = np.empty(len(uniques) + 1, dtype=np.intp)
+    for i, label in enumerate(list(uniques) + [np.nan]):
+        if label not in labels:
+            labels[label] = len(labels)
+        mapping[i] = labels[label]
+    return mapping[codes]
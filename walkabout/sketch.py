@@ -0,0 +1,257 @@
+'''
+Small, mergeable sketches for approximate statistics on large data
+'''
+import base64
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['HyperLogLog', 'KLLSketch']
+
+
+class HyperLogLog:
+    '''
+    HyperLogLog estimate of the number of distinct values (Flajolet et al.,
+    2007) with the small range correction. Adding the same value twice has
+    no effect, so sketches of overlapping data can be merged.
+
+    Input:
+    precision: int between 4 and 18, default 12. The sketch keeps
+               2**precision one-byte registers and has a standard error of
+               about 1.04 / sqrt(2**precision), 1.6% at the default.
+    '''
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 18:
+            raise ValueError('precision must be between 4 and 18')
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    @property
+    def error(self):
+        '''Relative standard error of the estimate'''
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def add(self, values):
+        '''
+        Add an array-like of non-null values to the sketch
+
+        Input:
+        values: Pandas Series, Index, or array-like
+        '''
+        hashes = _hash_values(values)
+        if len(hashes) == 0:
+            return self
+        p = self.precision
+        bucket = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+
+        # rank is the position of the leftmost 1 bit in the remaining bits
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (64 - p - bit_length + 1).astype(np.uint8)
+
+        # write ranks in ascending order so each bucket ends with its max
+        order = np.argsort(rank, kind='stable')
+        latest = np.zeros_like(self.registers)
+        latest[bucket[order]] = rank[order]
+        np.maximum(self.registers, latest, out=self.registers)
+        return self
+
+    def merge(self, other):
+        '''
+        Combine with another sketch of the same precision
+
+        Input:
+        other: HyperLogLog object
+
+        Output:
+        Return a new HyperLogLog object counting the union of both
+        '''
+        if other.precision != self.precision:
+            raise ValueError('cannot merge sketches of different precision')
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def estimate(self):
+        '''
+        Output:
+        Return the estimated number of distinct values as an int
+        '''
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+    def to_dict(self):
+        return {'precision': self.precision,
+                'registers': base64.b64encode(
+                    self.registers.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['precision'])
+        sketch.registers = np.frombuffer(
+            base64.b64decode(data['registers']), dtype=np.uint8).copy()
+        return sketch
+
+
+class KLLSketch:
+    '''
+    KLL quantile sketch (Karnin, Lang, Liberty, 2016). Values are kept in
+    levels of compactors, where a value at level h stands for 2**h values.
+    A level that outgrows its capacity is sorted and every other value is
+    promoted. While nothing has been compacted the answers are exact.
+
+    Input:
+    k: int, default 200. Capacity of the top level; the normalized rank
+       error is roughly 1.7 / k, about 1% at the default
+    seed: int or None, seed for the random compaction offsets
+    '''
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, values):
+        '''
+        Add an array-like of numbers to the sketch, ignoring NaNs
+
+        Input:
+        values: Pandas Series or array-like of numeric values
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.count += len(values)
+        self.min = np.nanmin([self.min, values.min()])
+        self.max = np.nanmax([self.max, values.max()])
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        '''
+        Combine with another sketch
+
+        Input:
+        other: KLLSketch object
+
+        Output:
+        Return a new KLLSketch object summarizing both
+        '''
+        merged = KLLSketch(max(self.k, other.k))
+        merged.count = self.count + other.count
+        merged.min = np.nanmin([self.min, other.min]) if merged.count \
+            else np.nan
+        merged.max = np.nanmax([self.max, other.max]) if merged.count \
+            else np.nan
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [np.concatenate([
+            self.levels[h] if h < len(self.levels) else np.empty(0),
+            other.levels[h] if h < len(other.levels) else np.empty(0)])
+            for h in range(depth)]
+        merged._compress()
+        return merged
+
+    def quantile(self, q):
+        '''
+        Estimate one or more quantiles
+
+        Input:
+        q: float or list of floats between 0 and 1
+
+        Output:
+        Return a float, or an array of floats if q is a list
+        '''
+        scalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if self.count == 0:
+            result = np.full(len(q), np.nan)
+        elif len(self.levels) == 1:
+            result = np.quantile(self.levels[0], q)
+        else:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(level), 2.0 ** h)
+                                      for h, level in
+                                      enumerate(self.levels)])
+            order = np.argsort(items, kind='stable')
+            items, weights = items[order], weights[order]
+            # the first item whose cumulative weight reaches the rank
+            cumulative = np.cumsum(weights)
+            position = np.searchsorted(cumulative, q * cumulative[-1])
+            result = items[np.minimum(position, len(items) - 1)]
+            result[q <= 0] = self.min
+            result[q >= 1] = self.max
+        return float(result[0]) if scalar else result
+
+    def to_dict(self):
+        return {'k': self.k, 'count': int(self.count),
+                'min': float(self.min), 'max': float(self.max),
+                'levels': [base64.b64encode(level.tobytes()).decode('ascii')
+                           for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['k'])
+        sketch.count = data['count']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch.levels = [np.frombuffer(base64.b64decode(level),
+                                       dtype=np.float64).copy()
+                         for level in data['levels']]
+        return sketch
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        '''
+        Compact every level that is over capacity, promoting half of its
+        values to the level above
+        '''
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # an odd item out stays behind, the rest are halved
+            keep = items[:len(items) % 2]
+            pairs = items[len(items) % 2:]
+            offset = self._rng.integers(2)
+            self.levels[level + 1] = np.concatenate(
+                [self.levels[level + 1], pairs[offset::2]])
+            self.levels[level] = keep
+            # capacities shrink as levels are added, so start over
+            level = 0
+
+
+def _hash_values(values):
+    '''
+    Hash values to uint64, treating equal ints and floats alike
+    '''
+    values = np.asarray(values)
+    if values.dtype.kind == 'b':
+        values = values.astype(np.int64)
+    elif values.dtype.kind in 'USV':
+        values = values.astype(object)
+    if values.dtype.kind != 'f':
+        # ints hash exactly, beyond the 2**53 a float can tell apart
+        return pd.util.hash_array(values, categorize=False)
+    hashes = pd.util.hash_array(values, categorize=False)
+    with np.errstate(invalid='ignore'):
+        integral = (np.floor(values) == values) & (np.abs(values) < 2 ** 63)
+    hashes[integral] = pd.util.hash_array(values[integral].astype(np.int64),
+                                          categorize=False)
+    return hashes
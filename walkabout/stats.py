@@ -0,0 +1,984 @@
+'''
+Vectorized statistical kernels behind the reports
+'''
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import numpy as np
+from . import cache
+from ._parallel import resolve_jobs
+
+
+__all__ = ['numeric_moments', 'correlation_pairs', 'interaction_f_scores',
+           'FScorer', 'BinnedDistribution', 'univariate_aggregates',
+           'categorical_crosstabs', 'lowess']
+
+
+MOMENTS = ['count', 'mean', 'std', 'min', 'max', 'skew', 'kurtosis',
+           'm2', 'm3', 'm4']
+
+# cells converted to float at a time by numeric_moments, which bounds its
+# temporaries to a few times 8 * BLOCK_VALUES bytes whatever the frame size
+BLOCK_VALUES = 1 << 19
+
+
+def numeric_moments(df, block_size=256, n_jobs=1):
+    '''
+    Count, mean, spread, skew and excess kurtosis of every numeric feature
+    in one pass over the data
+
+    Columns are taken block_size at a time, and each block is converted to
+    float a slice of rows at a time, about BLOCK_VALUES cells per slice.
+    Every slice is reduced column-wise with NaNs masked out and merged
+    into the running moments, so nothing is rescanned per statistic and
+    memory does not grow with the number of rows. Skew and kurtosis match
+    Pandas.Series.skew() and Pandas.Series.kurtosis().
+
+    Input:
+    df: Pandas DataFrame object
+    block_size: int, number of features converted and reduced at a time
+    n_jobs: int, default 1, number of blocks reduced in parallel,
+            -1 for one per CPU
+
+    Output:
+    Return a Pandas DataFrame indexed by feature with float columns count,
+    mean, std, min, max, skew, kurtosis, and the central moment sums m2,
+    m3 and m4. With walkabout.cache enabled, the moments of unchanged
+    columns are reused.
+    '''
+    # select_dtypes would copy the numeric block, so pick columns by dtype
+    # and take each one as a view
+    header = df.iloc[:0].set_axis(range(df.shape[1]), axis=1)
+    positions = list(header.select_dtypes(include='number').columns)
+    columns = [df.iloc[:, j] for j in positions]
+    index = df.columns[positions]
+    store = cache.active()
+    if store is None:
+        return _frame_moments(columns, index, block_size, n_jobs)
+    keys = [store.key('moments', store.column_key(column))
+            for column in columns]
+    rows = [store.get(key) for key in keys]
+    todo = [i for i, row in enumerate(rows) if row is None]
+    if todo:
+        fresh = _frame_moments([columns[i] for i in todo], index[todo],
+                               block_size, n_jobs)
+        for i, row in zip(todo, fresh.to_numpy()):
+            rows[i] = store.put(keys[i], row)
+    return pd.DataFrame(np.reshape(rows, (len(rows), len(MOMENTS))),
+                        index=index, columns=MOMENTS, dtype=np.float64)
+
+
+def _frame_moments(columns, index, block_size, n_jobs):
+    '''
+    numeric_moments of a list of numeric Series, computed block by block
+    '''
+    starts = range(0, len(columns), block_size)
+    n_rows = len(columns[0]) if columns else 0
+
+    def reduce_block(start):
+        arrays = [column.array
+                  for column in columns[start:start + block_size]]
+        step = max(min(BLOCK_VALUES // len(arrays), n_rows), 1)
+        # column-major so each column is reduced with pairwise summation
+        buffer = np.empty((step, len(arrays)), order='F')
+        total = _block_moments(buffer[:0])
+        for row in range(0, n_rows, step):
+            part = buffer[:min(step, n_rows - row)]
+            for j, array in enumerate(arrays):
+                part[:, j] = array[row:row + step].to_numpy(
+                    dtype=np.float64, na_value=np.nan)
+            total = _merge_block_moments(total, _block_moments(part))
+        return total
+
+    with ThreadPoolExecutor(resolve_jobs(n_jobs)) as pool:
+        parts = list(pool.map(reduce_block, starts))
+    moments = {key: np.concatenate([part[key] for part in parts])
+               if parts else np.empty(0)
+               for key in ('count', 'mean', 'm2', 'm3', 'm4', 'min', 'max')}
+
+    n = moments['count']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.sqrt(moments['m2'] / (n - 1))
+    std[n < 2] = np.nan
+    result = pd.DataFrame({
+        'count': n, 'mean': moments['mean'], 'std': std,
+        'min': moments['min'], 'max': moments['max'],
+        'skew': skew(n, moments['m2'], moments['m3']),
+        'kurtosis': kurtosis(n, moments['m2'], moments['m4']),
+        'm2': moments['m2'], 'm3': moments['m3'], 'm4': moments['m4']},
+        index=index, dtype=np.float64)
+    return result
+
+
+def skew(n, m2, m3):
+    '''
+    Adjusted Fisher-Pearson skew from the count and the second and third
+    central moment sums, matching Pandas.Series.skew()
+
+    Input:
+    n, m2, m3: numbers or numpy arrays
+
+    Output:
+    Return a float or numpy array, nan where n < 3 and 0 for constants
+    '''
+    n, m2, m3 = (np.asarray(item, dtype=np.float64) for item in (n, m2, m3))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        g1 = (m3 / n) / (m2 / n) ** 1.5
+        result = g1 * np.sqrt(n * (n - 1)) / (n - 2)
+    result = np.where(m2 == 0, 0.0, result)
+    return _scalar(np.where(n < 3, np.nan, result))
+
+
+def kurtosis(n, m2, m4):
+    '''
+    Unbiased excess kurtosis from the count and the second and fourth
+    central moment sums, matching Pandas.Series.kurtosis()
+
+    Input:
+    n, m2, m4: numbers or numpy arrays
+
+    Output:
+    Return a float or numpy array, nan where n < 4 and 0 for constants
+    '''
+    n, m2, m4 = (np.asarray(item, dtype=np.float64) for item in (n, m2, m4))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        numerator = n * (n + 1) * (n - 1) * m4
+        denominator = (n - 2) * (n - 3) * m2 ** 2
+        adj = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        result = numerator / denominator - adj
+    result = np.where(m2 == 0, 0.0, result)
+    return _scalar(np.where(n < 4, np.nan, result))
+
+
+def _block_moments(values):
+    '''
+    Column-wise count, mean, central moment sums and extremes of a 2-D
+    float array, ignoring NaNs
+    '''
+    present = ~np.isnan(values)
+    count = present.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(present, values, 0).sum(axis=0) / count
+        dev = np.where(present, values - mean, 0)
+    dev2 = dev * dev
+    empty = count == 0
+    low = np.where(present, values, np.inf).min(axis=0, initial=np.inf)
+    high = np.where(present, values, -np.inf).max(axis=0, initial=-np.inf)
+    low[empty], high[empty] = np.nan, np.nan
+    return {'count': count, 'mean': mean, 'm2': dev2.sum(axis=0),
+            'm3': (dev2 * dev).sum(axis=0), 'm4': (dev2 * dev2).sum(axis=0),
+            'min': low, 'max': high}
+
+
+def _merge_block_moments(a, b):
+    '''
+    Column-wise merge of the count, mean, central moment sums and extremes
+    of two parts of the same columns (Pebay, 2008)
+    '''
+    na, nb = a['count'], b['count']
+    n = na + nb
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = b['mean'] - a['mean']
+        delta_n = delta / n
+        merged = {
+            'count': n,
+            'mean': a['mean'] + delta_n * nb,
+            'm2': a['m2'] + b['m2'] + delta * delta_n * na * nb,
+            'm3': (a['m3'] + b['m3'] +
+                   delta * delta_n ** 2 * na * nb * (na - nb) +
+                   3 * delta_n * (na * b['m2'] - nb * a['m2'])),
+            'm4': (a['m4'] + b['m4'] +
+                   delta * delta_n ** 3 * na * nb *
+                   (na * na - na * nb + nb * nb) +
+                   6 * delta_n ** 2 * (na * na * b['m2'] + nb * nb * a['m2']) +
+                   4 * delta_n * (na * b['m3'] - nb * a['m3']))}
+    # an empty part leaves the other unchanged
+    for key in ('mean', 'm2', 'm3', 'm4'):
+        merged[key] = np.where(na == 0, b[key],
+                               np.where(nb == 0, a[key], merged[key]))
+    merged['min'] = np.fmin(a['min'], b['min'])
+    merged['max'] = np.fmax(a['max'], b['max'])
+    return merged
+
+
+def _scalar(result):
+    '''
+    Unwrap 0-d arrays into floats
+    '''
+    return float(result) if np.ndim(result) == 0 else result
+
+
+def correlation_pairs(df, threshold=.7, method='pearson', block_size=1024,
+                      dtype=np.float64):
+    '''
+    Find every pair of numeric features whose correlation exceeds threshold
+    in absolute value, without building the full correlation matrix
+
+    The correlation matrix is computed one block_size x block_size tile at
+    a time with matrix multiplies, and only the pairs above threshold are
+    kept from each tile. Each block of columns is standardized when its
+    tiles are computed, so only two blocks are held at a time. Missing
+    values are handled pairwise, like Pandas.DataFrame.corr().
+
+    Input:
+    df: Pandas DataFrame object
+    threshold: float, default .7, pairs with |r| > threshold are returned
+    method: 'pearson' (default) or 'spearman'. With missing values,
+            spearman ranks each column over all of its non-null values
+            rather than re-ranking every pair
+    block_size: int, number of features per tile. Peak extra memory is
+                about n_rows * block_size * 2 values, twice that with
+                missing values
+    dtype: np.float64 (default) or np.float32, which halves memory and
+           speeds up the multiplies at about 1e-6 precision
+
+    Output:
+    Return a Pandas DataFrame with columns 'Feature 1', 'Feature 2' and
+    'Value', sorted by absolute correlation, largest first. With
+    walkabout.cache enabled, tiles whose columns are all unchanged are
+    reused, and a block is only standardized if one of its tiles is missing.
+    '''
+    if method not in ('pearson', 'spearman'):
+        raise ValueError("method must be 'pearson' or 'spearman'")
+    # select_dtypes would copy the numeric block, so pick columns by dtype
+    # and take each one as a view
+    header = df.iloc[:0].set_axis(range(df.shape[1]), axis=1)
+    positions = list(header.select_dtypes(include=['number', 'bool']).columns)
+    numeric = [df.iloc[:, j] for j in positions]
+    columns = df.columns[positions]
+    p = len(numeric)
+    store = cache.active()
+    if store is not None:
+        keys = [store.column_key(column) for column in numeric]
+
+    found = []
+    for i in range(0, p, block_size):
+        left = slice(i, min(i + block_size, p))
+        left_block = None
+        for j in range(i, p, block_size):
+            right = slice(j, min(j + block_size, p))
+            tile = None
+            if store is not None:
+                tile_key = store.key('correlation', method,
+                                     np.dtype(dtype).str, keys[left],
+                                     keys[right])
+                tile = store.get(tile_key)
+            if tile is None:
+                if left_block is None:
+                    left_block = _standardize(numeric[left], method, dtype)
+                # the right block is freed as soon as its tile is done
+                tile = _correlation_tile(
+                    *left_block, *(left_block if j == i else
+                                   _standardize(numeric[right], method,
+                                                dtype)))
+                if store is not None:
+                    store.put(tile_key, tile)
+            hits = np.abs(tile) > threshold
+            if i == j:
+                hits &= np.triu(np.ones(tile.shape, dtype=bool), k=1)
+            rows, cols = np.nonzero(hits)
+            found.append((rows + i, cols + j, tile[rows, cols]))
+
+    first = np.concatenate([item[0] for item in found]) if found else []
+    second = np.concatenate([item[1] for item in found]) if found else []
+    corr = np.concatenate([item[2] for item in found]) if found else []
+    pairs = pd.DataFrame({'Feature 1': columns[first],
+                          'Feature 2': columns[second],
+                          'Value': np.asarray(corr, dtype=np.float64)})
+    order = np.argsort(-pairs['Value'].abs().to_numpy(), kind='stable')
+    return pairs.iloc[order].reset_index(drop=True)
+
+
+def _standardize(columns, method, dtype):
+    '''
+    Center and scale a block of columns one at a time, ranking them first
+    for spearman, and zero out missing values
+
+    Output:
+    Return the standardized 2-D array, and a float mask of the non-null
+    cells or None if nothing is missing
+    '''
+    n_rows = len(columns[0])
+    values = np.empty((n_rows, len(columns)), dtype=dtype, order='F')
+    mask = None
+    for j, column in enumerate(columns):
+        if isinstance(column.dtype, np.dtype):
+            x = np.asarray(column.to_numpy(), dtype=np.float64)
+        else:
+            x = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        if method == 'spearman':
+            x = pd.Series(x).rank().to_numpy()
+        missing = np.isnan(x)
+        x = np.where(missing, 0.0, x)
+        count = n_rows - missing.sum()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x -= x.sum() / count
+            x[missing] = 0
+            x /= np.sqrt(np.dot(x, x) / count)
+        values[:, j] = x
+        if missing.any():
+            if mask is None:
+                mask = np.ones(values.shape, dtype=dtype, order='F')
+            mask[:, j] = ~missing
+    return values, mask
+
+
+def _correlation_tile(a, mask_a, b, mask_b):
+    '''
+    Correlations between the standardized columns of a and of b
+
+    Without missing values this is a single matrix multiply. Otherwise the
+    pairwise-complete sums are built from products with the null masks,
+    a slice of about BLOCK_VALUES cells of rows at a time.
+    '''
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if mask_a is None and mask_b is None:
+            return (a.T @ b) / len(a)
+        step = max(BLOCK_VALUES // max(a.shape[1], b.shape[1]), 1)
+        sums = None
+        for row in range(0, max(len(a), 1), step):
+            pa, pb = a[row:row + step], b[row:row + step]
+            ma = np.ones_like(pa) if mask_a is None else mask_a[row:row + step]
+            mb = np.ones_like(pb) if mask_b is None else mask_b[row:row + step]
+            part = [ma.T @ mb, pa.T @ mb, (pa * pa).T @ mb, pa.T @ pb]
+            if b is not a:
+                part += [ma.T @ pb, ma.T @ (pb * pb)]
+            sums = part if sums is None else \
+                [total + item for total, item in zip(sums, part)]
+        n, sum_a, sum_aa, sum_ab = sums[:4]
+        # a diagonal tile's other sums are the transposes
+        sum_b, sum_bb = sums[4:] if b is not a else (sum_a.T, sum_aa.T)
+        cov = n * sum_ab - sum_a * sum_b
+        var_a = n * sum_aa - sum_a * sum_a
+        var_b = n * sum_bb - sum_b * sum_b
+        return cov / np.sqrt(var_a * var_b)
+
+
+def interaction_f_scores(X, y, model='reg', k=None, block_size=256,
+                         n_jobs=1):
+    '''
+    Score every pairwise product (and square) of the features in X against
+    y without materializing the expanded matrix
+
+    Products are generated block_size pairs at a time, each block is scored
+    from its sufficient statistics (the same F-statistics as sklearn's
+    f_regression and f_classif), and only the running top k are kept, so
+    memory stays at about n_rows * block_size * n_jobs values.
+
+    Input:
+    X: Pandas DataFrame object of numeric features
+    y: Pandas Series or array-like target
+    model: 'reg' for a continuous target, 'clas' for class labels
+    k: int or None, default None. Number of top interactions to keep, all
+       of them when None
+    block_size: int, number of interaction features built at a time
+    n_jobs: int, default 1, number of blocks scored in parallel,
+            -1 for one per CPU
+
+    Output:
+    Return a Pandas DataFrame indexed by 'Feature' with a float 'Score'
+    column, sorted by score
+    '''
+    score = _block_scorer(y, model)
+    values = X.to_numpy(dtype=np.float64)
+    _check_finite(values, 'X')
+    cols = [str(col) for col in X.columns]
+    first, second = np.triu_indices(len(cols))
+    starts = range(0, len(first), block_size)
+
+    def score_block(start):
+        left = first[start:start + block_size]
+        right = second[start:start + block_size]
+        return start, score(values[:, left] * values[:, right])
+
+    best_index = np.empty(0, dtype=np.intp)
+    best_score = np.empty(0)
+    pending_index, pending_score, pending = [], [], 0
+    with ThreadPoolExecutor(resolve_jobs(n_jobs)) as pool:
+        for start, scores in pool.map(score_block, starts):
+            pending_index.append(np.arange(start, start + len(scores)))
+            pending_score.append(scores)
+            pending += len(scores)
+            # fold pending blocks into the running top k once they add up
+            if k is not None and pending > k:
+                best_index, best_score = _top_k(
+                    [best_index] + pending_index,
+                    [best_score] + pending_score, k)
+                pending_index, pending_score, pending = [], [], 0
+    best_index, best_score = _top_k([best_index] + pending_index,
+                                     [best_score] + pending_score, k)
+
+    order = np.argsort(-_rankable(best_score), kind='stable')
+    best_index, best_score = best_index[order], best_score[order]
+    names = [cols[i] + '^2' if i == j else cols[i] + ' * ' + cols[j]
+             for i, j in zip(first[best_index], second[best_index])]
+    return pd.DataFrame({'Score': best_score},
+                        index=pd.Index(names, name='Feature'))
+
+
+class FScorer:
+    '''
+    Univariate F-scores of every feature against a target, accumulated one
+    chunk at a time. Only the sufficient statistics are kept: co-moments
+    with y for a continuous target, and per-class counts, means and sums of
+    squared deviations for class labels, so memory does not grow with rows.
+    Scores match sklearn's f_regression and f_classif on the concatenated
+    chunks.
+
+    Input:
+    model: 'reg' for a continuous target, 'clas' for class labels
+    '''
+    def __init__(self, model='reg'):
+        if model not in ('reg', 'clas'):
+            raise ValueError("model must be 'reg' or 'clas'")
+        self.model = model
+        self.columns = None
+        self.classes = []
+        self.moments = None
+
+    def partial_fit(self, X, y):
+        '''
+        Add a chunk of rows to the scores
+
+        Input:
+        X: Pandas DataFrame object of numeric features
+        y: Pandas Series or array-like target for the same rows
+
+        Output:
+        Return the FScorer object
+        '''
+        if self.columns is None:
+            self.columns = X.columns
+        elif not X.columns.equals(self.columns):
+            raise ValueError('every chunk must have the same columns')
+        if len(X) == 0:
+            return self
+        values = X.to_numpy(dtype=np.float64)
+        _check_finite(values, 'X')
+        if self.model == 'reg':
+            y = np.asarray(y, np.float64)
+            _check_finite(y, 'y')
+            chunk = _regression_moments(values, y)
+            self.moments = chunk if self.moments is None else \
+                _merge_regression(self.moments, chunk)
+        else:
+            codes = self._class_codes(y)
+            chunk = _class_moments(values, codes, len(self.classes))
+            self.moments = chunk if self.moments is None else \
+                _merge_classes(self.moments, chunk)
+        return self
+
+    def merge(self, other):
+        '''
+        Combine with a scorer fit on other rows of the same features
+
+        Input:
+        other: FScorer object
+
+        Output:
+        Return a new FScorer object
+        '''
+        if other.model != self.model:
+            raise ValueError('cannot merge scorers of different models')
+        merged = FScorer(self.model)
+        merged.columns = self.columns if self.columns is not None \
+            else other.columns
+        merged.classes = list(self.classes)
+        mine, theirs = self.moments, other.moments
+        if self.model == 'clas' and theirs is not None:
+            # line the other scorer's classes up with ours
+            codes = merged._class_codes(pd.Index(other.classes, dtype=object))
+            mine = _pad_classes(mine, len(merged.classes))
+            theirs = _pad_classes(theirs, len(merged.classes), codes)
+        if mine is None or theirs is None:
+            merged.moments = mine if theirs is None else theirs
+        elif self.model == 'reg':
+            merged.moments = _merge_regression(mine, theirs)
+        else:
+            merged.moments = _merge_classes(mine, theirs)
+        return merged
+
+    def scores(self):
+        '''
+        Output:
+        Return a float Pandas Series of F-scores indexed by feature, in
+        column order
+        '''
+        if self.moments is None:
+            raise ValueError('no data has been added')
+        if self.model == 'reg':
+            scores = _f_regression(self.moments)
+        else:
+            scores = _f_classif(self.moments)
+        return pd.Series(scores, index=self.columns, name='Score',
+                         dtype=np.float64)
+
+    def _class_codes(self, y):
+        '''
+        Map labels to stable class indexes, adding unseen labels at the end
+        '''
+        codes, labels = pd.factorize(np.asarray(y))
+        _check_labels(codes)
+        lookup = {label: i for i, label in enumerate(self.classes)}
+        mapping = np.empty(len(labels), dtype=np.intp)
+        for i, label in enumerate(labels):
+            if label not in lookup:
+                lookup[label] = len(self.classes)
+                self.classes.append(label)
+            mapping[i] = lookup[label]
+        return mapping[codes]
+
+
+def _block_scorer(y, model):
+    '''
+    Return a function that takes a 2-D block of features and returns
+    their F-scores against y
+    '''
+    if model == 'reg':
+        y = np.asarray(y, dtype=np.float64)
+        _check_finite(y, 'y')
+        return lambda block: _f_regression(_regression_moments(block, y))
+    if model == 'clas':
+        codes, classes = pd.factorize(np.asarray(y), sort=True)
+        _check_labels(codes)
+        return lambda block: _f_classif(
+            _class_moments(block, codes, len(classes)))
+    raise ValueError("model must be 'reg' or 'clas'")
+
+
+def _check_finite(values, name):
+    '''
+    Raise a ValueError, worded like sklearn's, if values hold NaN or
+    infinity, which would otherwise score as 0 or NaN without warning
+    '''
+    if np.isfinite(values).all():
+        return
+    if np.isnan(values).any():
+        raise ValueError(f'Input {name} contains NaN.')
+    raise ValueError(f'Input {name} contains infinity or a value too large '
+                     "for dtype('float64').")
+
+
+def _check_labels(codes):
+    '''
+    Raise a ValueError if any class label is null
+    '''
+    if (codes == -1).any():
+        raise ValueError('Input y contains NaN.')
+
+
+def _regression_moments(values, y):
+    '''
+    Sufficient statistics for f_regression: the count, means, sums of
+    squared deviations, and the co-moment of each feature with y
+    '''
+    mean_x = values.mean(axis=0)
+    mean_y = y.mean()
+    dev_y = y - mean_y
+    dev_x = values - mean_x
+    return {'n': len(y), 'mean_x': mean_x, 'mean_y': mean_y,
+            'm2_x': np.einsum('ij,ij->j', dev_x, dev_x),
+            'm2_y': dev_y @ dev_y, 'c_xy': dev_y @ dev_x}
+
+
+def _class_moments(values, codes, n_classes):
+    '''
+    Sufficient statistics for f_classif: the count, mean and sum of
+    squared deviations of each feature within each class
+    '''
+    onehot = (codes[:, None] == np.arange(n_classes)).astype(np.float64)
+    count = onehot.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (onehot.T @ values) / count[:, None]
+    dev = values - np.nan_to_num(mean)[codes]
+    return {'count': count, 'mean': mean, 'm2': onehot.T @ (dev * dev)}
+
+
+def _merge_regression(a, b):
+    '''
+    Combine the f_regression statistics of two sets of rows (Chan et al.)
+    '''
+    n = a['n'] + b['n']
+    if a['n'] == 0 or b['n'] == 0:
+        return a if b['n'] == 0 else b
+    delta_x = b['mean_x'] - a['mean_x']
+    delta_y = b['mean_y'] - a['mean_y']
+    weight = a['n'] * b['n'] / n
+    return {'n': n,
+            'mean_x': a['mean_x'] + delta_x * b['n'] / n,
+            'mean_y': a['mean_y'] + delta_y * b['n'] / n,
+            'm2_x': a['m2_x'] + b['m2_x'] + delta_x * delta_x * weight,
+            'm2_y': a['m2_y'] + b['m2_y'] + delta_y * delta_y * weight,
+            'c_xy': a['c_xy'] + b['c_xy'] + delta_x * delta_y * weight}
+
+
+def _merge_classes(a, b):
+    '''
+    Combine the f_classif statistics of two sets of rows class by class.
+    b may know about classes that a has not seen yet.
+    '''
+    a = _pad_classes(a, len(b['count']))
+    count = a['count'] + b['count']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = np.nan_to_num(b['count'] / count)[:, None]
+        weight = np.nan_to_num(a['count'] * b['count'] / count)[:, None]
+    mean_a, mean_b = np.nan_to_num(a['mean']), np.nan_to_num(b['mean'])
+    delta = mean_b - mean_a
+    mean = mean_a + delta * share
+    mean[count == 0] = np.nan
+    return {'count': count, 'mean': mean,
+            'm2': a['m2'] + b['m2'] + delta * delta * weight}
+
+
+def _pad_classes(st, n_classes, order=None):
+    '''
+    Return f_classif statistics with rows for n_classes classes, empty for
+    the classes st has not seen. order gives the new index of each row.
+    '''
+    if st is None:
+        return None
+    if order is None:
+        order = np.arange(len(st['count']))
+    n_features = st['mean'].shape[1]
+    padded = {'count': np.zeros(n_classes),
+              'mean': np.full((n_classes, n_features), np.nan),
+              'm2': np.zeros((n_classes, n_features))}
+    for key in padded:
+        padded[key][order] = st[key]
+    return padded
+
+
+def _f_regression(st):
+    '''
+    F-statistic of each feature's univariate regression on y, matching
+    sklearn.feature_selection.f_regression (including force_finite)
+    '''
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = st['c_xy'] / np.sqrt(st['m2_x'] * st['m2_y'])
+        corr2 = corr ** 2
+        f = corr2 / (1 - corr2) * (st['n'] - 2)
+    f[np.isinf(f)] = np.finfo(np.float64).max
+    f[np.isnan(f)] = 0.0
+    return f
+
+
+def _f_classif(st):
+    '''
+    One-way ANOVA F-statistic of each feature across classes, matching
+    sklearn.feature_selection.f_classif
+    '''
+    count = st['count']
+    present = count > 0
+    count, mean, m2 = count[present], st['mean'][present], st['m2'][present]
+    n = count.sum()
+    grand = (count[:, None] * mean).sum(axis=0) / n
+    ssbn = (count[:, None] * (mean - grand) ** 2).sum(axis=0)
+    sswn = m2.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (ssbn / (len(count) - 1)) / (sswn / (n - len(count)))
+
+
+def _top_k(indexes, scores, k):
+    '''
+    Concatenate blocks of indexes and scores, keeping the k best scores
+    '''
+    indexes, scores = np.concatenate(indexes), np.concatenate(scores)
+    if k is not None and len(scores) > k:
+        keep = np.argpartition(-_rankable(scores), k - 1)[:k]
+        indexes, scores = indexes[keep], scores[keep]
+    return indexes, scores
+
+
+def _rankable(scores):
+    '''
+    Scores with NaN moved to the bottom of the ranking
+    '''
+    return np.where(np.isnan(scores), -np.inf, scores)
+
+
+class BinnedDistribution:
+    '''
+    Counts of a numeric feature on a fixed-width grid, built one chunk at a
+    time. The grid starts at the range of the first values added and
+    doubles its bin width (merging neighbouring bins) whenever later values
+    fall outside it, so the raw values never need to be kept.
+
+    Input:
+    resolution: int, even, default 1024. Number of grid cells; histograms
+                and densities are drawn from these cells
+    '''
+    def __init__(self, resolution=1024):
+        if resolution < 2 or resolution % 2:
+            raise ValueError('resolution must be an even number of at least 2')
+        self.resolution = resolution
+        self.counts = np.zeros(resolution, dtype=np.int64)
+        self.low = np.nan
+        self.width = np.nan
+        self.count = 0
+        self.mean = np.nan
+        self.m2 = 0.0
+
+    def add(self, values):
+        '''
+        Add an array-like of numbers, ignoring NaNs and infinities
+
+        Input:
+        values: Pandas Series or array-like of numeric values
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return self
+        low, high = values.min(), values.max()
+        if self.count == 0:
+            span = high - low
+            if span == 0:
+                span = max(abs(low), 1.0)
+                low -= span / 2
+            self.low, self.width = low, span / self.resolution
+        while low < self.low:
+            self._widen(left=True)
+        # the top edge itself belongs to the last cell, like np.histogram
+        while np.floor((high - self.low) / self.width) > self.resolution:
+            self._widen(left=False)
+
+        cells = np.floor((values - self.low) / self.width).astype(np.intp)
+        np.clip(cells, 0, self.resolution - 1, out=cells)
+        self.counts += np.bincount(cells, minlength=self.resolution)
+        self._add_moments(values)
+        return self
+
+    @property
+    def edges(self):
+        return self.low + self.width * np.arange(self.resolution + 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 \
+            else np.nan
+
+    def histogram(self, bins=50):
+        '''
+        Group the grid cells into about bins bars, dropping empty bars at
+        either end
+
+        Output:
+        Return a tuple of the counts and the bin edges, like np.histogram
+        '''
+        group = max(self.resolution // max(bins, 1), 1)
+        starts = np.arange(0, self.resolution, group)
+        counts = np.add.reduceat(self.counts, starts)
+        edges = np.append(self.edges[starts], self.edges[-1])
+        filled = np.flatnonzero(counts)
+        if len(filled) == 0:
+            return counts[:0], edges[:1]
+        first, last = filled[0], filled[-1] + 1
+        return counts[first:last], edges[first:last + 1]
+
+    def kde(self, bandwidth=None):
+        '''
+        Gaussian kernel density estimate, convolved over the grid cells
+        with an FFT instead of summed over the raw values
+
+        Input:
+        bandwidth: float or None, kernel standard deviation. None uses
+                   Scott's rule, std * count ** (-1/5), like scipy's
+                   gaussian_kde
+
+        Output:
+        Return a tuple of numpy arrays, the grid points and the density
+        '''
+        if self.count == 0:
+            return np.empty(0), np.empty(0)
+        if bandwidth is None:
+            bandwidth = self.std * self.count ** (-1 / 5)
+        if not bandwidth > 0:
+            bandwidth = self.width
+        # pad the grid so the tails of the outer kernels fit
+        pad = min(int(np.ceil(4 * bandwidth / self.width)),
+                  4 * self.resolution)
+        offsets = np.arange(-pad, pad + 1) * self.width
+        kernel = np.exp(-.5 * (offsets / bandwidth) ** 2) / \
+            (bandwidth * np.sqrt(2 * np.pi))
+        size = self.resolution + 2 * pad
+        n_fft = 1 << int(np.ceil(np.log2(size + len(kernel))))
+        density = np.fft.irfft(np.fft.rfft(self.counts, n_fft) *
+                               np.fft.rfft(kernel, n_fft), n_fft)[:size]
+        centers = self.low + self.width * (np.arange(size) - pad + .5)
+        return centers, np.maximum(density, 0) / self.count
+
+    def _widen(self, left):
+        '''
+        Double the bin width, growing the grid to the left or the right
+        '''
+        pairs = self.counts.reshape(-1, 2).sum(axis=1)
+        self.counts = np.zeros(self.resolution, dtype=np.int64)
+        half = self.resolution // 2
+        if left:
+            self.counts[half:] = pairs
+            self.low -= self.width * self.resolution
+        else:
+            self.counts[:half] = pairs
+        self.width *= 2
+
+    def _add_moments(self, values):
+        n = len(values)
+        mean = values.mean()
+        dev = values - mean
+        m2 = dev @ dev
+        if self.count == 0:
+            self.count, self.mean, self.m2 = n, mean, m2
+            return
+        total = self.count + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+
+
+def univariate_aggregates(data, resolution=1024):
+    '''
+    Everything needed to draw the distribution of each feature, computed
+    once so that drawing does not depend on the number of rows
+
+    Input:
+    data: Pandas DataFrame object, or an iterable of DataFrame chunks
+    resolution: int, number of grid cells kept per numeric feature
+
+    Output:
+    Return a dict of column label -> BinnedDistribution for numeric and
+    boolean features, or a Pandas Series of label counts in order of
+    appearance for every other feature
+    '''
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    aggregates = None
+    for chunk in chunks:
+        if aggregates is None:
+            numeric = set(chunk.select_dtypes(include=['number', 'bool']))
+            aggregates = {column: BinnedDistribution(resolution)
+                          if column in numeric else
+                          pd.Series(dtype='int64')
+                          for column in chunk.columns}
+        for column, aggregate in aggregates.items():
+            if isinstance(aggregate, BinnedDistribution):
+                aggregate.add(chunk[column])
+                continue
+            counts = chunk[column].value_counts(sort=False)
+            aggregates[column] = pd.concat([aggregate, counts]).groupby(
+                level=0, sort=False).sum()
+    return aggregates if aggregates is not None else {}
+
+
+def categorical_crosstabs(data, hue):
+    '''
+    Counts of the labels of every categorical (object) feature within each
+    label of hue, computed once so that drawing does not depend on the
+    number of rows
+
+    The labels of each feature and of hue are factorized, and every
+    feature is counted against hue with a single bincount of the paired
+    codes.
+
+    Input:
+    data: Pandas DataFrame object, or an iterable of DataFrame chunks
+    hue: label of the column to split the counts by
+
+    Output:
+    Return a dict of column label -> Pandas DataFrame of int counts, with
+    a row per label of the feature in order of appearance and a column
+    per label of hue, in order of appearance or sorted if hue is numeric.
+    Rows where the feature or hue is null are not counted.
+    '''
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    hue_labels = {}
+    tables = None
+    for chunk in chunks:
+        if tables is None:
+            numeric_hue = pd.api.types.is_numeric_dtype(chunk[hue].dtype)
+            tables = {column: ({}, np.zeros((0, 0), dtype=np.int64))
+                      for column in chunk.select_dtypes(include='object')}
+        hue_codes = _running_codes(chunk[hue], hue_labels)
+        n_hue = len(hue_labels)
+        for column, (labels, counts) in tables.items():
+            codes = _running_codes(chunk[column], labels)
+            keep = (codes >= 0) & (hue_codes >= 0)
+            paired = codes[keep] * n_hue + hue_codes[keep]
+            total = np.bincount(paired, minlength=len(labels) * n_hue)
+            total = total.reshape(len(labels), n_hue)
+            total[:counts.shape[0], :counts.shape[1]] += counts
+            tables[column] = (labels, total)
+    if tables is None:
+        return {}
+
+    hue_names = list(hue_labels)
+    order = np.argsort(hue_names, kind='stable') if numeric_hue and \
+        hue_names else np.arange(len(hue_names))
+    columns = pd.Index([hue_names[i] for i in order], name=hue)
+    return {column: pd.DataFrame(counts[:, order], columns=columns,
+                                 index=pd.Index(list(labels), name=column))
+            for column, (labels, counts) in tables.items()}
+
+
+def _running_codes(values, labels):
+    '''
+    Codes of values in the running dict of labels, adding new labels in
+    order of appearance. Nulls get -1.
+    '''
+    codes, uniques = pd.factorize(values)
+    mapping = np.array([labels.setdefault(label, len(labels))
+                        for label in uniques] + [-1], dtype=np.intp)
+    return mapping[codes]
+
+
+def lowess(x, y, frac=2/3, iterations=3, n_eval=100):
+    '''
+    Robust locally weighted linear regression (Cleveland, 1979), the
+    smoother seaborn's residplot draws with lowess=True
+
+    The fit is evaluated at n_eval quantiles of x rather than at every
+    point, and interpolated between them for the robustness weights, so
+    the cost is about n_eval * len(x) per iteration.
+
+    Input:
+    x: array of floats without NaNs
+    y: array of floats without NaNs, the same length as x
+    frac: float, default 2/3, share of the points used in each local fit
+    iterations: int, default 3, robustifying passes after the first fit
+    n_eval: int, default 100, number of points the curve is evaluated at
+
+    Output:
+    Return a tuple of float arrays: the evaluation points, sorted, and the
+    smoothed values at them
+    '''
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) == 0:
+        return np.empty(0), np.empty(0)
+    grid = np.unique(np.quantile(x, np.linspace(0, 1, n_eval)))
+    k = min(max(int(np.ceil(frac * len(x))), 2), len(x))
+    distance = np.abs(x[None, :] - grid[:, None])
+    # each local fit reaches out to its k-th nearest point
+    reach = np.partition(distance, k - 1, axis=1)[:, k - 1:k]
+    reach = np.maximum(reach, 1e-12 * max(np.ptp(x), 1))
+    local = np.clip(1 - (distance / reach) ** 3, 0, None) ** 3
+
+    robust = np.ones(len(x))
+    for step in range(iterations + 1):
+        w = local * robust
+        s0, s1 = w.sum(axis=1), w @ x
+        s2, t0, t1 = w @ (x * x), w @ y, w @ (x * y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x, mean_y = s1 / s0, t0 / s0
+            slope = (t1 - s1 * mean_y) / (s2 - s1 * mean_x)
+            # flat or degenerate neighborhoods fall back to the local mean
+            slope = np.where(np.isfinite(slope) & (s2 - s1 * mean_x >
+                                                   1e-12 * s2), slope, 0)
+            fitted = mean_y + slope * (grid - mean_x)
+        fitted = np.where(np.isfinite(fitted), fitted, np.nan)
+        if step == iterations:
+            break
+        residual = y - np.interp(x, grid, fitted)
+        scale = np.median(np.abs(residual))
+        if not scale > 0:
+            break
+        robust = np.clip(1 - (residual / (6 * scale)) ** 2, 0, None) ** 2
+    return grid, fitted
@@ -0,0 +1,149 @@
+'''
+Streaming versions of the reports for datasets that do not fit in memory
+
+Every function takes an iterable of DataFrame chunks, for example
+pd.read_csv(path, chunksize=100000) or read_parquet_chunks(path), and
+prints the same table as its counterpart in walkabout.report. Memory use
+grows with the number of columns (and labels kept per column), not rows.
+'''
+from . import report, support, stats
+from .profile import build_profile_from_chunks
+
+
+__all__ = ['rundown', 'nulls', 'type_and_unique', 'assess_categoricals',
+           'numeric_distribution', 'simple_feature_importance',
+           'read_parquet_chunks']
+
+
+def rundown(chunks, include_shape=True, include_describe=True,
+            include_nulls=True, include_types_uniques=True):
+    '''
+    Report giving an overview of a chunked dataset
+
+    Input:
+    chunks: iterable of Pandas DataFrame objects
+
+    Output:
+    Print report to screen
+    '''
+    report.rundown(build_profile_from_chunks(chunks), include_shape,
+                   include_describe, include_nulls, include_types_uniques)
+
+
+def nulls(chunks, placeholders=support.PLACEHOLDERS):
+    '''
+    Report null distribution, any possible placeholders, and
+    simple recommendations for a chunked dataset
+
+    Input:
+    chunks: iterable of Pandas DataFrame objects
+    placeholders: list of common placeholder values used in place of null
+
+    Output:
+    Print report to screen
+    '''
+    report.nulls(build_profile_from_chunks(chunks, placeholders))
+
+
+def type_and_unique(chunks, unq_limit=10, max_labels=10000):
+    '''
+    Report data type of all features, number of unique values, and
+    some of those values for a chunked dataset
+
+    Input:
+    chunks: iterable of Pandas DataFrame objects
+    unq_limit: number of unique items from each feature to display
+    max_labels: int, the most unique values tracked per feature. Beyond it
+                nUnique is shown as a lower bound, e.g. 10000+
+
+    Output:
+    Print report to screen
+    '''
+    profile = build_profile_from_chunks(chunks, unq_limit=unq_limit,
+                                        max_labels=max_labels)
+    report.type_and_unique(profile, unq_limit)
+
+
+def assess_categoricals(chunks, low_thresh=.05, high_thresh=.51,
+                        return_low_violators=False, max_labels=10000,
+                        max_violators=50):
+    '''
+    Report for categorical features of a chunked dataset, highlighting labels
+    in a feature that are the majority or extreme minority classifiers
+
+    Input:
+    chunks: iterable of Pandas DataFrame objects
+    low_thresh: float minimum percent distribution desired before binning
+    high_thresh: float max percent distribution for majority classifiers
+    return_low_violators: bool, if true, include labels below low_thresh
+                          as part of report
+    max_labels: int, the most labels counted per feature. Features with
+                more labels are listed but not assessed
+    max_violators: int or None, the most violating labels listed per feature
+
+    Output:
+    Print report to screen
+    '''
+    profile = build_profile_from_chunks(chunks, max_labels=max_labels)
+    report.assess_categoricals(profile, low_thresh, high_thresh,
+                               return_low_violators,
+                               max_violators=max_violators)
+
+
+def numeric_distribution(chunks):
+    '''
+    Report the skew and excess kurtosis of all numeric features in a
+    chunked dataset
+
+    Input:
+    chunks: iterable of Pandas DataFrame objects
+
+    Output:
+    Print report to the screen
+    '''
+    report.numeric_distribution(build_profile_from_chunks(chunks))
+
+
+def simple_feature_importance(chunks, target, model='reg'):
+    '''
+    Score each feature of a chunked dataset against the target with a
+    univariate F-test
+
+    Input:
+    chunks: iterable of Pandas DataFrame objects
+    target: label of the target column, every other column is a feature
+    model: 'reg' for regression or 'clas' for classification
+
+    Output:
+    Return a Pandas DataFrame of float scores indexed by feature, best first
+    '''
+    scorer = stats.FScorer(model)
+    for chunk in chunks:
+        scorer.partial_fit(chunk.drop(columns=target), chunk[target])
+    scores = scorer.scores()
+    scores.index.name = 'Feature'
+    return scores.to_frame().sort_values('Score', ascending=False)
+
+
+def read_parquet_chunks(path, columns=None, batch_size=None):
+    '''
+    Read a Parquet file one row group (or batch) at a time. Requires pyarrow.
+
+    Input:
+    path: string, path to the Parquet file
+    columns: list of column names to read, default all
+    batch_size: int, rows per chunk, default is one chunk per row group
+
+    Output:
+    Yield Pandas DataFrame objects
+    '''
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    if batch_size is None:
+        for i in range(parquet.num_row_groups):
+            yield parquet.read_row_group(i, columns=columns).to_pandas()
+    else:
+        for batch in parquet.iter_batches(batch_size=batch_size,
+                                          columns=columns):
+            yield batch.to_pandas()
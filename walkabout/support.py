@@ -2,7 +2,8 @@ import pandas as pd
 import numpy as np
 
 __all__ = ['list_to_string', 'strip_columns', 'outlier_mask', 'trimean',
-           'variance_coefficient', 'placehold_to_nan']
+           'variance_coefficient', 'placehold_to_nan', 'placeholder_mask',
+           'placeholder_counts', 'outlier_fences']
 
 
 PLACEHOLDERS = [-1, -999, -9999, 'None', 'none', 'missing', 'Missing', 
@@ -14,7 +15,25 @@ Supporting functions for exploratory data analysis
 '''
 
 
-def outlier_mask(feature, inclusive=True):
+def outlier_fences(feature=None, sketch=None):
+    '''
+    Calculate the IQR fences beyond which values are outliers
+
+    Input:
+    feature: Pandas Series object containing numeric values
+    sketch: optional precomputed quantile sketch of feature, any object
+            with a quantile() method such as walkabout.sketch.KLLSketch.
+            When given, feature is not sorted again and may be None.
+
+    Output:
+    Return a tuple of floats (lower fence, upper fence)
+    '''
+    q1, q3 = _quartiles(feature, sketch)
+    iqr = q3-q1
+    return (q1-1.5*iqr), (q3+1.5*iqr)
+
+
+def outlier_mask(feature, inclusive=True, sketch=None):
     '''
     Creates a mask of the outliers using IQR
 
@@ -23,19 +42,19 @@ def outlier_mask(feature, inclusive=True):
     inclusive: bool, default is True, whether to include values that lie on the
               boundary of becoming an outlier. False will consider the edge
               cases as outliers.
+    sketch: optional precomputed quantile sketch of feature, used for the
+            quartiles instead of sorting feature
 
     Output:
     Return a Pandas Series object of booleans where True values correspond
     to outliers in the original feature
     '''
-    q1 = feature.quantile(.25)
-    q3 = feature.quantile(.75)
-    iqr = q3-q1
-    mask = ~feature.between((q1-1.5*iqr), (q3+1.5*iqr), inclusive=inclusive)
+    low, high = outlier_fences(feature, sketch)
+    mask = ~feature.between(low, high, inclusive=inclusive)
     return mask
 
 
-def trimean(feature):
+def trimean(feature=None, sketch=None):
     '''
     Calculate the trimean. Trimean is a measure of the
     center that combines the medians emphasis on center values with the
@@ -43,13 +62,21 @@ def trimean(feature):
 
     Input:
     feature: Pandas Series or DataFrame Object containing numeric values
+    sketch: optional precomputed quantile sketch, or a dict of column name
+            to sketch for a DataFrame. When given, feature may be None.
 
     Output:
     Return the trimean as a float or an array of floats
     '''
-    q1 = feature.quantile(.25)
-    q2 = feature.median()
-    q3 = feature.quantile(.75)
+    if isinstance(sketch, dict):
+        return pd.Series({column: trimean(sketch=item)
+                          for column, item in sketch.items()})
+    if sketch is not None:
+        q1, q2, q3 = sketch.quantile([.25, .5, .75])
+    else:
+        q1 = feature.quantile(.25)
+        q2 = feature.median()
+        q3 = feature.quantile(.75)
 
     return ((q1+2*q2+q3)/4)
 
@@ -68,6 +95,17 @@ def variance_coefficient(feature):
     return (feature.var()/feature.mean())
 
 
+def _quartiles(feature, sketch=None):
+    '''
+    Return the first and third quartile of feature, from sketch if given
+    '''
+    if sketch is not None:
+        q1, q3 = sketch.quantile([.25, .75])
+        return q1, q3
+    q1, q3 = feature.quantile([.25, .75])
+    return q1, q3
+
+
 def _flatten_list(l):
     '''
     "Flatten" a nested list down to a single layer
@@ -122,15 +160,158 @@ def strip_columns(df):
     return df
 
 
-def placehold_to_nan(df, placeholders=PLACEHOLDERS):
+def placeholder_mask(feature, placeholders=PLACEHOLDERS):
+    '''
+    Creates a mask of the placeholder values in a feature, checking the
+    feature once against every placeholder its dtype can hold
+
+    Input:
+    feature: Pandas Series object
+    placeholders: a list of values used as placeholders for NaN
+
+    Output:
+    Return a Pandas Series object of booleans where True values correspond
+    to placeholders in the original feature
+    '''
+    candidates = _compatible_placeholders(feature.dtype, placeholders)
+    if not candidates:
+        return pd.Series(False, index=feature.index)
+    return pd.Series(_isin(feature.to_numpy(), candidates),
+                     index=feature.index)
+
+
+def placeholder_counts(df, placeholders=PLACEHOLDERS):
+    '''
+    Count how often each placeholder occurs in each feature
+
+    Input:
+    df: Pandas DataFrame object
+    placeholders: a list of values used as placeholders for NaN
+
+    Output:
+    Return a Pandas DataFrame with a row per feature and a column per
+    placeholder holding the number of hits
+    '''
+    items = list(dict.fromkeys(placeholders))
+    table = []
+    for column in df.columns:
+        feature = df[column]
+        candidates = _compatible_placeholders(feature.dtype, items)
+        hits = {}
+        if candidates:
+            found = feature[_isin(feature.to_numpy(), candidates)]
+            found = found.value_counts()
+            hits = _placeholder_hits(found.index, found.to_numpy(),
+                                     candidates)
+        table.append([hits.get(item, 0) for item in items])
+    return pd.DataFrame(table, index=df.columns, columns=items,
+                        dtype='int64')
+
+
+def placehold_to_nan(df, placeholders=PLACEHOLDERS, inplace=False):
     '''
     Convert all values in df that are in placeholders to NaN
 
     Input:
     df: Pandas DataFrame or Series object
     placeholders: a list of values used as placeholders for NaN
+    inplace: bool, default is False, whether to modify df rather than
+             return a new object. Unchanged features are shared, not
+             copied, either way.
 
     Output
-    Return df with all placeholder values fill with NaN
+    Return df with all placeholder values fill with NaN, or None if inplace
+    '''
+    if isinstance(df, pd.Series):
+        mask = placeholder_mask(df, placeholders)
+        if inplace:
+            if mask.any():
+                df[mask] = np.nan
+            return None
+        return df.mask(mask)
+
+    out = df if inplace else df.copy(deep=False)
+    for column in df.columns:
+        mask = placeholder_mask(df[column], placeholders)
+        if mask.any():
+            out[column] = df[column].mask(mask)
+    return None if inplace else out
+
+
+def _compatible_placeholders(dtype, placeholders):
+    '''
+    Filter placeholders down to the values a feature of dtype could hold
+
+    Input:
+    dtype: the dtype of the feature being scanned
+    placeholders: a list of values used as placeholders for NaN
+
+    Output:
+    Return a list of placeholders that could match values of dtype
+    '''
+    if pd.api.types.is_bool_dtype(dtype):
+        return []
+    numbers = [item for item in placeholders if _is_number(item)]
+    if pd.api.types.is_integer_dtype(dtype):
+        return [item for item in numbers if float(item).is_integer()]
+    if pd.api.types.is_float_dtype(dtype):
+        return numbers
+    if pd.api.types.is_numeric_dtype(dtype) or \
+            pd.api.types.is_datetime64_any_dtype(dtype) or \
+            pd.api.types.is_timedelta64_dtype(dtype):
+        return []
+    return list(placeholders)
+
+
+def _isin(values, candidates):
+    '''
+    Boolean mask of values that equal any candidate. A handful of vectorized
+    comparisons beats building a hash table for numeric arrays.
+
+    Input:
+    values: numpy array or array-like
+    candidates: list of placeholders compatible with values' dtype
+
+    Output:
+    Return a numpy array of booleans
+    '''
+    dtype = getattr(values, 'dtype', None)
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iuf':
+        values = np.asarray(values)
+        mask = np.zeros(len(values), dtype=bool)
+        for item in candidates:
+            if _is_number(item):
+                mask |= values == item
+        return mask
+    # nullable extension arrays give an object array of booleans
+    return np.asarray(pd.Index(values).isin(candidates), dtype=bool)
+
+
+def _placeholder_hits(values, counts, placeholders):
+    '''
+    Attribute counted values to the placeholders they are equal to
+
+    Input:
+    values: array of distinct values found in a feature
+    counts: array of the number of times each value occurs
+    placeholders: a list of values used as placeholders for NaN
+
+    Output:
+    Return a dict of placeholder -> hits, in placeholder order, for the
+    placeholders that occur
+    '''
+    hits = {}
+    for value, count in zip(values, counts):
+        for item in placeholders:
+            if _is_number(value) == _is_number(item) and value == item:
+                hits[item] = hits.get(item, 0) + int(count)
+                break
+    return {item: hits[item] for item in placeholders if item in hits}
+
+
+def _is_number(value):
+    '''
+    Return True if value is a non-boolean number
     '''
-    return df.replace(placeholders, np.NaN)
+    return isinstance(value, (int, float, np.number)) and \
+        not isinstance(value, (bool, np.bool_))